@@ -0,0 +1,26 @@
+"""
+Procedural level generation time, including validation and the connectivity check.
+
+Run from the project root:
+    python -m benchmarks.bench_dungeon_generator
+"""
+import time
+from game.engine.level_generator import LevelGenerator
+
+SIZES = [48, 100, 200]
+RUNS = 20
+
+
+def main() -> None:
+    print(f"{'map':>9} {'best ms':>9} {'worst ms':>9}")
+    for size in SIZES:
+        timings = []
+        for level_number in range(3, 3 + RUNS):
+            start = time.perf_counter()
+            LevelGenerator.generate_level(level_number, seed=0, width=size, height=size)
+            timings.append((time.perf_counter() - start) * 1e3)
+        print(f"{size:>4}x{size:<4} {min(timings):>9.2f} {max(timings):>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
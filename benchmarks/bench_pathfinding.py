@@ -0,0 +1,54 @@
+"""
+Enemy-turn cost with 1,000 enemies on a 256x256 map.
+
+Compares the shared Dijkstra map used by chasers with per-entity A* paths,
+both cached (the default) and recomputed every turn.
+
+Run from the project root:
+    python -m benchmarks.bench_pathfinding
+"""
+import time
+from game.engine.pathfinding import PathCache
+from .common import build_game
+
+SIZE = 256
+ENEMIES = 1000
+TURNS = 20
+
+
+def measure(behavior: str, repath_tolerance: int = 2) -> float:
+    """Return the mean process_enemy_turns latency in milliseconds."""
+    game = build_game(SIZE, SIZE, ENEMIES)
+    game.path_cache = PathCache(repath_tolerance)
+    for entity in game.entities.values():
+        if entity.entity_type == 'enemy':
+            entity.behavior = behavior
+
+    # Park the player in the middle of the map so paths have real length
+    player_id, _ = game.get_player()
+    game.spatial.remove(player_id, 1, 1)
+    centre = SIZE // 2
+    while game.spatial.is_blocked(centre, centre):
+        centre += 1
+    game.move_entity(player_id, centre, centre)
+
+    # Let every enemy see the player so they all take part
+    game.fov_radius = SIZE
+    game.update_fov()
+
+    start = time.perf_counter()
+    for _ in range(TURNS):
+        game.process_enemy_turns()
+    return (time.perf_counter() - start) / TURNS * 1e3
+
+
+def main() -> None:
+    print(f"{SIZE}x{SIZE} map, {ENEMIES} enemies, {TURNS} turns")
+    print(f"{'strategy':<28} {'ms/turn':>10}")
+    print(f"{'shared dijkstra map':<28} {measure('chase'):>10.2f}")
+    print(f"{'cached a* per entity':<28} {measure('patrol'):>10.2f}")
+    print(f"{'uncached a* per entity':<28} {measure('patrol', repath_tolerance=-1):>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
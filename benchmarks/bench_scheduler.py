@@ -0,0 +1,54 @@
+"""
+Enemy-turn cost of the energy scheduler against the lockstep loop.
+
+Each scenario plays the same seeded turns in both modes with the player
+pacing between two cells, with the normal view radius (few enemies awake) and
+with the whole map in view (every enemy awake).
+
+Run from the project root:
+    python -m benchmarks.bench_scheduler
+"""
+import time
+from typing import Tuple
+from .common import build_game
+
+# (width, height, enemies)
+SCENARIOS = [(100, 100, 500), (250, 250, 2000), (500, 500, 10000)]
+TURNS = 50
+
+
+def measure(width: int, height: int, enemies: int, scheduler: str, see_all: bool) -> Tuple[float, int]:
+    """Return the mean process_enemy_turns latency in milliseconds and the enemies awake at the start."""
+    game = build_game(width, height, enemies)
+    game.config = {**game.config, 'ENEMY_SCHEDULER': scheduler}
+    if see_all:
+        game.fov_radius = max(width, height)
+        game.update_fov()
+    active = len(game.scheduler) if scheduler == 'energy' else len(game.visible_entity_ids()) - 1
+
+    player_id, player = game.get_player()
+    targets = [(player.x + 1, player.y), (player.x, player.y)]
+    elapsed = 0.0
+    for turn in range(TURNS):
+        # Move the player by hand so only the enemy turns are timed
+        game.tick += 1
+        game.move_entity(player_id, *targets[turn % 2])
+        game.update_fov()
+        start = time.perf_counter()
+        game.process_enemy_turns()
+        elapsed += time.perf_counter() - start
+    return elapsed / TURNS * 1e3, active
+
+
+def main() -> None:
+    print(f"{'map':<10} {'enemies':>8} {'view':<8} {'lockstep ms':>12} {'energy ms':>10} {'awake':>7}")
+    for width, height, enemies in SCENARIOS:
+        for see_all in (False, True):
+            lockstep, _ = measure(width, height, enemies, 'lockstep', see_all)
+            energy, active = measure(width, height, enemies, 'energy', see_all)
+            print(f"{f'{width}x{height}':<10} {enemies:>8} {'all' if see_all else 'normal':<8} "
+                  f"{lockstep:>12.3f} {energy:>10.3f} {active:>7}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+"""
+Turn latency as the map and enemy count grow.
+
+Run from the project root:
+    python -m benchmarks.bench_spatial_index
+"""
+import time
+from .common import build_game
+
+SIZES = [50, 100, 250, 500]
+ENEMY_COUNTS = [100, 300]
+TURNS = 200
+
+
+def measure_turns(size: int, enemies: int, turns: int = TURNS) -> float:
+    """Return the mean latency of try_move_player in microseconds."""
+    game = build_game(size, size, enemies)
+
+    # Shuffle the player back and forth along the top corridor
+    targets = [(3, 1), (1, 1)]
+    start = time.perf_counter()
+    for turn in range(turns):
+        x, y = targets[turn % 2]
+        game.try_move_player(x, y)
+    return (time.perf_counter() - start) / turns * 1e6
+
+
+def main() -> None:
+    print(f"{'map':>9} {'enemies':>8} {'us/turn':>10}")
+    for enemies in ENEMY_COUNTS:
+        for size in SIZES:
+            latency = measure_turns(size, enemies)
+            print(f"{size:>4}x{size:<4} {enemies:>8} {latency:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Enemy-turn cost of the NumPy engine against the scalar engine.
+
+Every enemy on a 256x256 map sees the player, so all of them act each turn.
+Both engines play the same seeded turns and must end in the same state.
+
+Run from the project root (needs numpy):
+    python -m benchmarks.bench_vectorized
+"""
+import time
+from typing import Tuple
+from game.engine import vectorized
+from .common import build_game
+
+SIZE = 256
+ENEMY_COUNTS = (250, 1000, 2000, 5000)
+TURNS = 20
+
+
+def measure(enemies: int, behavior: str, vectorize: bool) -> Tuple[float, Tuple]:
+    """Return the mean process_enemy_turns latency in milliseconds and the final entity columns."""
+    game = build_game(SIZE, SIZE, enemies)
+    game.config = {**game.config, 'VECTORIZE_MIN_CHASERS': 1 if vectorize else 0}
+    for entity in game.entities.values():
+        if entity.entity_type == 'enemy':
+            entity.behavior = behavior
+
+    # Park the player in the middle of the map so paths have real length
+    player_id, _ = game.get_player()
+    game.spatial.remove(player_id, 1, 1)
+    centre = SIZE // 2
+    while game.spatial.is_blocked(centre, centre):
+        centre += 1
+    game.move_entity(player_id, centre, centre)
+
+    # Let every enemy see the player so they all take part
+    game.fov_radius = SIZE
+    game.update_fov()
+
+    start = time.perf_counter()
+    for _ in range(TURNS):
+        game.tick += 1
+        game.process_enemy_turns()
+    elapsed = (time.perf_counter() - start) / TURNS * 1e3
+    return elapsed, (game.entities.snapshot(), game.rng.getstate())
+
+
+def main() -> None:
+    if not vectorized.available():
+        raise SystemExit("numpy is not installed")
+    print(f"{SIZE}x{SIZE} map, {TURNS} turns")
+    print(f"{'enemies':>8} {'behavior':<10} {'scalar ms':>10} {'numpy ms':>10} {'speedup':>8}")
+    for enemies in ENEMY_COUNTS:
+        for behavior in ('chase', 'patrol'):
+            scalar, expected = measure(enemies, behavior, vectorize=False)
+            fast, result = measure(enemies, behavior, vectorize=True)
+            if result != expected:
+                raise SystemExit(f"NumPy engine diverged with {enemies} {behavior} enemies")
+            print(f"{enemies:>8} {behavior:<10} {scalar:>10.2f} {fast:>10.2f} {scalar / fast:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+import random
+from typing import List
+from game.engine.game_state import GameState
+from game.engine.level_generator import Level
+
+
+def arena_layout(width: int, height: int, enemies: int, seed: int = 0) -> str:
+    """Build an ASCII layout with a border, scattered pillars and random enemy spawns."""
+    rng = random.Random(seed)
+    rows: List[List[str]] = [['.'] * width for _ in range(height)]
+    for x in range(width):
+        rows[0][x] = rows[height - 1][x] = '#'
+    for y in range(height):
+        rows[y][0] = rows[y][width - 1] = '#'
+
+    # A sparse grid of 2x2 pillars keeps the map from being trivially open
+    for y in range(4, height - 4, 8):
+        for x in range(4, width - 4, 8):
+            rows[y][x] = rows[y][x + 1] = rows[y + 1][x] = rows[y + 1][x + 1] = '#'
+
+    rows[1][1] = 'P'
+    placed = 0
+    while placed < enemies:
+        x = rng.randrange(1, width - 1)
+        y = rng.randrange(1, height - 1)
+        if rows[y][x] == '.' and (x, y) != (2, 1):
+            rows[y][x] = 'E'
+            placed += 1
+
+    return '\n'.join(''.join(row) for row in rows)
+
+
+def build_level(width: int, height: int, enemies: int, seed: int = 0) -> Level:
+    """Compile an arena layout into a level."""
+    return Level(arena_layout(width, height, enemies, seed))
+
+
+def build_game(width: int, height: int, enemies: int, seed: int = 0) -> GameState:
+    """Create a seeded game on an arena level with an effectively immortal player."""
+    game = GameState(rng=random.Random(seed))
+    game.load_level(build_level(width, height, enemies, seed))
+    _, player = game.get_player()
+    player.health = 10 ** 9
+    return game
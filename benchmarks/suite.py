@@ -0,0 +1,206 @@
+"""
+Repeatable engine benchmark suite.
+
+Times Level parsing, level initialisation, player turns, enemy turns and
+serialisation across map sizes and enemy counts. Reports ops/sec, p50/p99
+latency and peak memory, and writes the results as JSON so runs from two
+commits can be compared.
+
+Run from the project root:
+    python -m benchmarks.suite --output before.json
+    python -m benchmarks.suite --output after.json --compare before.json
+    python -m benchmarks.suite --quick --profile profiles/
+"""
+import argparse
+import cProfile
+import json
+import os
+import platform
+import subprocess
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+from game.engine.game_state import GameState
+from game.engine.level_generator import Level
+from game.levels.level_data import LEVEL_LAYOUTS
+from .common import arena_layout, build_game
+
+# (name, width, height, enemies); the stock scenario uses the hand-written level 1
+SCENARIOS: List[Tuple[str, int, int, int]] = [
+    ('stock', 18, 10, 3),
+    ('100x100', 100, 100, 500),
+    ('250x250', 250, 250, 2000),
+    ('1000x1000', 1000, 1000, 10000),
+]
+QUICK_SCENARIOS = {'stock', '100x100'}
+
+# Each operation runs for at least MIN_RUNS calls and roughly TIME_BUDGET seconds
+MIN_RUNS = 5
+MAX_RUNS = 10000
+TIME_BUDGET = 0.5
+
+# A metric counts as a regression when it is this much worse than the baseline;
+# timings on a busy machine easily move by 10-20% between runs
+REGRESSION_THRESHOLD = 0.25
+
+
+def time_operation(operation: Callable[[], None]) -> Dict:
+    """Call an operation repeatedly and return throughput and latency percentiles."""
+    durations = []
+    deadline = time.perf_counter() + TIME_BUDGET
+    while len(durations) < MIN_RUNS or (time.perf_counter() < deadline and len(durations) < MAX_RUNS):
+        start = time.perf_counter_ns()
+        operation()
+        durations.append(time.perf_counter_ns() - start)
+
+    durations.sort()
+    total = sum(durations)
+
+    def percentile(fraction: float) -> float:
+        return durations[min(len(durations) - 1, int(fraction * len(durations)))] / 1e3
+
+    return {
+        'runs': len(durations),
+        'ops_per_sec': len(durations) / (total / 1e9) if total else float('inf'),
+        'p50_us': percentile(0.50),
+        'p99_us': percentile(0.99),
+    }
+
+
+def peak_memory(operation: Callable[[], None]) -> int:
+    """Return the peak bytes allocated by one call, measured separately from timing."""
+    tracemalloc.start()
+    try:
+        operation()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def build_operations(width: int, height: int, enemies: int, stock: bool) -> Dict[str, Callable[[], None]]:
+    """Create the benchmarked operations for one scenario, sharing a prepared game."""
+    layout = LEVEL_LAYOUTS[1] if stock else arena_layout(width, height, enemies)
+    level = Level(layout)
+    game = build_game(width, height, enemies) if not stock else GameState()
+    if stock:
+        game.get_player()[1].health = 10 ** 9
+
+    # The player bounces between two cells so every turn is a real move
+    _, player = game.get_player()
+    targets = [(player.x + 1, player.y), (player.x, player.y)]
+    turn = [0]
+
+    def try_move_player() -> None:
+        turn[0] += 1
+        game.try_move_player(*targets[turn[0] % 2])
+
+    def initialize_level() -> None:
+        if stock:
+            game.initialize_level()
+        else:
+            game.load_level(level)
+
+    return {
+        'parse_layout': lambda: Level(layout),
+        'try_move_player': try_move_player,
+        'process_enemy_turns': game.process_enemy_turns,
+        'to_dict': game.to_dict,
+        # Last, since it respawns the player with normal health
+        'initialize_level': initialize_level,
+    }
+
+
+def run_scenario(name: str, width: int, height: int, enemies: int,
+                 profile_dir: Optional[str]) -> Dict:
+    operations = build_operations(width, height, enemies, stock=(name == 'stock'))
+    results = {}
+    for op_name, operation in operations.items():
+        result = time_operation(operation)
+        result['peak_bytes'] = peak_memory(operation)
+
+        if profile_dir:
+            # Dump a cProfile file; render with e.g. snakeviz or flameprof
+            profiler = cProfile.Profile()
+            profiler.runcall(lambda: [operation() for _ in range(MIN_RUNS)])
+            profiler.dump_stats(os.path.join(profile_dir, f"{name}-{op_name}.prof"))
+
+        results[op_name] = result
+        print(f"{name:<10} {op_name:<20} {result['ops_per_sec']:>12.1f} "
+              f"{result['p50_us']:>12.1f} {result['p99_us']:>12.1f} {result['peak_bytes'] / 1024:>12.1f}")
+
+    return {'width': width, 'height': height, 'enemies': enemies, 'operations': results}
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: Dict, baseline: Dict) -> List[str]:
+    """List every metric that got worse than the baseline by more than the threshold."""
+    regressions = []
+    for name, scenario in current['scenarios'].items():
+        old_scenario = baseline.get('scenarios', {}).get(name)
+        if not old_scenario:
+            continue
+        for op_name, result in scenario['operations'].items():
+            old = old_scenario['operations'].get(op_name)
+            if not old:
+                continue
+            # Lower is better for latency and memory, higher is better for throughput
+            for metric, lower_is_better in (('p50_us', True), ('p99_us', True),
+                                            ('peak_bytes', True), ('ops_per_sec', False)):
+                before, after = old[metric], result[metric]
+                if not before:
+                    continue
+                change = (after - before) / before
+                if (change if lower_is_better else -change) > REGRESSION_THRESHOLD:
+                    regressions.append(f"{name}/{op_name} {metric}: {before:.1f} -> {after:.1f} ({change:+.0%})")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Engine benchmark suite')
+    parser.add_argument('--output', default='bench_results.json', help='where to write the JSON results')
+    parser.add_argument('--compare', help='baseline JSON results to check for regressions')
+    parser.add_argument('--profile', metavar='DIR', help='write a cProfile dump per scenario and operation')
+    parser.add_argument('--quick', action='store_true', help='only run the small scenarios')
+    parser.add_argument('--scenario', action='append', help='run only the named scenario; repeatable')
+    args = parser.parse_args()
+
+    if args.profile:
+        os.makedirs(args.profile, exist_ok=True)
+
+    print(f"{'scenario':<10} {'operation':<20} {'ops/sec':>12} {'p50 us':>12} {'p99 us':>12} {'peak KiB':>12}")
+    scenarios = {}
+    for name, width, height, enemies in SCENARIOS:
+        if args.quick and name not in QUICK_SCENARIOS:
+            continue
+        if args.scenario and name not in args.scenario:
+            continue
+        scenarios[name] = run_scenario(name, width, height, enemies, args.profile)
+
+    results = {
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'timestamp': time.time(),
+        'scenarios': scenarios,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            regressions = compare(results, json.load(f))
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
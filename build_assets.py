@@ -0,0 +1,303 @@
+"""
+Build the client's static assets for production.
+
+Packs the sprites referenced in static/js/spriteMapping.js into a small atlas
+with a JSON map of their new positions, then writes content-hashed copies of
+the atlas, music, sound effects and stylesheets to SERVER_CONFIG['ASSET_DIR']
+along with manifest.json. The server serves hashed files with long-lived cache
+headers and pages pick them up from the manifest. Files from earlier builds
+are kept so pages already loaded keep working.
+
+Usage:
+    python build_assets.py [--out static/dist]
+"""
+import argparse
+import ast
+import glob
+import hashlib
+import json
+import math
+import operator
+import os
+import re
+import struct
+import zlib
+from typing import Dict, List, Tuple
+from game.assets import DIGEST_LENGTH, MANIFEST_NAME, file_digest, hashed_name
+from config import SERVER_CONFIG
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = os.path.join(ROOT, 'static')
+SPRITE_MAPPING = os.path.join(STATIC_DIR, 'js', 'spriteMapping.js')
+SPRITE_SHEET = os.path.join(STATIC_DIR, 'assets', 'tilesets', 'colored.png')
+
+# Copied under hashed names as they are; patterns are relative to static/
+HASHED_ASSETS = ('assets/music/*', 'assets/sfx/*', 'assets/tilesets/colored.png', 'css/*.css')
+
+# -----------------
+# PNG Codec
+# -----------------
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}  # Samples per pixel by colour type
+
+
+class Image:
+    """An RGBA image, one bytearray of width * 4 bytes per row."""
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.rows = [bytearray(width * 4) for _ in range(height)]
+
+    def blit(self, source: 'Image', sx: int, sy: int, width: int, height: int, dx: int, dy: int) -> None:
+        for row in range(height):
+            self.rows[dy + row][dx * 4:(dx + width) * 4] = source.rows[sy + row][sx * 4:(sx + width) * 4]
+
+
+def read_png(path: str) -> Image:
+    """Decode a non-interlaced PNG of up to 8 bits per sample."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if data[:8] != PNG_SIGNATURE:
+        raise ValueError(f"{path} is not a PNG file")
+
+    palette = b''
+    transparency = b''
+    compressed = []
+    offset = 8
+    while offset < len(data):
+        length, kind = struct.unpack('>I4s', data[offset:offset + 8])
+        body = data[offset + 8:offset + 8 + length]
+        offset += 12 + length
+        if kind == b'IHDR':
+            width, height, depth, color_type, _, _, interlace = struct.unpack('>IIBBBBB', body)
+        elif kind == b'PLTE':
+            palette = body
+        elif kind == b'tRNS':
+            transparency = body
+        elif kind == b'IDAT':
+            compressed.append(body)
+        elif kind == b'IEND':
+            break
+    if depth > 8 or interlace:
+        raise ValueError(f"{path}: only non-interlaced PNGs of up to 8 bits per sample are supported")
+
+    channels = CHANNELS[color_type]
+    bits_per_pixel = channels * depth
+    row_bytes = (width * bits_per_pixel + 7) // 8
+    raw = unfilter(zlib.decompress(b''.join(compressed)), row_bytes, height, max(1, bits_per_pixel // 8))
+
+    # Colour type 0 and 3 may pack several pixels into a byte; expand them to samples
+    image = Image(width, height)
+    max_sample = (1 << depth) - 1
+    for y, row in enumerate(raw):
+        if depth < 8:
+            samples = [(byte >> shift) & max_sample for byte in row for shift in range(8 - depth, -1, -depth)]
+        else:
+            samples = row
+        out = image.rows[y]
+        for x in range(width):
+            if color_type == 3:
+                index = samples[x]
+                out[x * 4:x * 4 + 3] = palette[index * 3:index * 3 + 3]
+                out[x * 4 + 3] = transparency[index] if index < len(transparency) else 255
+            elif color_type in (0, 4):
+                gray = samples[x * channels] * 255 // max_sample
+                out[x * 4:x * 4 + 3] = bytes((gray, gray, gray))
+                out[x * 4 + 3] = samples[x * 2 + 1] if color_type == 4 else 255
+            else:
+                out[x * 4:x * 4 + 3] = samples[x * channels:x * channels + 3]
+                out[x * 4 + 3] = samples[x * 4 + 3] if color_type == 6 else 255
+    return image
+
+
+def unfilter(data: bytes, row_bytes: int, height: int, bpp: int) -> List[bytearray]:
+    """Undo the per-row PNG filters."""
+    rows = []
+    previous = bytearray(row_bytes)
+    for y in range(height):
+        start = y * (row_bytes + 1)
+        kind = data[start]
+        row = bytearray(data[start + 1:start + 1 + row_bytes])
+        if kind == 1:
+            for i in range(bpp, row_bytes):
+                row[i] = (row[i] + row[i - bpp]) & 0xFF
+        elif kind == 2:
+            for i in range(row_bytes):
+                row[i] = (row[i] + previous[i]) & 0xFF
+        elif kind == 3:
+            for i in range(row_bytes):
+                left = row[i - bpp] if i >= bpp else 0
+                row[i] = (row[i] + ((left + previous[i]) >> 1)) & 0xFF
+        elif kind == 4:
+            for i in range(row_bytes):
+                left = row[i - bpp] if i >= bpp else 0
+                up_left = previous[i - bpp] if i >= bpp else 0
+                row[i] = (row[i] + paeth(left, previous[i], up_left)) & 0xFF
+        elif kind != 0:
+            raise ValueError(f"Unknown PNG filter type {kind}")
+        rows.append(row)
+        previous = row
+    return rows
+
+
+def paeth(a: int, b: int, c: int) -> int:
+    p = a + b - c
+    pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+    if pa <= pb and pa <= pc:
+        return a
+    return b if pb <= pc else c
+
+
+def encode_png(image: Image) -> bytes:
+    """Encode an image as an 8-bit RGBA PNG."""
+    def chunk(kind: bytes, body: bytes) -> bytes:
+        return struct.pack('>I', len(body)) + kind + body + struct.pack('>I', zlib.crc32(kind + body))
+
+    raw = b''.join(b'\x00' + bytes(row) for row in image.rows)
+    header = struct.pack('>IIBBBBB', image.width, image.height, 8, 6, 0, 0, 0)
+    return (PNG_SIGNATURE + chunk(b'IHDR', header) + chunk(b'IDAT', zlib.compress(raw, 9)) +
+            chunk(b'IEND', b''))
+
+
+# -----------------
+# Sprite Atlas
+# -----------------
+
+_OPERATORS = {ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul, ast.FloorDiv: operator.floordiv}
+
+
+def evaluate(expression: str, constants: Dict[str, int]) -> int:
+    """Evaluate the integer arithmetic used in spriteMapping.js."""
+    def visit(node):
+        if isinstance(node, ast.Constant) and isinstance(node.value, int):
+            return node.value
+        if isinstance(node, ast.Name) and node.id in constants:
+            return constants[node.id]
+        if isinstance(node, ast.BinOp) and type(node.op) in _OPERATORS:
+            return _OPERATORS[type(node.op)](visit(node.left), visit(node.right))
+        raise ValueError(f"Unsupported sprite coordinate: {expression!r}")
+    return visit(ast.parse(expression.strip(), mode='eval').body)
+
+
+def parse_sprite_mapping(source: str) -> Tuple[Dict[str, int], Dict]:
+    """
+    Read the exported constants and SPRITE_MAPPING from spriteMapping.js.
+
+    Returns the constants and the mapping as nested dicts whose leaves are
+    [x, y] positions in the source sheet.
+    """
+    source = re.sub(r'//[^\n]*', '', source)
+    constants = {}
+    for name, value in re.findall(r'export const (\w+) = ([^;{]+);', source):
+        constants[name] = evaluate(value, constants)
+
+    body = source[source.index('SPRITE_MAPPING'):]
+    mapping: Dict = {}
+    path = [mapping]
+    for token in re.finditer(r'(\w+):\s*\[([^\]]*)\]|(\w+):\s*\{|\}', body[body.index('{') + 1:]):
+        leaf, coordinates, group = token.groups()
+        if leaf:
+            x, y = coordinates.split(',')
+            path[-1][leaf] = [evaluate(x, constants), evaluate(y, constants)]
+        elif group:
+            path[-1][group] = {}
+            path.append(path[-1][group])
+        elif len(path) == 1:
+            break
+        else:
+            path.pop()
+    return constants, mapping
+
+
+def build_atlas(mapping: Dict, sheet: Image, tile_size: int, spacing: int) -> Tuple[Image, Dict]:
+    """
+    Pack the sprites a mapping uses into a square-ish atlas.
+
+    Sprites keep the sheet's gap between them so scaled drawing never bleeds in
+    a neighbour's pixels. Returns the atlas and the mapping moved onto it.
+    """
+    positions: Dict[Tuple[int, int], List[int]] = {}
+
+    def collect(node):
+        for value in node.values():
+            if isinstance(value, dict):
+                collect(value)
+            else:
+                positions.setdefault(tuple(value), None)
+    collect(mapping)
+
+    columns = max(1, math.ceil(math.sqrt(len(positions))))
+    rows = max(1, math.ceil(len(positions) / columns))
+    cell = tile_size + spacing
+    atlas = Image(columns * cell - spacing, rows * cell - spacing)
+    for index, (sx, sy) in enumerate(positions):
+        dx, dy = index % columns * cell, index // columns * cell
+        atlas.blit(sheet, sx, sy, tile_size, tile_size, dx, dy)
+        positions[(sx, sy)] = [dx, dy]
+
+    def relocate(node):
+        return {key: relocate(value) if isinstance(value, dict) else positions[tuple(value)]
+                for key, value in node.items()}
+    return atlas, relocate(mapping)
+
+
+# -----------------
+# Build
+# -----------------
+
+def write_hashed(out_dir: str, name: str, data: bytes, manifest: Dict[str, str], key: str) -> None:
+    """Write generated data under its hashed name and record it in the manifest."""
+    target = hashed_name(name, hashlib.sha256(data).hexdigest()[:DIGEST_LENGTH])
+    path = os.path.join(out_dir, target)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+    manifest[key] = target
+
+
+def build(out_dir: str) -> Dict[str, str]:
+    manifest: Dict[str, str] = {}
+
+    with open(SPRITE_MAPPING) as f:
+        constants, mapping = parse_sprite_mapping(f.read())
+    atlas, atlas_mapping = build_atlas(mapping, read_png(SPRITE_SHEET), constants['TILE_SIZE'], constants['SPACING'])
+    write_hashed(out_dir, 'atlas.png', encode_png(atlas), manifest, 'atlas.png')
+    atlas_map = {'tileSize': constants['TILE_SIZE'], 'sprites': atlas_mapping}
+    write_hashed(out_dir, 'atlas.json', json.dumps(atlas_map, sort_keys=True).encode(), manifest, 'atlas.json')
+
+    for pattern in HASHED_ASSETS:
+        for path in sorted(glob.glob(os.path.join(STATIC_DIR, pattern))):
+            name = os.path.relpath(path, STATIC_DIR).replace(os.sep, '/')
+            # Served from /assets/, so static/assets/music/x.mp3 becomes /assets/music/x.<digest>.mp3
+            target = hashed_name(name.split('/', 1)[1] if name.startswith('assets/') else name, file_digest(path))
+            destination = os.path.join(out_dir, target)
+            if not os.path.exists(destination):
+                os.makedirs(os.path.dirname(destination), exist_ok=True)
+                with open(path, 'rb') as source, open(destination, 'wb') as f:
+                    f.write(source.read())
+            manifest[name] = target
+
+    # Written last, so a server never sees a manifest naming files not yet there
+    temporary = os.path.join(out_dir, MANIFEST_NAME + '.tmp')
+    with open(temporary, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(temporary, os.path.join(out_dir, MANIFEST_NAME))
+    return manifest
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--out', default=os.path.join(ROOT, SERVER_CONFIG['ASSET_DIR']),
+                        help='output directory (default: SERVER_CONFIG ASSET_DIR)')
+    args = parser.parse_args()
+
+    manifest = build(args.out)
+    for name, target in sorted(manifest.items()):
+        size = os.path.getsize(os.path.join(args.out, target))
+        print(f"{name:<45} -> {target} ({size:,} bytes)")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,5 @@
+import os
+
 GAME_CONFIG = {
     'TILE_SIZE': 32,
     'MAP_WIDTH': 20,
@@ -8,4 +10,48 @@ GAME_CONFIG = {
     'PLAYER_BASE_DAMAGE': 20,
     'ENEMY_BASE_DAMAGE': 10,
     'PLAYER_EVASION_CHANCE': 0.3,  # 30% chance to dodge enemy attacks
-}
\ No newline at end of file
+    'PATHFINDING_MAX_DISTANCE': 64,  # Chasers further than this use greedy steps
+    'PATH_REPATH_TOLERANCE': 2,  # How far the player may drift before a cached path is recomputed
+    'ASTAR_MAX_NODES': 4096,  # Search budget per A* query
+    'FOV_RADIUS': 8,  # How far the player can see, in tiles
+    'ENEMY_SCHEDULER': 'energy',  # 'energy' (speed-based, dormant when far away) or 'lockstep'
+    'ENEMY_SPEED': {'chase': 100, 'patrol': 100, 'spell_caster': 100},  # 100 acts once per player turn
+    'NOISE_RADIUS': 4,  # Player attacks wake enemies this close, even out of sight
+    'BEHAVIOR_FILE': None,  # Enemy behavior definitions; None uses game/engine/behaviors.json
+    'VECTORIZE_MIN_CHASERS': 256,  # Turns with this many awake distance-map followers use NumPy if installed; 0 never does
+    'EVENT_LOG_SIZE': 64,  # Turn events kept per game; older ones are overwritten
+    'TRAVEL_MAX_STEPS': 100,  # Turns one travel or auto-explore command may take
+    'TRAVEL_ALERT_DISTANCE': 6,  # Travel stops once a visible enemy is this close
+    'DUNGEON_SEED': 1337,  # Procedural levels are reproducible per (seed, level)
+    'DUNGEON_WIDTH': 48,
+    'DUNGEON_HEIGHT': 32,
+    'LEVEL_CACHE_SIZE': 64,  # Compiled levels kept in memory
+    'PREFETCH_NEXT_LEVEL': True,  # Build the next level on a background thread while this one is played
+    'WORLD_SIZE': 0,  # Cells per side of the streamed overworld; 0 plays the numbered levels
+    'WORLD_CHUNK_SIZE': 32,  # Overworld chunks are generated and cached in squares of this many cells
+    'WORLD_VIEW_CHUNKS': 3,  # The game plays on this many chunks per side around the player
+    'WORLD_CHUNK_CACHE_SIZE': 4096,  # Generated chunks kept in memory, shared by all sessions
+    'WORLD_ENEMIES_PER_CHUNK': 3,
+}
+
+SERVER_CONFIG = {
+    # Where game states live: 'memory' (single process), 'file' or 'redis' (multi-worker)
+    'STATE_STORE': os.environ.get('ROGUELIKE_STATE_STORE', 'memory'),
+    'STATE_DIR': os.environ.get('ROGUELIKE_STATE_DIR', 'instance/sessions'),
+    'LEVEL_DIR': os.environ.get('ROGUELIKE_LEVEL_DIR', 'instance/levels'),  # Levels saved from the editor
+    'ASSET_DIR': os.environ.get('ROGUELIKE_ASSET_DIR', 'static/dist'),  # Output of build_assets.py
+    'MAX_LEVEL_CELLS': 1000 * 1000,  # Largest layout the editor API accepts
+    # Editor saves replace levels for every player, so they are off unless asked for
+    'EDITOR_SAVE_ENABLED': os.environ.get('ROGUELIKE_EDITOR_SAVE', '') not in ('', '0', 'false'),
+    'REDIS_URL': os.environ.get('ROGUELIKE_REDIS_URL', 'redis://localhost:6379/0'),
+    'SESSION_COOKIE_NAME': 'roguelike_session',
+    'SESSION_HEADER_NAME': 'X-Session-Token',
+    'MAX_SESSIONS': 5000,
+    'SESSION_IDLE_TIMEOUT': 30 * 60,  # Seconds without a request before a run is dropped
+    'SESSION_MEMORY_CAP_MB': 256,  # Estimated memory budget for all sessions
+    'MAX_COMMANDS_PER_BATCH': 64,  # Queued clicks accepted in one /commands request
+    'STREAM_KEEPALIVE_SECONDS': 15,  # Comment frames keep idle /stream connections open
+    'STREAM_POLL_SECONDS': 0.5,  # How often streams check a shared store for other workers' turns
+    # Request and engine timings at /metrics; nothing is instrumented when off
+    'METRICS_ENABLED': os.environ.get('ROGUELIKE_METRICS', '') not in ('', '0', 'false'),
+}
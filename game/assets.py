@@ -0,0 +1,77 @@
+"""
+Content-hashed static assets.
+
+build_assets.py copies assets to names carrying a digest of their contents and
+writes manifest.json mapping each original path (relative to static/) to its
+hashed name. Hashed files never change, so they are served with year-long
+cache headers; pages look URLs up here and fall back to the plain files when
+no build has been run.
+"""
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+MANIFEST_NAME = 'manifest.json'
+DIGEST_LENGTH = 12
+ASSET_CACHE_SECONDS = 365 * 24 * 60 * 60
+
+_digests: Dict[str, Tuple[int, int, str]] = {}
+_digests_lock = threading.Lock()
+
+
+def file_digest(path: str) -> str:
+    """Hex digest of a file's contents, cached until its size or mtime changes."""
+    stat = os.stat(path)
+    with _digests_lock:
+        cached = _digests.get(path)
+    if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+        return cached[2]
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 16), b''):
+            digest.update(block)
+    result = digest.hexdigest()[:DIGEST_LENGTH]
+    with _digests_lock:
+        _digests[path] = (stat.st_mtime_ns, stat.st_size, result)
+    return result
+
+
+def hashed_name(path: str, digest: str) -> str:
+    """'music/song.mp3' -> 'music/song.<digest>.mp3'"""
+    stem, ext = os.path.splitext(path)
+    return f"{stem}.{digest}{ext}"
+
+
+def digest_of(name: str) -> Optional[str]:
+    """The digest embedded in a hashed name, or None for a plain name."""
+    parts = os.path.basename(name).rsplit('.', 2)
+    if len(parts) == 3 and len(parts[1]) == DIGEST_LENGTH:
+        return parts[1]
+    return None
+
+
+class AssetManifest:
+    """URLs of built assets, read from the manifest in directory."""
+
+    def __init__(self, directory: str, url_prefix: str = '/assets/'):
+        self.directory = directory
+        self.url_prefix = url_prefix
+        self.files: Dict[str, str] = {}
+        path = os.path.join(directory, MANIFEST_NAME)
+        if os.path.exists(path):
+            with open(path) as f:
+                self.files = json.load(f)
+
+    def url(self, path: str, default: Optional[str] = None) -> str:
+        """URL for a path relative to static/, hashed if it was built."""
+        hashed = self.files.get(path)
+        if hashed is not None:
+            return self.url_prefix + hashed
+        return default or '/static/' + path
+
+    def urls(self) -> Dict[str, str]:
+        """Every built asset's URL, for handing to the client."""
+        return {path: self.url_prefix + hashed for path, hashed in self.files.items()}
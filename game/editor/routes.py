@@ -1,7 +1,84 @@
-from flask import Blueprint, render_template
+from flask import Blueprint, render_template, current_app, jsonify, request
+from ..levels.level_store import MAX_LEVEL_NUMBER, LevelInfo, LevelStore
+from config import SERVER_CONFIG
+from .validation import validate_layout, level_to_layout
 
 editor_bp = Blueprint('editor', __name__)
 
+
+def level_store() -> LevelStore:
+    return current_app.extensions['level_store']
+
+
+def info_to_dict(info: LevelInfo) -> dict:
+    return {
+        'number': info.number,
+        'name': info.name,
+        'width': info.width,
+        'height': info.height,
+        'geometry_version': info.geometry_version
+    }
+
+
+def read_layout():
+    """Return the layout string from the request body, or None if there is none."""
+    data = request.get_json(silent=True) or {}
+    layout = data.get('layout')
+    return (layout if isinstance(layout, str) else None), data
+
+
 @editor_bp.route('/editor')
 def editor():
-    return render_template('editor.html')
\ No newline at end of file
+    return render_template('editor.html')
+
+
+@editor_bp.route('/editor/levels')
+def list_levels():
+    return jsonify({'levels': [info_to_dict(info) for info in level_store().levels()]})
+
+
+@editor_bp.route('/editor/levels/validate', methods=['POST'])
+def validate_level():
+    """Check a layout without saving it."""
+    layout, _ = read_layout()
+    if layout is None:
+        return jsonify({'error': 'Expected a layout string'}), 400
+
+    level, problems = validate_layout(layout)
+    result = {'valid': not problems, 'problems': problems}
+    if level is not None:
+        result.update(width=level.width, height=level.height, geometry_version=level.geometry_version)
+    return jsonify(result)
+
+
+@editor_bp.route('/editor/levels/<int:number>', methods=['PUT'])
+def save_level(number):
+    """
+    Validate, compile and store a layout as the given level number.
+
+    Saved levels replace the built-in ones for every session, so saving is
+    refused unless SERVER_CONFIG['EDITOR_SAVE_ENABLED'] is set.
+    """
+    if not SERVER_CONFIG['EDITOR_SAVE_ENABLED']:
+        return jsonify({'error': 'Saving levels is disabled on this server'}), 403
+    layout, data = read_layout()
+    if layout is None:
+        return jsonify({'error': 'Expected a layout string'}), 400
+    if not 1 <= number <= MAX_LEVEL_NUMBER:
+        return jsonify({'error': f'Level numbers run from 1 to {MAX_LEVEL_NUMBER}'}), 400
+
+    level, problems = validate_layout(layout)
+    if problems:
+        return jsonify({'valid': False, 'problems': problems}), 422
+
+    info = level_store().save(number, level, str(data.get('name') or ''))
+    return jsonify(info_to_dict(info)), 201
+
+
+@editor_bp.route('/editor/levels/<int:number>')
+def get_level(number):
+    store = level_store()
+    info = store.info(number)
+    if info is None:
+        return jsonify({'error': f'Level {number} has not been saved'}), 404
+    return jsonify({**info_to_dict(info), 'layout': level_to_layout(store.load(info))})
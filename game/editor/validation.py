@@ -0,0 +1,49 @@
+from typing import List, Optional, Tuple
+from ..engine.level_generator import Level, LevelGenerator, TILE_TO_CHAR
+from ..engine.tile_types import TILE_TYPES
+from ..levels.level_store import MAX_LEVEL_SIDE
+from config import SERVER_CONFIG
+
+
+def validate_layout(layout: str) -> Tuple[Optional[Level], List[str]]:
+    """
+    Compile an uploaded ASCII layout and list everything wrong with it.
+
+    Runs the same checks as LevelGenerator.validate_level, then rejects unknown
+    tile characters, extra player starts and enemy spawns the player cannot walk
+    to. Returns the compiled level (None if it could not be parsed) and the
+    problems found; the level is playable when the list is empty.
+    """
+    lines = [line.strip() for line in layout.split('\n') if line.strip()]
+    if not lines:
+        return None, ["Layout is empty"]
+
+    max_cells = SERVER_CONFIG['MAX_LEVEL_CELLS']
+    width = max(len(line) for line in lines)
+    if len(lines) * width > max_cells:
+        return None, [f"Layout is larger than {max_cells} cells"]
+    if max(width, len(lines)) > MAX_LEVEL_SIDE:
+        return None, [f"Layout is more than {MAX_LEVEL_SIDE} cells wide or tall"]
+
+    problems = []
+    for y, line in enumerate(lines):
+        unknown = set(line).difference(TILE_TYPES)
+        if unknown:
+            # One report per row is enough
+            x = min(line.index(char) for char in unknown)
+            problems.append(f"Unknown tile {line[x]!r} at ({x}, {y})")
+
+    level = Level(layout)
+    problems.extend(LevelGenerator.level_problems(level))
+    if layout.count('P') > 1:
+        problems.append("Layout has more than one player start (P)")
+    if not problems:
+        problems.extend(f"Enemy spawn at {spawn} cannot be reached from the player start"
+                        for spawn in LevelGenerator.unreachable_spawns(level))
+    return level, problems
+
+
+def level_to_layout(level: Level) -> str:
+    """Turn a compiled level back into the ASCII layout the editor works with."""
+    text = level.tiles.translate(TILE_TO_CHAR).decode('ascii')
+    return '\n'.join(text[y * level.width:(y + 1) * level.width] for y in range(level.height))
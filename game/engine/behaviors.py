@@ -0,0 +1,154 @@
+"""
+Enemy behaviors, loaded from a data file and compiled into dispatch tables.
+
+behaviors.json gives each behavior a move rule, an attack kind and a range.
+BehaviorTable turns these into lists indexed by behavior code, so an enemy's
+turn costs the same few lookups whatever its behavior, and a new behavior is
+a data entry instead of another branch in the enemy loop. Behavior names must
+be members of entities.entity.Behavior, whose codes are what saves store.
+"""
+import json
+import os
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+from ..entities.entity import Behavior, BEHAVIOR_NAMES, BEHAVIORS_BY_NAME
+
+DEFAULT_BEHAVIOR_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'behaviors.json')
+
+# -----------------
+# Move Rules
+# -----------------
+# Each takes (game, entity_id, entity, player, distance_map) and returns the
+# cell to step to, or None to stay put.
+
+
+def hold(game, entity_id, entity, player, distance_map) -> Optional[Tuple[int, int]]:
+    """Never move, for guards and ranged attackers that wait for the player."""
+    return None
+
+
+def greedy(game, entity_id, entity, player, distance_map) -> Optional[Tuple[int, int]]:
+    """Step straight towards the player."""
+    return game.greedy_step(entity.x, entity.y, player.x, player.y)
+
+
+def follow_distance_map(game, entity_id, entity, player, distance_map) -> Optional[Tuple[int, int]]:
+    """Descend the turn's shared distance map, stepping greedily where it gives no way forward."""
+    if distance_map is not None:
+        step = distance_map.best_step(entity.x, entity.y, game.spatial.is_blocked)
+        if step is not None:
+            return step
+    return game.greedy_step(entity.x, entity.y, player.x, player.y)
+
+
+def follow_path(game, entity_id, entity, player, distance_map) -> Optional[Tuple[int, int]]:
+    """Follow a cached A* path within PATHFINDING_MAX_DISTANCE, otherwise step greedily."""
+    if max(abs(player.x - entity.x), abs(player.y - entity.y)) <= game.config['PATHFINDING_MAX_DISTANCE']:
+        step = game.path_cache.next_step(
+            entity_id, (entity.x, entity.y), (player.x, player.y),
+            game.spatial.wall_mask, game.width, game.height
+        )
+        if step is not None and game.is_valid_move(*step):
+            game.path_cache.advance(entity_id)
+            return step
+    return game.greedy_step(entity.x, entity.y, player.x, player.y)
+
+
+MOVES: Dict[str, Callable] = {
+    'hold': hold,
+    'greedy': greedy,
+    'distance_map': follow_distance_map,
+    'path': follow_path,
+}
+
+# Attack kinds, and whether the attacker must be in the player's view to strike
+ATTACKS: Dict[str, bool] = {
+    'melee': False,
+    'ranged': True,
+}
+
+
+# -----------------
+# Compiled Tables
+# -----------------
+
+class BehaviorStats:
+    """
+    Per-behavior action counters, shared by every game in the process.
+
+    Counting is always on. Time spent per behavior is only measured while
+    timing is set, which the metrics endpoint does when it is enabled.
+    """
+
+    def __init__(self):
+        size = len(BEHAVIOR_NAMES)
+        self.timing = False
+        self.attacks = [0] * size
+        self.moves = [0] * size
+        self.waits = [0] * size  # Turns with nothing to attack and nowhere to step
+        self.seconds = [0.0] * size
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        return {
+            name: {'attacks': self.attacks[code], 'moves': self.moves[code], 'waits': self.waits[code],
+                   'seconds': self.seconds[code]}
+            for code, name in enumerate(BEHAVIOR_NAMES)
+            if name and self.attacks[code] + self.moves[code] + self.waits[code]
+        }
+
+
+STATS = BehaviorStats()
+
+
+class BehaviorTable:
+    """Behavior definitions compiled into lists indexed by behavior code."""
+
+    def __init__(self, data: Dict):
+        size = len(BEHAVIOR_NAMES)
+        self.moves: List[Callable] = [hold] * size
+        self.follows_distance_map: List[bool] = [False] * size
+        self.ranges: List[int] = [-1] * size  # Chebyshev reach; -1 never attacks
+        self.needs_sight: List[bool] = [False] * size
+        self.hit_messages: List[str] = [''] * size
+        self.miss_messages: List[str] = [''] * size
+
+        defaults = data.get('defaults', {})
+        for name, spec in data['behaviors'].items():
+            code = self.code(name)
+            spec = {**defaults, **spec}
+            if spec['move'] not in MOVES:
+                raise ValueError(f"Behavior {name!r} has unknown move rule {spec['move']!r}")
+            if spec['attack'] not in ATTACKS:
+                raise ValueError(f"Behavior {name!r} has unknown attack {spec['attack']!r}")
+            if not isinstance(spec['range'], int) or spec['range'] < 0:
+                raise ValueError(f"Behavior {name!r} needs a non-negative whole range")
+            self.moves[code] = MOVES[spec['move']]
+            self.follows_distance_map[code] = spec['move'] == 'distance_map'
+            self.ranges[code] = spec['range']
+            self.needs_sight[code] = ATTACKS[spec['attack']]
+            self.hit_messages[code] = spec['hit_message']
+            self.miss_messages[code] = spec['miss_message']
+
+        # Spawn points cycle through these behaviors
+        self.spawn_order: Tuple[Behavior, ...] = tuple(self.code(name) for name in data['spawn_order'])
+        for code in self.spawn_order:
+            if BEHAVIOR_NAMES[code] not in data['behaviors']:
+                raise ValueError(f"Spawned behavior {BEHAVIOR_NAMES[code]!r} is not defined")
+
+    @staticmethod
+    def code(name: str) -> Behavior:
+        behavior = BEHAVIORS_BY_NAME.get(name)
+        if behavior is None or behavior in (Behavior.NONE, Behavior.DEAD):
+            raise ValueError(f"Unknown behavior {name!r}; enemy behaviors must be listed in Behavior")
+        return behavior
+
+    def spawn_behavior(self, index: int) -> Behavior:
+        """Behavior of the index-th spawn point of a level or chunk."""
+        return self.spawn_order[index % len(self.spawn_order)]
+
+
+@lru_cache(maxsize=8)
+def load_behaviors(path: Optional[str] = None) -> BehaviorTable:
+    """Compile a behavior file, GAME_CONFIG['BEHAVIOR_FILE'] or the bundled one; compiled once per path."""
+    with open(path or DEFAULT_BEHAVIOR_FILE) as f:
+        return BehaviorTable(json.load(f))
@@ -0,0 +1,127 @@
+import random
+from typing import List, Tuple
+
+Room = Tuple[int, int, int, int]  # x, y, width, height
+
+
+class DungeonGenerator:
+    """
+    Seeded binary-space-partition dungeon generator.
+
+    The map is split recursively into leaves, each leaf gets one room, and the
+    rooms of sibling subtrees are joined by L-shaped corridors, so every floor
+    cell is reachable by construction. Output is an ASCII layout in the same
+    format as LEVEL_LAYOUTS and is deterministic per (seed, level number), so
+    generated levels can be regenerated instead of stored.
+    """
+
+    def __init__(self, width: int, height: int, seed: int,
+                 min_leaf: int = 8, min_room: int = 4, max_room: int = 14):
+        if min_leaf < min_room + 2:
+            raise ValueError("min_leaf must leave room for a wall on each side of the smallest room")
+        if width < min_leaf or height < min_leaf:
+            raise ValueError(f"Dungeon must be at least {min_leaf}x{min_leaf}")
+        self.width = width
+        self.height = height
+        self.seed = seed
+        self.min_leaf = min_leaf
+        self.min_room = min_room
+        self.max_room = max_room
+
+    def generate(self, level_number: int, attempt: int = 0) -> str:
+        """Generate the layout for a level number."""
+        rng = random.Random(f"{self.seed}:{level_number}:{attempt}")
+        grid = [bytearray(b'#' * self.width) for _ in range(self.height)]
+        rooms: List[Room] = []
+
+        self._split(rng, grid, rooms, 0, 0, self.width, self.height)
+        self._place_spawns(rng, grid, rooms, level_number)
+
+        return '\n'.join(row.decode('ascii') for row in grid)
+
+    # -----------------
+    # Partitioning and carving
+    # -----------------
+
+    def _split(self, rng: random.Random, grid: List[bytearray], rooms: List[Room],
+               x: int, y: int, w: int, h: int) -> Tuple[int, int]:
+        """Partition a leaf, carve its rooms and return a floor cell inside one of them."""
+        can_split_x = w >= 2 * self.min_leaf
+        can_split_y = h >= 2 * self.min_leaf
+
+        if not (can_split_x or can_split_y):
+            return self._carve_room(rng, grid, rooms, x, y, w, h)
+
+        # Split across the longer side, breaking ties randomly
+        if can_split_x and can_split_y:
+            split_x = w > h if w != h else rng.random() < 0.5
+        else:
+            split_x = can_split_x
+
+        if split_x:
+            cut = rng.randint(self.min_leaf, w - self.min_leaf)
+            first = self._split(rng, grid, rooms, x, y, cut, h)
+            second = self._split(rng, grid, rooms, x + cut, y, w - cut, h)
+        else:
+            cut = rng.randint(self.min_leaf, h - self.min_leaf)
+            first = self._split(rng, grid, rooms, x, y, w, cut)
+            second = self._split(rng, grid, rooms, x, y + cut, w, h - cut)
+
+        self._carve_corridor(rng, grid, first, second)
+        return first if rng.random() < 0.5 else second
+
+    def _carve_room(self, rng: random.Random, grid: List[bytearray], rooms: List[Room],
+                    x: int, y: int, w: int, h: int) -> Tuple[int, int]:
+        # Keep a one-cell wall margin inside the leaf so rooms never merge
+        room_w = rng.randint(self.min_room, min(self.max_room, w - 2))
+        room_h = rng.randint(self.min_room, min(self.max_room, h - 2))
+        room_x = x + rng.randint(1, w - room_w - 1)
+        room_y = y + rng.randint(1, h - room_h - 1)
+
+        floor = b'.' * room_w
+        for row in range(room_y, room_y + room_h):
+            grid[row][room_x:room_x + room_w] = floor
+
+        rooms.append((room_x, room_y, room_w, room_h))
+        return room_x + room_w // 2, room_y + room_h // 2
+
+    @staticmethod
+    def _carve_corridor(rng: random.Random, grid: List[bytearray],
+                        start: Tuple[int, int], end: Tuple[int, int]) -> None:
+        (x1, y1), (x2, y2) = start, end
+        # Pick which leg of the L goes first
+        corner = (x2, y1) if rng.random() < 0.5 else (x1, y2)
+
+        for (ax, ay), (bx, by) in ((start, corner), (corner, end)):
+            if ay == by:
+                low, high = min(ax, bx), max(ax, bx)
+                grid[ay][low:high + 1] = b'.' * (high - low + 1)
+            else:
+                for row in range(min(ay, by), max(ay, by) + 1):
+                    grid[row][ax] = ord('.')
+
+    # -----------------
+    # Spawns
+    # -----------------
+
+    @staticmethod
+    def _place_spawns(rng: random.Random, grid: List[bytearray], rooms: List[Room],
+                      level_number: int) -> None:
+        # The player starts in the middle of the first room
+        px, py, pw, ph = rooms[0]
+        player = (px + pw // 2, py + ph // 2)
+        grid[player[1]][player[0]] = ord('P')
+
+        # Enemies go in the other rooms when there are any; more enemies on deeper levels
+        spawn_rooms = rooms[1:] or rooms
+        capacity = sum(w * h for _, _, w, h in spawn_rooms) - (0 if rooms[1:] else 1)
+        count = min(2 + level_number, capacity)
+
+        placed = 0
+        while placed < count:
+            rx, ry, rw, rh = spawn_rooms[rng.randrange(len(spawn_rooms))]
+            x = rng.randrange(rx, rx + rw)
+            y = rng.randrange(ry, ry + rh)
+            if grid[y][x] == ord('.'):
+                grid[y][x] = ord('E')
+                placed += 1
@@ -0,0 +1,229 @@
+"""
+Structured turn events in a fixed-size ring buffer.
+
+Every message the player sees starts as an event: a type code, the tick, the
+acting and targeted entity IDs, an amount and one type-specific detail value.
+Events are written into typed arrays that never grow, and turned into text
+only when a payload needs it. Each event has a sequence number that keeps
+counting across levels, so clients, replays and metrics can read everything
+after a cursor; readers that fall more than a buffer behind miss events.
+"""
+from array import array
+from enum import IntEnum
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+
+class EventType(IntEnum):
+    TEXT = 0  # Free text, such as a rejected action
+    LEVEL_WARNING = 1  # detail: level number
+    PLAYER_MOVED = 2  # detail: direction, see direction_code()
+    MOVE_BLOCKED = 3
+    PLAYER_ATTACK = 4  # actor attacks target for amount
+    ENEMY_DEFEATED = 5  # target died
+    ENEMY_HIT = 6  # actor hits target for amount; detail: actor's behavior code
+    ENEMY_MISS = 7  # target dodged actor; detail: actor's behavior code
+    PLAYER_DEFEATED = 8
+    TRAVEL_STOPPED = 9  # amount: steps taken; detail: TravelStop reason
+    LEVEL_CLEARED = 10  # detail: number of the level the player moves on to
+
+
+class TravelStop(IntEnum):
+    """Why a multi-turn travel or auto-explore command ended."""
+    ARRIVED = 0
+    EXPLORED = 1  # Nothing reachable is left unexplored
+    ENEMY = 2  # A visible enemy came within TRAVEL_ALERT_DISTANCE
+    DAMAGED = 3
+    BLOCKED = 4  # Something stands on the next step
+    UNREACHABLE = 5
+    STEP_LIMIT = 6
+    DEFEATED = 7
+
+
+TRAVEL_STOP_NAMES = tuple(reason.name.lower() for reason in TravelStop)
+TRAVEL_STOP_MESSAGES = (
+    "You arrive.",
+    "Nothing left to explore.",
+    "You stop, an enemy is in sight.",
+    "You stop, you are hurt.",
+    "You stop, the way is blocked.",
+    "You know no way there.",
+    "You stop to take your bearings.",
+    "",
+)
+
+
+EVENT_TYPE_NAMES = tuple(event_type.name.lower() for event_type in EventType)
+
+
+class Event(NamedTuple):
+    seq: int
+    type: EventType
+    tick: int
+    actor: int  # Entity IDs, 0 for none
+    target: int
+    amount: float
+    detail: int
+    text: Optional[str]
+
+    def to_dict(self) -> Dict:
+        return {'seq': self.seq, 'type': EVENT_TYPE_NAMES[self.type], 'tick': self.tick, 'actor': self.actor,
+                'target': self.target, 'amount': self.amount, 'detail': self.detail}
+
+
+def direction_code(dx: int, dy: int) -> int:
+    """Pack a single step into an event detail."""
+    return (dy + 1) * 3 + dx + 1
+
+
+def direction_name(code: int) -> str:
+    dy, dx = divmod(code, 3)
+    names = [('north', '', 'south')[dy], ('west', '', 'east')[dx]]
+    return '-'.join(name for name in names if name) or 'nowhere'
+
+
+def describe(event: Event, behavior_table) -> str:
+    """The message text for an event, as the player reads it."""
+    event_type = event.type
+    if event_type == EventType.PLAYER_MOVED:
+        return f"Moved {direction_name(event.detail)}"
+    if event_type == EventType.ENEMY_HIT:
+        return behavior_table.hit_messages[event.detail].format(damage=event.amount)
+    if event_type == EventType.ENEMY_MISS:
+        return behavior_table.miss_messages[event.detail].format(damage=event.amount)
+    if event_type == EventType.PLAYER_ATTACK:
+        return f"You attack the enemy for {event.amount:g} damage!"
+    if event_type == EventType.ENEMY_DEFEATED:
+        return "Enemy defeated!"
+    if event_type == EventType.MOVE_BLOCKED:
+        return "That direction is blocked!"
+    if event_type == EventType.PLAYER_DEFEATED:
+        return "You have been defeated! Click Reset to try again."
+    if event_type == EventType.TRAVEL_STOPPED:
+        return TRAVEL_STOP_MESSAGES[event.detail]
+    if event_type == EventType.LEVEL_CLEARED:
+        return f"Level cleared! Descending to level {event.detail}."
+    if event_type == EventType.LEVEL_WARNING:
+        return f"Warning: Level {event.detail} may have issues!"
+    return event.text or ''
+
+
+class EventLog:
+    """
+    The last capacity events of a game, in typed columns indexed by seq % capacity.
+
+    Memory stays fixed however long a run lasts. Free text is rare and kept in a
+    dict that drops entries as their slots are overwritten.
+    """
+
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError("Event log capacity must be positive")
+        self.capacity = capacity
+        self.types = array('B', bytes(capacity))
+        self.ticks = array('q', [0]) * capacity
+        self.actors = array('i', [0]) * capacity
+        self.targets = array('i', [0]) * capacity
+        self.amounts = array('d', [0.0]) * capacity
+        self.details = array('i', [0]) * capacity
+        self.texts: Dict[int, str] = {}  # seq -> text
+        self.next_seq = 0  # Cursor just past the newest event
+        self.first_seq = 0  # Oldest event still readable; moves up on clear() and as slots wrap
+
+    def append(self, event_type: EventType, tick: int, actor: int = 0, target: int = 0,
+               amount: float = 0.0, detail: int = 0, text: Optional[str] = None) -> None:
+        seq = self.next_seq
+        slot = seq % self.capacity
+        self.types[slot] = event_type
+        self.ticks[slot] = tick
+        self.actors[slot] = actor
+        self.targets[slot] = target
+        self.amounts[slot] = amount
+        self.details[slot] = detail
+        self.texts.pop(seq - self.capacity, None)
+        if text is not None:
+            self.texts[seq] = text
+        self.next_seq = seq + 1
+        if seq + 1 - self.first_seq > self.capacity:
+            self.first_seq = seq + 1 - self.capacity
+
+    def clear(self) -> None:
+        """Forget all events; sequence numbers keep counting so cursors stay valid."""
+        self.first_seq = self.next_seq
+        self.texts.clear()
+
+    def __len__(self) -> int:
+        return self.next_seq - self.first_seq
+
+    def __getitem__(self, seq: int) -> Event:
+        if not self.first_seq <= seq < self.next_seq:
+            raise IndexError(seq)
+        slot = seq % self.capacity
+        return Event(seq, EventType(self.types[slot]), self.ticks[slot], self.actors[slot],
+                     self.targets[slot], self.amounts[slot], self.details[slot], self.texts.get(seq))
+
+    def since(self, cursor: int) -> Iterator[Event]:
+        """Events from cursor on, starting at the oldest one kept if cursor is older."""
+        for seq in range(max(cursor, self.first_seq), self.next_seq):
+            yield self[seq]
+
+    def last(self, count: int) -> Iterator[Event]:
+        return self.since(self.next_seq - count)
+
+    def first_after_tick(self, tick: int) -> int:
+        """Cursor of the first event stamped after tick."""
+        # Walk back from the end, deltas usually only cover the last tick or two
+        seq = self.next_seq
+        while seq > self.first_seq and self.ticks[(seq - 1) % self.capacity] > tick:
+            seq -= 1
+        return seq
+
+    def messages(self, behavior_table, events: Optional[List[Event]] = None) -> List[str]:
+        """Message texts for events, by default every event kept."""
+        return [describe(event, behavior_table) for event in (self.since(0) if events is None else events)]
+
+    # -----------------
+    # Snapshots
+    # -----------------
+
+    def copy(self) -> 'EventLog':
+        """Return an independent log with the same events and cursors."""
+        log = EventLog.__new__(EventLog)
+        log.capacity = self.capacity
+        log.types = self.types[:]
+        log.ticks = self.ticks[:]
+        log.actors = self.actors[:]
+        log.targets = self.targets[:]
+        log.amounts = self.amounts[:]
+        log.details = self.details[:]
+        log.texts = self.texts.copy()
+        log.next_seq = self.next_seq
+        log.first_seq = self.first_seq
+        return log
+
+    def snapshot(self) -> Tuple:
+        """(next_seq, types, ticks, actors, targets, amounts, details, texts) of the kept events, oldest first."""
+        seqs = range(self.first_seq, self.next_seq)
+        slots = [seq % self.capacity for seq in seqs]
+        return (self.next_seq,
+                bytes(self.types[slot] for slot in slots),
+                array('q', [self.ticks[slot] for slot in slots]).tobytes(),
+                array('i', [self.actors[slot] for slot in slots]).tobytes(),
+                array('i', [self.targets[slot] for slot in slots]).tobytes(),
+                array('d', [self.amounts[slot] for slot in slots]).tobytes(),
+                array('i', [self.details[slot] for slot in slots]).tobytes(),
+                {seq - self.first_seq: text for seq, text in self.texts.items()})
+
+    @classmethod
+    def restore(cls, capacity: int, data: Tuple) -> 'EventLog':
+        """Rebuild a log from snapshot(), keeping the newest capacity events."""
+        next_seq, types, ticks, actors, targets, amounts, details, texts = data
+        columns = (types, array('q', ticks), array('i', actors), array('i', targets),
+                   array('d', amounts), array('i', details))
+        log = cls(capacity)
+        count = len(types)
+        kept = min(count, capacity)
+        log.next_seq = log.first_seq = next_seq - kept
+        for index in range(count - kept, count):
+            event_type, tick, actor, target, amount, detail = (column[index] for column in columns)
+            log.append(EventType(event_type), tick, actor, target, amount, detail, texts.get(index))
+        return log
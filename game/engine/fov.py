@@ -0,0 +1,65 @@
+from functools import lru_cache
+from typing import FrozenSet, List, Tuple
+
+# Transforms mapping the first octant onto each of the eight octants (xx, xy, yx, yy)
+OCTANTS = (
+    (1, 0, 0, 1), (0, 1, 1, 0), (0, -1, 1, 0), (-1, 0, 0, 1),
+    (-1, 0, 0, -1), (0, -1, -1, 0), (0, 1, -1, 0), (1, 0, 0, -1),
+)
+
+
+@lru_cache(maxsize=4096)
+def compute_fov(sight_mask: bytes, width: int, height: int,
+                origin: Tuple[int, int], radius: int) -> FrozenSet[int]:
+    """
+    Return the flat indices of every cell visible from origin using recursive shadowcasting.
+
+    Opaque cells are visible themselves but hide what lies behind them. Results only
+    depend on the level's sight mask and the origin, so they are cached and shared by
+    every session on the same level; moving back onto a known cell costs one lookup.
+    """
+    ox, oy = origin
+    visible = {oy * width + ox}
+    radius_squared = radius * radius
+
+    for xx, xy, yx, yy in OCTANTS:
+        # Each entry is (row, start_slope, end_slope); rows are scanned outwards
+        stack: List[Tuple[int, float, float]] = [(1, 1.0, 0.0)]
+        while stack:
+            row, start, end = stack.pop()
+            if start < end:
+                continue
+            new_start = start
+            for distance in range(row, radius + 1):
+                blocked = False
+                dy = -distance
+                for dx in range(-distance, 1):
+                    left_slope = (dx - 0.5) / (dy + 0.5)
+                    right_slope = (dx + 0.5) / (dy - 0.5)
+                    if start < right_slope:
+                        continue
+                    if end > left_slope:
+                        break
+
+                    x = ox + dx * xx + dy * xy
+                    y = oy + dx * yx + dy * yy
+                    in_bounds = 0 <= x < width and 0 <= y < height
+                    opaque = not in_bounds or sight_mask[y * width + x] == 1
+                    if in_bounds and dx * dx + dy * dy <= radius_squared:
+                        visible.add(y * width + x)
+
+                    if blocked:
+                        if opaque:
+                            new_start = right_slope
+                        else:
+                            blocked = False
+                            start = new_start
+                    elif opaque and distance < radius:
+                        # Scan the lit part beyond this blocker as a narrower sector
+                        blocked = True
+                        stack.append((distance + 1, start, left_slope))
+                        new_start = right_slope
+                if blocked:
+                    break
+
+    return frozenset(visible)
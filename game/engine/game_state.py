@@ -1,10 +1,33 @@
-from typing import Dict, List, Tuple, Optional
+from typing import Callable, Dict, FrozenSet, Iterable, List, NamedTuple, Set, Tuple, Optional
 import random
-from math import sqrt
-from ..entities.entity import Entity
-from .level_generator import LevelGenerator
+from array import array
+from time import perf_counter
+from ..entities.entity import Entity, EntityType, Behavior, BEHAVIORS_BY_NAME, ENTITY_TYPES_BY_NAME
+from ..entities.entity_store import EntityStore, EntityView, FREE_SLOT
+from .level_generator import Level, LevelGenerator
+from .spatial_index import SpatialIndex
+from .pathfinding import DistanceMap, PathCache, find_path, path_to_nearest
+from . import behaviors
+from .events import EventLog, EventType, TravelStop, TRAVEL_STOP_NAMES, direction_code
+from .scheduler import TurnScheduler, TURN_LENGTH, action_delay
+from .world import WorldGenerator
+from . import vectorized
+from .fov import compute_fov
 from config import GAME_CONFIG
 
+# Player action codes recorded in a save_format.ActionLog
+ACTION_MOVE = 1
+ACTION_RESET = 2
+
+
+class TravelResult(NamedTuple):
+    """The outcome of one travel or auto-explore command, however many turns it took."""
+    steps: int
+    reason: TravelStop
+
+    def to_dict(self) -> Dict:
+        return {'steps': self.steps, 'reason': TRAVEL_STOP_NAMES[self.reason]}
+
 
 class GameState:
     """
@@ -14,83 +37,213 @@ class GameState:
     1. Initialization and Setup
     2. Entity Management
     3. Movement and Collision
-    4. Combat and Health
-    5. Level Management
-    6. State Serialization
+    4. Field of View
+    5. Combat and Health
+    6. Travel
+    7. Level Management
+    8. World Streaming
+    9. State Serialization
     """
 
     # -----------------
     # Initialization and Setup
     # -----------------
 
-    def __init__(self):
-        """Initialize the game state with default values."""
-        self.width = GAME_CONFIG['MAP_WIDTH']
-        self.height = GAME_CONFIG['MAP_HEIGHT']
-        self.entities: Dict[int, Entity] = {}
-        self.next_entity_id = 1
+    def __init__(self, rng: Optional[random.Random] = None, config: Optional[Dict] = None):
+        """
+        Initialize the game state with default values.
+
+        Pass an rng to make a run reproducible and independent of other games,
+        and a config to override GAME_CONFIG values for this game only.
+        """
+        self._init_fields(rng, config)
+        self.initialize_level()
+
+    def _init_fields(self, rng: Optional[random.Random], config: Optional[Dict]) -> None:
+        self.rng = rng or random.Random()
+        self.config = {**GAME_CONFIG, **config} if config else GAME_CONFIG
+        self.width = self.config['MAP_WIDTH']
+        self.height = self.config['MAP_HEIGHT']
+        self.entities = EntityStore()
         self.current_level = 1
-        self.messages: List[str] = []
-        self.walls: List[Tuple[int, int]] = []
+        self.events = EventLog(self.config['EVENT_LOG_SIZE'])
+        self.walls: Tuple[Tuple[int, int], ...] = ()
+        self.spatial = SpatialIndex(self.width, self.height)
+        self.path_cache = PathCache(self.config['PATH_REPATH_TOLERANCE'], self.config['ASTAR_MAX_NODES'])
+        self.behavior_table = behaviors.load_behaviors(self.config['BEHAVIOR_FILE'])
+        self.behavior_stats = behaviors.STATS  # Where enemy actions are counted
+        self.scheduler = TurnScheduler()
+        self.player_id: Optional[int] = None
+        self.tick = 0
+        self.level_tick = 0
+        self.entity_ticks: Dict[int, int] = {}
+        self.geometry_version = ''
+        self.sight_mask = b''
+        self.fov_radius = self.config['FOV_RADIUS']
+        self.visible: FrozenSet[int] = frozenset()
+        self.visible_tick = 0
+        self.explored = bytearray()
+        self.explored_cells: List[int] = []
+        self.explored_ticks: List[int] = []
+        self.map_memory_shared = False  # Set on clones, see clone()
         self.game_over = False
         self.combat_this_turn = False
-        self.initialize_level()
         self.score = 0
+        self.command_seq = 0  # Last client command applied, see turn_channel
+        self.action_log = None  # Optional save_format.ActionLog recording player actions
+
+        # Overworld games play on a window of chunks; None on numbered levels
+        self.world_origin: Optional[Tuple[int, int]] = None  # Window's top-left chunk
+        self.world_explored: Dict[Tuple[int, int], bytearray] = {}  # Map memory of chunks left behind
+        self.world_parked: Dict[Tuple[int, int], List[Tuple]] = {}  # Entities of chunks left behind
 
     def initialize_level(self) -> None:
         """Initialize or reset the current level."""
+        if self.action_log is not None:
+            self.action_log.record(self.tick, ACTION_RESET)
+        if self.config['WORLD_SIZE']:
+            self.enter_world()
+        else:
+            self._load_numbered_level()
+
+    def advance_level(self) -> None:
+        """
+        Move on to the next level once its last enemy is defeated; health and score carry over.
+
+        Loading the level resets the event log, so the final kill is logged again
+        on the new level, without a target since that enemy is gone, for the client
+        to still show it.
+        """
+        _, player = self.get_player()
+        health = player.health
+        self.current_level += 1
+        self._load_numbered_level()
+        _, player = self.get_player()
+        player.health = health
+        self.log_event(EventType.ENEMY_DEFEATED, self.player_id)
+        self.log_event(EventType.LEVEL_CLEARED, self.player_id, detail=self.current_level)
+
+    def _load_numbered_level(self) -> None:
+        seed = self.config['DUNGEON_SEED']
+        # Usually a cache hit: the level was prefetched while the previous one was played
+        self.load_level(LevelGenerator.create_level(self.current_level, seed))
+        if self.config['PREFETCH_NEXT_LEVEL']:
+            LevelGenerator.prefetch(self.current_level + 1, seed, self.config)
+
+    def load_level(self, level: Level) -> None:
+        """Replace the map and entities with a freshly spawned copy of the given level."""
         self.game_over = False
         self.combat_this_turn = False
         self.entities.clear()
-        self.messages.clear()
+        self.entity_ticks.clear()
+        self.events.clear()
+        self.path_cache.clear()
+        self.scheduler.clear()
+        self.player_id = None
 
-        # Generate the level
-        level = LevelGenerator.create_level(self.current_level)
-        if not LevelGenerator.validate_level(level):
-            self.messages.append(f"Warning: Level {self.current_level} may have issues!")
+        # A new level starts a new tick so clients holding older ticks resync
+        self.tick += 1
+        self.level_tick = self.tick
 
-        # Set level properties
-        self.width = level.width
-        self.height = level.height
-        self.walls = level.walls.copy()
+        # Levels are validated once when they are compiled
+        if not level.is_valid:
+            self.log_event(EventType.LEVEL_WARNING, detail=self.current_level)
+
+        self._use_geometry(level)
+
+        # Map memory is per session and starts empty on every level
+        self.visible = frozenset()
+        self.explored = bytearray(self.width * self.height)
+        self.explored_cells = []
+        self.explored_ticks = []
+        self.map_memory_shared = False
 
         # Add player
-        self.add_entity(Entity(
-            x=level.player_start[0],
-            y=level.player_start[1],
-            entity_type='player',
-            health=GAME_CONFIG['INITIAL_PLAYER_HEALTH'],
-            attack=GAME_CONFIG['PLAYER_BASE_DAMAGE']
-        ))
+        self.spawn_entity(
+            level.player_start[0], level.player_start[1], EntityType.PLAYER,
+            self.config['INITIAL_PLAYER_HEALTH'], self.config['PLAYER_BASE_DAMAGE']
+        )
 
         # Add enemies
-        for enemy_data in level.get_enemy_spawn_data(self.current_level):
-            self.add_entity(Entity(
-                x=enemy_data['x'],
-                y=enemy_data['y'],
-                entity_type='enemy',
-                health=enemy_data['health'],
-                attack=enemy_data['attack'],
-                behavior=enemy_data['behavior']
-            ))
+        for enemy_data in level.get_enemy_spawn_data(self.current_level, self.config):
+            self.spawn_entity(
+                enemy_data['x'], enemy_data['y'], EntityType.ENEMY,
+                enemy_data['health'], enemy_data['attack'], BEHAVIORS_BY_NAME[enemy_data['behavior']]
+            )
+
+        self.update_fov()
+
+    def _use_geometry(self, level: Level) -> None:
+        # Level geometry is immutable and shared with every other session on this level
+        self.width = level.width
+        self.height = level.height
+        self.walls = level.walls
+        self.spatial = SpatialIndex(self.width, self.height, level.wall_mask)
+        self.geometry_version = level.geometry_version
+        self.sight_mask = level.sight_mask
 
     # -----------------
     # Entity Management
     # -----------------
 
-    def add_entity(self, entity: Entity) -> int:
-        """Add an entity to the game state and return its ID."""
-        entity_id = self.next_entity_id
-        self.entities[entity_id] = entity
-        self.next_entity_id += 1
+    def spawn_entity(self, x: int, y: int, entity_type: EntityType, health: float, attack: float,
+                     behavior: Behavior = Behavior.NONE) -> int:
+        """Create an entity in the store and return its ID."""
+        entity_id = self.entities.spawn(x, y, entity_type, health, attack, behavior)
+        self.entity_ticks[entity_id] = self.tick
+
+        if entity_type == EntityType.PLAYER:
+            self.player_id = entity_id
+        if behavior != Behavior.DEAD:
+            self.spatial.place(entity_id, x, y)
         return entity_id
 
-    def get_player(self) -> Tuple[int, Entity]:
+    def add_entity(self, entity: Entity) -> int:
+        """Add a detached entity to the game state and return its ID."""
+        return self.spawn_entity(entity.x, entity.y, ENTITY_TYPES_BY_NAME[entity.entity_type],
+                                 entity.health, entity.attack, BEHAVIORS_BY_NAME[entity.behavior])
+
+    def move_entity(self, entity_id: int, x: int, y: int) -> None:
+        """Move an entity and keep the spatial index in sync."""
+        entity = self.entities[entity_id]
+        self.spatial.move(entity_id, entity.x, entity.y, x, y)
+        entity.x = x
+        entity.y = y
+        self.entity_ticks[entity_id] = self.tick
+
+    def kill_entity(self, entity_id: int) -> None:
+        """Mark an entity as dead so it no longer blocks movement."""
+        entity = self.entities[entity_id]
+        self.entities.set_behavior(entity_id, Behavior.DEAD)
+        self.spatial.remove(entity_id, entity.x, entity.y)
+        self.path_cache.forget(entity_id)
+        self.scheduler.sleep(entity_id)
+        self.entity_ticks[entity_id] = self.tick
+
+    def mark_changed(self, entity_id: int) -> None:
+        """Record that an entity changed this tick so it is included in the next delta."""
+        self.entity_ticks[entity_id] = self.tick
+
+    def get_player(self) -> Tuple[int, EntityView]:
         """Get the player entity and its ID."""
-        for entity_id, entity in self.entities.items():
-            if entity.entity_type == 'player':
-                return entity_id, entity
-        raise ValueError("Player not found in game state")
+        player = self.entities.get(self.player_id)
+        if player is None:
+            raise ValueError("Player not found in game state")
+        return self.player_id, player
+
+    def log_event(self, event_type: EventType, actor: int = 0, target: int = 0,
+                  amount: float = 0.0, detail: int = 0) -> None:
+        """Record an event for this tick; its message text is only made when it is sent."""
+        self.events.append(event_type, self.tick, actor, target, amount, detail)
+
+    @property
+    def messages(self) -> List[str]:
+        """Message texts of every event still in the log, oldest first."""
+        return self.events.messages(self.behavior_table)
+
+    def add_message(self, message: str) -> None:
+        """Record a free-text message, for the rare ones that are not a structured event."""
+        self.events.append(EventType.TEXT, self.tick, text=message)
 
     # -----------------
     # Movement and Collision
@@ -98,21 +251,9 @@ class GameState:
 
     def is_valid_move(self, x: int, y: int) -> bool:
         """Check if a position is valid to move to."""
-        # Check basic bounds and walls
-        if not (0 <= x < self.width and 0 <= y < self.height):
-            return False
-        if (x, y) in self.walls:
-            return False
-
-        # Check for living entities at the position
-        for entity in self.entities.values():
-            if entity.x == x and entity.y == y:
-                # Allow moving onto squares with dead enemies
-                if entity.entity_type == 'enemy' and entity.behavior == 'dead':
-                    continue
-                return False
-
-        return True
+        # Bounds, walls and living entities in one lookup; dead enemies are
+        # not in the index, so moving onto their squares is allowed
+        return not self.spatial.is_blocked(x, y)
 
     def get_movement_direction(self, from_x: int, from_y: int, to_x: int, to_y: int) -> Tuple[int, int]:
         """Calculate the best single-step movement direction towards a target."""
@@ -125,70 +266,240 @@ class GameState:
 
         return (move_x, move_y)
 
+    def greedy_step(self, from_x: int, from_y: int, to_x: int, to_y: int) -> Optional[Tuple[int, int]]:
+        """Step straight towards a target, sliding along an axis if the diagonal is blocked."""
+        move_x, move_y = self.get_movement_direction(from_x, from_y, to_x, to_y)
+        if self.is_valid_move(from_x + move_x, from_y + move_y):
+            return from_x + move_x, from_y + move_y
+        if move_x != 0 and self.is_valid_move(from_x + move_x, from_y):
+            return from_x + move_x, from_y
+        if move_y != 0 and self.is_valid_move(from_x, from_y + move_y):
+            return from_x, from_y + move_y
+        return None
+
+    def choose_enemy_step(self, entity_id: int, entity: EntityView, player: EntityView,
+                          distance_map: Optional[DistanceMap]) -> Optional[Tuple[int, int]]:
+        """Pick the next cell for an enemy moving towards the player, by its behavior's move rule."""
+        move = self.behavior_table.moves[self.entities.behaviors[entity_id - 1]]
+        return move(self, entity_id, entity, player, distance_map)
+
+    # -----------------
+    # Field of View
+    # -----------------
+
+    def update_fov(self) -> None:
+        """Recompute what the player can see and remember newly seen cells."""
+        _, player = self.get_player()
+        previous = self.visible
+        self.visible = compute_fov(self.sight_mask, self.width, self.height,
+                                   (player.x, player.y), self.fov_radius)
+        if self.visible is previous:
+            return  # Same cached result, the player did not move
+        self.visible_tick = self.tick
+
+        newly_visible = self.visible - previous
+        explored = self.explored
+        new_cells = [index for index in newly_visible if not explored[index]]
+        if new_cells:
+            if self.map_memory_shared:
+                self._own_map_memory()
+                explored = self.explored
+            for index in new_cells:
+                explored[index] = 1
+                self.explored_cells.append(index)
+                self.explored_ticks.append(self.tick)
+
+        # Entities that just came into view must reach the client even if unchanged,
+        # and enemies that just came into view wake up
+        width = self.width
+        store = self.entities
+        wake = self.scheduler.wake
+        for slot, (x, y, entity_type, is_alive) in enumerate(zip(store.xs, store.ys, store.types, store.alive)):
+            if y * width + x in newly_visible and entity_type != FREE_SLOT:
+                self.mark_changed(slot + 1)
+                if is_alive and entity_type == EntityType.ENEMY:
+                    wake(slot + 1)
+
+    def can_see(self, x: int, y: int) -> bool:
+        """Check if the player can currently see a position."""
+        return y * self.width + x in self.visible
+
+    def visible_entity_ids(self, include_dead: bool = False) -> List[int]:
+        """Return the IDs of entities on visible cells in ID order, living ones only by default."""
+        store = self.entities
+        xs, ys, types, alive = store.xs, store.ys, store.types, store.alive
+        visible = self.visible
+        width = self.width
+
+        if len(visible) >= len(store):
+            return [slot + 1 for slot, (x, y, entity_type, is_alive) in enumerate(zip(xs, ys, types, alive))
+                    if (is_alive or include_dead and entity_type != FREE_SLOT) and y * width + x in visible]
+
+        # The view is usually much smaller than the entity list: living entities are
+        # found through the occupants of visible cells, and only dead slots are scanned
+        occupants = self.spatial.occupants
+        entity_ids = [occupants[cell] for cell in visible if cell in occupants]
+        if include_dead:
+            slot = alive.find(0)
+            while slot != -1:
+                if types[slot] != FREE_SLOT and ys[slot] * width + xs[slot] in visible:
+                    entity_ids.append(slot + 1)
+                slot = alive.find(0, slot + 1)
+        entity_ids.sort()
+        return entity_ids
+
     # -----------------
     # Combat and Health
     # -----------------
 
     def process_enemy_turns(self):
-        """Process all enemy movements and attacks."""
+        """Let the enemies take their turns, then check whether the player survived."""
         player_id, player = self.get_player()
-
-        # Process each enemy's turn
-        for entity_id, entity in list(self.entities.items()):
-            if entity.entity_type != 'enemy' or entity.behavior == 'dead':
-                continue
-
-            # Calculate distance to player
-            dx = player.x - entity.x
-            dy = player.y - entity.y
-            distance = sqrt(dx * dx + dy * dy)
-
-            # Check if enemy is in attack range (adjacent, including diagonals)
-            if distance <= sqrt(2):  # sqrt(2) allows diagonal attacks
-                # Enemy attempts to attack
-                if random.random() >= GAME_CONFIG['PLAYER_EVASION_CHANCE']:
-                    # Attack hits
-                    player.health -= entity.attack
-                    self.combat_this_turn = True  # Set combat flag for hit
-                    self.messages.append(f"Enemy attacks for {entity.attack} damage!")
-                else:
-                    self.combat_this_turn = True  # Set combat flag even for miss
-                    self.messages.append("You dodge an enemy's attack!")
-            else:
-                # Enemy moves towards player
-                move_x, move_y = self.get_movement_direction(entity.x, entity.y, player.x, player.y)
-                new_x = entity.x + move_x
-                new_y = entity.y + move_y
-
-                # If direct path is blocked, try alternate moves
-                if not self.is_valid_move(new_x, new_y):
-                    if move_x != 0 and self.is_valid_move(entity.x + move_x, entity.y):
-                        new_x = entity.x + move_x
-                        new_y = entity.y
-                    elif move_y != 0 and self.is_valid_move(entity.x, entity.y + move_y):
-                        new_x = entity.x
-                        new_y = entity.y + move_y
-                    else:
-                        continue  # No valid move found
-
-                # Update enemy position
-                entity.x = new_x
-                entity.y = new_y
+        if self.config['ENEMY_SCHEDULER'] == 'lockstep':
+            self.lockstep_enemy_turns(player_id, player)
+        else:
+            self.scheduled_enemy_turns(player_id, player)
 
         # Check for player death after all enemy actions
         if player.health <= 0:
             player.health = 0
             player.behavior = 'dead'
+            self.mark_changed(player_id)
             self.game_over = True
-            self.messages.append("You have been defeated! Click Reset to try again.")
+            self.log_event(EventType.PLAYER_DEFEATED, target=player_id)
 
+    def scheduled_enemy_turns(self, player_id: int, player: EntityView) -> None:
+        """
+        Run one player turn's worth of time through the enemy scheduler.
+
+        Only awake enemies are queued, each acting as often as its speed allows.
+        An enemy that is due but neither visible nor within NOISE_RADIUS of the
+        player is not rescheduled and stays dormant until it is seen or heard.
+        Turns with at least VECTORIZE_MIN_CHASERS awake enemies following the
+        chase distance map go through the NumPy engine when it is installed, with
+        identical results; only those enemies get faster there.
+        """
+        store = self.entities
+        xs, ys, behaviors = store.xs, store.ys, store.behaviors
+        scheduler = self.scheduler
+        follows_map = self.behavior_table.follows_distance_map
+        chasers = [(xs[entity_id - 1], ys[entity_id - 1]) for entity_id in scheduler.awake_ids()
+                   if follows_map[behaviors[entity_id - 1]]]
+
+        min_chasers = self.config['VECTORIZE_MIN_CHASERS']
+        if vectorized.available() and 0 < min_chasers <= len(chasers):
+            vectorized.enemy_turns(self, player_id, player, chasers)
+            return
+
+        visible = self.visible
+        width = self.width
+        player_x, player_y = player.x, player.y
+        hearing = self.config['NOISE_RADIUS']
+        delays = self.enemy_delays()
+        distance_map = self.chase_distance_map(player, chasers) if chasers else None
+        for entity_id in scheduler.run(TURN_LENGTH):
+            slot = entity_id - 1
+            x, y = xs[slot], ys[slot]
+            if y * width + x not in visible and max(abs(player_x - x), abs(player_y - y)) > hearing:
+                continue
+
+            self.enemy_take_turn(entity_id, store[entity_id], player_id, player, distance_map)
+            scheduler.schedule(entity_id, delays.get(behaviors[slot], TURN_LENGTH))
+
+    def enemy_delays(self) -> Dict[int, int]:
+        """Scheduler time between actions for each enemy behavior, from ENEMY_SPEED."""
+        return {BEHAVIORS_BY_NAME[name]: action_delay(speed) for name, speed in self.config['ENEMY_SPEED'].items()}
+
+    def lockstep_enemy_turns(self, player_id: int, player: EntityView) -> None:
+        """Let every living enemy the player can see act once, in ID order."""
+        # Only living enemies the player can see react; sight is treated as symmetric
+        store = self.entities
+        types = store.types
+        enemies = [(entity_id, store[entity_id]) for entity_id in self.visible_entity_ids()
+                   if types[entity_id - 1] == EntityType.ENEMY]
+
+        follows_map = self.behavior_table.follows_distance_map
+        behaviors = store.behaviors
+        chasers = [(entity.x, entity.y) for entity_id, entity in enemies if follows_map[behaviors[entity_id - 1]]]
+        distance_map = self.chase_distance_map(player, chasers) if chasers else None
+
+        for entity_id, entity in enemies:
+            self.enemy_take_turn(entity_id, entity, player_id, player, distance_map)
+
+    def chase_distance_map(self, player: EntityView, chasers: List[Tuple[int, int]]) -> DistanceMap:
+        """One distance map from the player serves every enemy following it this turn."""
+        # The search stops as soon as all chasers have been reached
+        return DistanceMap(
+            self.spatial.wall_mask, self.width, self.height, (player.x, player.y),
+            stop_at=chasers, max_distance=self.config['PATHFINDING_MAX_DISTANCE']
+        )
+
+    def enemy_take_turn(self, entity_id: int, entity: EntityView, player_id: int, player: EntityView,
+                        distance_map: Optional[DistanceMap]) -> None:
+        """Attack the player if within the behavior's range, otherwise move by its move rule."""
+        table = self.behavior_table
+        stats = self.behavior_stats
+        code = self.entities.behaviors[entity_id - 1]
+        start = perf_counter() if stats.timing else 0.0
+
+        x, y = entity.x, entity.y
+        if (max(abs(player.x - x), abs(player.y - y)) <= table.ranges[code] and
+                (not table.needs_sight[code] or y * self.width + x in self.visible)):
+            self.enemy_attack(entity_id, code, entity.attack, player_id, player)
+            stats.attacks[code] += 1
+        else:
+            step = table.moves[code](self, entity_id, entity, player, distance_map)
+            if step is not None:
+                self.move_entity(entity_id, *step)
+                stats.moves[code] += 1
+            else:
+                stats.waits[code] += 1
+
+        if stats.timing:
+            stats.seconds[code] += perf_counter() - start
+
+    def enemy_attack(self, entity_id: int, code: int, damage: float, player_id: int, player: EntityView) -> None:
+        """Roll an enemy attack against the player's evasion."""
+        if self.rng.random() >= self.config['PLAYER_EVASION_CHANCE']:
+            player.health -= damage
+            self.mark_changed(player_id)
+            self.log_event(EventType.ENEMY_HIT, entity_id, player_id, damage, code)
+        else:
+            self.log_event(EventType.ENEMY_MISS, entity_id, player_id, damage, code)
+        self.combat_this_turn = True  # Hit or miss
+
+    def make_noise(self, x: int, y: int) -> None:
+        """Wake every living enemy within NOISE_RADIUS of a position, seen or not."""
+        radius = self.config['NOISE_RADIUS']
+        occupants = self.spatial.occupants
+        types = self.entities.types
+        wake = self.scheduler.wake
+        width = self.width
+        if len(occupants) < (2 * radius + 1) ** 2:
+            # Fewer living entities than cells in range: check each one instead.
+            # Waking order does not matter, the scheduler orders ties by ID
+            for cell, entity_id in list(occupants.items()):
+                cell_y, cell_x = divmod(cell, width)
+                if (abs(cell_x - x) <= radius and abs(cell_y - y) <= radius and
+                        types[entity_id - 1] == EntityType.ENEMY):
+                    wake(entity_id)
+            return
+        for cell_y in range(max(0, y - radius), min(self.height, y + radius + 1)):
+            row = cell_y * width
+            for cell_x in range(max(0, x - radius), min(width, x + radius + 1)):
+                entity_id = occupants.get(row + cell_x)
+                if entity_id is not None and types[entity_id - 1] == EntityType.ENEMY:
+                    wake(entity_id)
 
     def try_move_player(self, target_x: int, target_y: int) -> bool:
         """Handle player movement or attack action."""
+        if self.action_log is not None:
+            self.action_log.record(self.tick, ACTION_MOVE, target_x, target_y)
         if self.game_over:
             return False
 
         self.combat_this_turn = False
+        self.tick += 1
 
         try:
             player_id, player = self.get_player()
@@ -200,94 +511,549 @@ class GameState:
                 return False
 
             # Check for enemies at the target position
+            enemy_id = self.spatial.entity_at(new_x, new_y)
             enemy_at_target = None
-            for eid, entity in self.entities.items():
-                if (entity.entity_type == 'enemy' and
-                        entity.x == new_x and
-                        entity.y == new_y and
-                        entity.health > 0):
+            if enemy_id is not None:
+                entity = self.entities[enemy_id]
+                if entity.entity_type == 'enemy' and entity.health > 0:
                     enemy_at_target = entity
-                    break
 
             action_taken = False
+            cleared = False
 
             # Handle combat if enemy present
             if enemy_at_target:
                 enemy_at_target.health -= player.attack
+                self.mark_changed(enemy_id)
                 self.combat_this_turn = True  # Set combat flag for player attack
-                self.messages.append(f"You attack the enemy for {player.attack} damage!")
+                self.log_event(EventType.PLAYER_ATTACK, player_id, enemy_id, player.attack)
+                self.make_noise(player.x, player.y)
                 action_taken = True
 
                 if enemy_at_target.health <= 0:
-                    self.messages.append("Enemy defeated!")
-                    enemy_at_target.behavior = 'dead'
+                    self.log_event(EventType.ENEMY_DEFEATED, player_id, enemy_id)
+                    self.kill_entity(enemy_id)
                     self.score += 30
+                    # Numbered levels are cleared by defeating their last enemy
+                    types = self.entities.types
+                    cleared = self.world_origin is None and all(
+                        types[entity_id - 1] != EntityType.ENEMY for entity_id in self.entities.living_ids())
 
             # Handle movement if no enemy
             elif self.is_valid_move(new_x, new_y):
                 # Move the player
-                old_x, old_y = player.x, player.y
-                player.x = new_x
-                player.y = new_y
+                self.move_entity(player_id, new_x, new_y)
                 action_taken = True
-
-                # Add movement message
-                directions = []
-                if new_y < old_y:
-                    directions.append("north")
-                elif new_y > old_y:
-                    directions.append("south")
-                if new_x > old_x:
-                    directions.append("east")
-                elif new_x < old_x:
-                    directions.append("west")
-                direction_str = "-".join(directions) if directions else "nowhere"
-
-                self.messages.append(f"Moved {direction_str}")
+                self.log_event(EventType.PLAYER_MOVED, player_id, detail=direction_code(dx, dy))
             else:
                 # Try alternate moves if direct path is blocked
                 if dx != 0 and self.is_valid_move(player.x + dx, player.y):
-                    player.x += dx
+                    self.move_entity(player_id, player.x + dx, player.y)
                     action_taken = True
                 elif dy != 0 and self.is_valid_move(player.x, player.y + dy):
-                    player.y += dy
+                    self.move_entity(player_id, player.x, player.y + dy)
                     action_taken = True
                 else:
-                    self.messages.append("That direction is blocked!")
+                    self.log_event(EventType.MOVE_BLOCKED, player_id)
 
             # Process enemy turns if the player took any action (attack or move)
             if action_taken:
+                self.follow_player()
+                self.update_fov()
                 self.process_enemy_turns()
+            if cleared and not self.game_over:
+                self.advance_level()
 
             return action_taken
 
         except ValueError as e:
-            self.messages.append(str(e))
+            self.add_message(str(e))
             return False
 
+    # -----------------
+    # Travel
+    # -----------------
+
+    def travel_to(self, target_x: int, target_y: int) -> TravelResult:
+        """Walk to a seen cell along a shortest path, one turn per step, until something needs attention."""
+        index = target_y * self.width + target_x
+        if not (0 <= target_x < self.width and 0 <= target_y < self.height and
+                self.explored[index] and not self.spatial.wall_mask[index]):
+            return self._end_travel(0, TravelStop.UNREACHABLE)
+        target = [target_x, target_y]
+
+        def plan(x: int, y: int) -> List[Tuple[int, int]]:
+            return find_path(self.spatial.wall_mask, self.width, self.height, (x, y),
+                             (target[0], target[1]), self.config['ASTAR_MAX_NODES'])
+
+        def arrived(x: int, y: int) -> bool:
+            return x == target[0] and y == target[1]
+
+        def shifted(dx: int, dy: int) -> None:
+            target[0] += dx
+            target[1] += dy
+
+        return self._travel(plan, arrived, shifted, TravelStop.ARRIVED)
+
+    def auto_explore(self) -> TravelResult:
+        """Walk towards the nearest unexplored cell, turn after turn, until something needs attention."""
+        def plan(x: int, y: int) -> List[Tuple[int, int]]:
+            return path_to_nearest(self.spatial.wall_mask, self.width, self.height, (x, y), self.explored)
+
+        return self._travel(plan, lambda x, y: False, lambda dx, dy: None, TravelStop.EXPLORED)
+
+    def _travel(self, plan: Callable[[int, int], List[Tuple[int, int]]], arrived: Callable[[int, int], bool],
+                shifted: Callable[[int, int], None], done: TravelStop) -> TravelResult:
+        """
+        Take player turns along planned paths until a stop condition holds.
+
+        plan(x, y) gives the steps from the player's cell, [] once there is nowhere
+        left to go, and is called again when a path runs out or its goal has been
+        seen. The first step is always taken, so travelling is never worse than a
+        single move; later ones stop when an enemy comes close or the player is
+        hurt. shifted(dx, dy) is told when the world window moves coordinates.
+        """
+        steps = 0
+        path: List[Tuple[int, int]] = []
+        size = self.config['WORLD_CHUNK_SIZE']
+        while True:
+            if self.game_over:
+                return self._end_travel(steps, TravelStop.DEFEATED)
+            _, player = self.get_player()
+            if arrived(player.x, player.y):
+                return self._end_travel(steps, done)
+            if steps and self.enemy_in_alert_range(player):
+                return self._end_travel(steps, TravelStop.ENEMY)
+            if steps >= self.config['TRAVEL_MAX_STEPS']:
+                return self._end_travel(steps, TravelStop.STEP_LIMIT)
+
+            # Explore targets are unseen cells, so look again once the last one came into view
+            if not path or (done == TravelStop.EXPLORED and self.explored[path[0][1] * self.width + path[0][0]]):
+                path = plan(player.x, player.y)
+                path.reverse()
+                if not path:
+                    return self._end_travel(steps, done if done == TravelStop.EXPLORED else TravelStop.UNREACHABLE)
+            step_x, step_y = path.pop()
+            if not self.is_valid_move(step_x, step_y):
+                return self._end_travel(steps, TravelStop.BLOCKED)
+
+            health = player.health
+            origin = self.world_origin
+            self.try_move_player(step_x, step_y)
+            steps += 1
+            if self.world_origin != origin:
+                shifted((origin[0] - self.world_origin[0]) * size, (origin[1] - self.world_origin[1]) * size)
+                path = []
+            if player.health < health and not self.game_over:
+                return self._end_travel(steps, TravelStop.DAMAGED)
+
+    def enemy_in_alert_range(self, player: EntityView) -> bool:
+        """Whether a living enemy the player can see is within TRAVEL_ALERT_DISTANCE."""
+        distance = self.config['TRAVEL_ALERT_DISTANCE']
+        store = self.entities
+        for entity_id in self.visible_entity_ids():
+            slot = entity_id - 1
+            if (store.types[slot] == EntityType.ENEMY and
+                    max(abs(store.xs[slot] - player.x), abs(store.ys[slot] - player.y)) <= distance):
+                return True
+        return False
+
+    def _end_travel(self, steps: int, reason: TravelStop) -> TravelResult:
+        if reason not in (TravelStop.ARRIVED, TravelStop.DEFEATED):
+            self.log_event(EventType.TRAVEL_STOPPED, self.player_id, amount=steps, detail=reason)
+        return TravelResult(steps, reason)
+
+    # -----------------
+    # World Streaming
+    # -----------------
+
+    def world_window(self, origin: Tuple[int, int]) -> Level:
+        """Compile the window of overworld chunks whose top-left chunk is origin."""
+        config = self.config
+        return WorldGenerator.window(config['DUNGEON_SEED'], origin, config['WORLD_VIEW_CHUNKS'],
+                                     config['WORLD_CHUNK_SIZE'], config['WORLD_SIZE'] // config['WORLD_CHUNK_SIZE'])
+
+    def window_chunks(self, origin: Tuple[int, int]) -> Set[Tuple[int, int]]:
+        span = self.config['WORLD_VIEW_CHUNKS']
+        return {(cx, cy) for cy in range(origin[1], origin[1] + span) for cx in range(origin[0], origin[0] + span)}
+
+    def enter_world(self) -> None:
+        """Start a run in the middle of the overworld, with a window of chunks around the player."""
+        centre = self.config['WORLD_SIZE'] // self.config['WORLD_CHUNK_SIZE'] // 2
+        half = self.config['WORLD_VIEW_CHUNKS'] // 2
+        self.world_origin = (centre - half, centre - half)
+        self.world_explored.clear()
+        self.world_parked.clear()
+
+        self.load_level(self.world_window(self.world_origin))
+        for key in sorted(self.window_chunks(self.world_origin)):
+            self.populate_chunk(key)
+        self.visible = frozenset()
+        self.update_fov()  # Reveal and wake the enemies spawned in view
+
+    def follow_player(self) -> None:
+        """
+        Slide the world window once the player leaves its middle chunk.
+
+        Entities in chunks that drop out of the window are parked with their map
+        memory, and chunks coming in are restored or spawned for the first time.
+        Local coordinates change, so clients resync as on a new level.
+        """
+        if self.world_origin is None:
+            return
+        size = self.config['WORLD_CHUNK_SIZE']
+        half = self.config['WORLD_VIEW_CHUNKS'] // 2
+        _, player = self.get_player()
+        shift_x = player.x // size - half
+        shift_y = player.y // size - half
+        if not shift_x and not shift_y:
+            return
+
+        old_origin = self.world_origin
+        new_origin = (old_origin[0] + shift_x, old_origin[1] + shift_y)
+        old_chunks = self.window_chunks(old_origin)
+        new_chunks = self.window_chunks(new_origin)
+        self.save_world_explored()
+
+        # Park entities leaving the window and move the rest into new local coordinates
+        store = self.entities
+        xs, ys = store.xs, store.ys
+        dx, dy = -shift_x * size, -shift_y * size
+        for entity_id in list(store):
+            slot = entity_id - 1
+            key = (old_origin[0] + xs[slot] // size, old_origin[1] + ys[slot] // size)
+            if key in new_chunks:
+                xs[slot] += dx
+                ys[slot] += dy
+                continue
+            entity = store[entity_id]
+            self.world_parked.setdefault(key, []).append((
+                (old_origin[0] * size) + entity.x, (old_origin[1] * size) + entity.y,
+                store.types[slot], entity.health, entity.attack, store.behaviors[slot]))
+            store.remove(entity_id)
+            self.entity_ticks.pop(entity_id, None)
+            self.scheduler.sleep(entity_id)
+        for key in old_chunks - new_chunks:
+            self.world_parked.setdefault(key, [])  # Visited chunks stay populated even when empty
+
+        self.world_origin = new_origin
+        self._use_geometry(self.world_window(new_origin))
+        for entity_id in store.living_ids():
+            self.spatial.place(entity_id, xs[entity_id - 1], ys[entity_id - 1])
+        self.path_cache.clear()
+
+        for key in sorted(new_chunks - old_chunks):
+            self.populate_chunk(key)
+
+        # Coordinates moved under the client, which must start over from a full state
+        self.level_tick = self.tick
+        self.visible = frozenset()
+        self.load_world_explored()
+
+    def populate_chunk(self, key: Tuple[int, int]) -> None:
+        """Bring back the entities parked in a chunk, or spawn its enemies on the first visit."""
+        size = self.config['WORLD_CHUNK_SIZE']
+        left = (key[0] - self.world_origin[0]) * size
+        top = (key[1] - self.world_origin[1]) * size
+
+        parked = self.world_parked.pop(key, None)
+        if parked is not None:
+            for x, y, entity_type, health, attack, behavior in parked:
+                self.spawn_entity(x - self.world_origin[0] * size, y - self.world_origin[1] * size,
+                                  EntityType(entity_type), health, attack, Behavior(behavior))
+            return
+
+        chunk = WorldGenerator.chunk(self.config['DUNGEON_SEED'], key[0], key[1], size,
+                                     self.config['WORLD_SIZE'] // size)
+        for i, (x, y) in enumerate(chunk.enemy_spawns):
+            if not self.spatial.is_blocked(left + x, top + y):
+                self.spawn_entity(left + x, top + y, EntityType.ENEMY, self.config['ENEMY_BASE_HEALTH'],
+                                  self.config['ENEMY_BASE_DAMAGE'], self.behavior_table.spawn_behavior(i))
+
+    def save_world_explored(self) -> None:
+        """Copy the window's map memory back into per-chunk storage."""
+        size = self.config['WORLD_CHUNK_SIZE']
+        width = self.width
+        for cx, cy in self.window_chunks(self.world_origin):
+            left = (cx - self.world_origin[0]) * size
+            top = (cy - self.world_origin[1]) * size
+            memory = b''.join(self.explored[(top + y) * width + left:(top + y) * width + left + size]
+                              for y in range(size))
+            if memory.count(0) != len(memory):
+                self.world_explored[(cx, cy)] = bytearray(memory)
+
+    def load_world_explored(self) -> None:
+        """Rebuild the window's map memory from per-chunk storage."""
+        size = self.config['WORLD_CHUNK_SIZE']
+        width = self.width
+        self.explored = explored = bytearray(width * self.height)
+        for cx, cy in self.window_chunks(self.world_origin):
+            memory = self.world_explored.pop((cx, cy), None)
+            if memory is None:
+                continue
+            left = (cx - self.world_origin[0]) * size
+            top = (cy - self.world_origin[1]) * size
+            for y in range(size):
+                start = (top + y) * width + left
+                explored[start:start + size] = memory[y * size:(y + 1) * size]
+
+        self.explored_cells = []
+        index = explored.find(1)
+        while index != -1:
+            self.explored_cells.append(index)
+            index = explored.find(1, index + 1)
+        self.explored_ticks = [self.tick] * len(self.explored_cells)
+        self.map_memory_shared = False
+
     # -----------------
     # State Serialization
     # -----------------
 
+    @staticmethod
+    def entity_to_dict(entity: EntityView) -> Dict:
+        """Serialize the client-visible fields of an entity."""
+        return {
+            'x': entity.x,
+            'y': entity.y,
+            'type': entity.entity_type,
+            'health': entity.health,
+            'behavior': entity.behavior
+        }
+
+    def visible_entities(self, entity_ids: Optional[Iterable[int]] = None) -> Dict[str, Dict]:
+        """Serialize the given entities (all by default) that the player can see, plus the player."""
+        store = self.entities
+        if entity_ids is None:
+            entity_ids = self.visible_entity_ids(include_dead=True)
+            if self.player_id in store and self.player_id not in entity_ids:
+                entity_ids.append(self.player_id)
+
+        # Filter on the raw columns and only build views for what gets sent
+        width = self.width
+        visible = self.visible
+        xs, ys, types = store.xs, store.ys, store.types
+        result = {}
+        for entity_id in entity_ids:
+            slot = entity_id - 1
+            if types[slot] != FREE_SLOT and (entity_id == self.player_id or
+                                             ys[slot] * width + xs[slot] in visible):
+                result[str(entity_id)] = self.entity_to_dict(store[entity_id])
+        return result
+
+    def explored_walls(self, cells) -> List[Tuple[int, int]]:
+        """Return the wall positions among the given explored cell indices."""
+        width = self.width
+        wall_mask = self.spatial.wall_mask
+        return [(index % width, index // width) for index in cells if wall_mask[index]]
+
     def to_dict(self):
         """Convert the game state to a dictionary for JSON serialization."""
         return {
             'width': self.width,
             'height': self.height,
             'level': self.current_level,
-            'messages': self.messages[-5:],
-            'walls': self.walls,
+            'tick': self.tick,
+            'geometry_version': self.geometry_version,
+            'messages': self.events.messages(self.behavior_table, list(self.events.last(5))),
+            'event_cursor': self.events.next_seq,
+            'walls': self.explored_walls(self.explored_cells),
+            'explored': self.explored_cells,
+            'visible': list(self.visible),
             'game_over': self.game_over,
             'combat_this_turn': self.combat_this_turn,
             'score': self.score,
-            'entities': {
-                str(entity_id): {
-                    'x': entity.x,
-                    'y': entity.y,
-                    'type': entity.entity_type,
-                    'health': entity.health,
-                    'behavior': entity.behavior
-                }
-                for entity_id, entity in self.entities.items()
-            }
-        }
\ No newline at end of file
+            'command_seq': self.command_seq,
+            'entities': self.visible_entities()
+        }
+
+    def geometry_to_dict(self) -> Dict:
+        """
+        Serialize the static level dimensions, which never change within a level.
+
+        Walls are not included: they reach the client through state responses as
+        the player explores, so unseen parts of the map are never sent. In the
+        overworld, origin is the world position of the window's top-left cell.
+        """
+        size = self.config['WORLD_CHUNK_SIZE']
+        return {
+            'width': self.width,
+            'height': self.height,
+            'level': self.current_level,
+            'geometry_version': self.geometry_version,
+            'origin': None if self.world_origin is None else [self.world_origin[0] * size,
+                                                              self.world_origin[1] * size]
+        }
+
+    def to_delta(self, since_tick: Optional[int] = None) -> Dict:
+        """
+        Serialize only what changed after since_tick.
+
+        Falls back to a full snapshot when the client has no tick, is on an older
+        level, or claims a tick from the future. Entities and map cells are limited
+        to what the player can see or has explored; changed entities out of sight
+        are sent as null.
+        """
+        full = since_tick is None or not (self.level_tick <= since_tick <= self.tick)
+
+        if full:
+            changed = None
+            events = list(self.events.last(5))
+            explored = self.explored_cells
+        else:
+            changed = [entity_id for entity_id, tick in self.entity_ticks.items() if tick > since_tick]
+            events = list(self.events.since(self.events.first_after_tick(since_tick)))
+            explored = self.explored_cells[self._first_after(self.explored_ticks, since_tick):]
+
+        delta = {
+            'full': full,
+            'tick': self.tick,
+            'level': self.current_level,
+            'geometry_version': self.geometry_version,
+            'messages': self.events.messages(self.behavior_table, events),
+            'event_cursor': self.events.next_seq,
+            'explored': explored,
+            'walls': self.explored_walls(explored),
+            'game_over': self.game_over,
+            'combat_this_turn': self.combat_this_turn,
+            'score': self.score,
+            'command_seq': self.command_seq,
+            'entities': self.visible_entities(changed)
+        }
+        if changed is not None:
+            # Changed entities the player can no longer see are sent as null, so the
+            # client drops them instead of drawing them where they were last seen
+            entities = delta['entities']
+            for entity_id in changed:
+                entities.setdefault(str(entity_id), None)
+        # The visible set only changes when the player moves
+        if full or self.visible_tick > since_tick:
+            delta['visible'] = list(self.visible)
+        return delta
+
+    @staticmethod
+    def _first_after(ticks: List[int], since_tick: int) -> int:
+        """Index of the first entry stamped after since_tick in a tick-sorted log."""
+        # Walk back from the end, deltas usually only cover the last tick or two
+        start = len(ticks)
+        while start > 0 and ticks[start - 1] > since_tick:
+            start -= 1
+        return start
+
+    def snapshot(self) -> Dict:
+        """
+        Capture the full session state as plain values, bytes and containers.
+
+        Level geometry is not included: it is recreated from the level number and
+        dungeon seed and checked against geometry_version, so snapshots of games
+        on hand-loaded levels cannot be restored.
+        """
+        return {
+            'config': {key: value for key, value in self.config.items() if GAME_CONFIG.get(key) != value},
+            'rng': self.rng.getstate(),
+            'current_level': self.current_level,
+            'geometry_version': self.geometry_version,
+            'tick': self.tick,
+            'level_tick': self.level_tick,
+            'visible_tick': self.visible_tick,
+            'score': self.score,
+            'game_over': self.game_over,
+            'combat_this_turn': self.combat_this_turn,
+            'command_seq': self.command_seq,
+            'player_id': self.player_id,
+            'events': self.events.snapshot(),
+            'entity_ticks': self.entity_ticks,
+            'entities': self.entities.snapshot(),
+            'scheduler': self.scheduler.snapshot(),
+            'paths': self.path_cache.snapshot(),
+            'explored': bytes(self.explored),
+            'explored_cells': array('i', self.explored_cells).tobytes(),
+            'explored_ticks': array('i', self.explored_ticks).tobytes(),
+            'world': None if self.world_origin is None else {
+                'origin': self.world_origin,
+                'explored': {key: bytes(memory) for key, memory in self.world_explored.items()},
+                'parked': self.world_parked,
+            },
+        }
+
+    @classmethod
+    def from_snapshot(cls, data: Dict) -> 'GameState':
+        """Rebuild a game from snapshot(); raises ValueError if its level no longer matches."""
+        game = cls.__new__(cls)
+        game._init_fields(random.Random(), data['config'])
+        game.current_level = data['current_level']
+        world = data.get('world')
+        if world is not None:
+            game.world_origin = tuple(world['origin'])
+            game.world_explored = {key: bytearray(memory) for key, memory in world['explored'].items()}
+            game.world_parked = {key: list(parked) for key, parked in world['parked'].items()}
+            level = game.world_window(game.world_origin)
+        else:
+            level = LevelGenerator.create_level(game.current_level, game.config['DUNGEON_SEED'])
+        if level.geometry_version != data['geometry_version']:
+            raise ValueError(f"Level {game.current_level} geometry changed since the snapshot was taken")
+        game._use_geometry(level)
+
+        game.rng.setstate(data['rng'])
+        for key in ('tick', 'level_tick', 'visible_tick', 'score', 'game_over',
+                    'combat_this_turn', 'command_seq', 'player_id'):
+            setattr(game, key, data[key])
+        game.events = EventLog.restore(game.config['EVENT_LOG_SIZE'], data['events'])
+        game.entity_ticks = dict(data['entity_ticks'])
+        game.entities = EntityStore.restore(data['entities'])
+        game.scheduler = TurnScheduler.restore(data['scheduler'])
+        # Cached paths decide where path-following enemies step next, so they are
+        # part of the state: rebuilding them could pick different equal-length paths
+        game.path_cache = PathCache.restore(game.config['PATH_REPATH_TOLERANCE'],
+                                            game.config['ASTAR_MAX_NODES'], data['paths'])
+        game.explored = bytearray(data['explored'])
+        game.explored_cells = array('i', data['explored_cells']).tolist()
+        game.explored_ticks = array('i', data['explored_ticks']).tolist()
+
+        # Derived state is rebuilt rather than stored
+        store = game.entities
+        for entity_id in store.living_ids():
+            game.spatial.place(entity_id, store.xs[entity_id - 1], store.ys[entity_id - 1])
+        player = store.get(game.player_id)
+        if player is not None:
+            game.visible = compute_fov(game.sight_mask, game.width, game.height,
+                                       (player.x, player.y), game.fov_radius)
+        return game
+
+    def clone(self, rng: Optional[random.Random] = None) -> 'GameState':
+        """
+        Fork the game cheaply, to play ahead without touching the original.
+
+        Level geometry, config, the behavior table and the visible set are
+        immutable and shared. Map memory is shared copy-on-write: both games
+        copy it before they next explore a cell. Overworld memory and parked
+        entities are shared too; their entries are only ever replaced, never
+        changed in place, so each copy gets its own dicts over the same entries.
+        Entity columns and the other per-turn state are flat arrays and small
+        containers, copied outright. The clone draws from rng, by default a copy
+        of this game's (seeding a fresh one is several times cheaper). Its action
+        log is off, so the original's replay is unaffected.
+        """
+        game = GameState.__new__(GameState)
+        game.__dict__.update(self.__dict__)
+        if rng is None:
+            rng = random.Random()
+            rng.setstate(self.rng.getstate())
+        game.rng = rng
+        game.entities = self.entities.copy()
+        game.spatial = self.spatial.copy()
+        game.scheduler = self.scheduler.copy()
+        game.path_cache = self.path_cache.copy()
+        game.events = self.events.copy()
+        game.entity_ticks = self.entity_ticks.copy()
+        game.map_memory_shared = self.map_memory_shared = True
+        game.world_explored = self.world_explored.copy()
+        game.world_parked = self.world_parked.copy()
+        game.action_log = None
+        return game
+
+    def _own_map_memory(self) -> None:
+        """Take a private copy of map memory shared with a clone before changing it."""
+        self.explored = self.explored[:]
+        self.explored_cells = self.explored_cells[:]
+        self.explored_ticks = self.explored_ticks[:]
+        self.map_memory_shared = False
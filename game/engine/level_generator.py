@@ -1,18 +1,64 @@
-from typing import Dict, List, Tuple
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+from typing import Dict, List, Optional, Set, Tuple
+from ..entities.entity import BEHAVIOR_NAMES
 from ..levels.level_data import LEVEL_LAYOUTS
-from ..engine.tile_types import TILE_TYPES
+from ..engine.tile_types import TILE_TYPES, TILE_CHARS, TILE_IDS, TILE_BLOCKS_MOVEMENT, TILE_BLOCKS_SIGHT
+from .behaviors import load_behaviors
+from .dungeon_generator import DungeonGenerator
+from .fov import compute_fov
+from .pathfinding import DistanceMap, UNREACHABLE, padded_mask
 from config import GAME_CONFIG
 
+# Byte translation tables: layout character -> tile ID, and tile ID -> mask flag.
+# Unknown characters become floor, matching the old per-character lookup.
+_FLOOR_ID = TILE_IDS['.']
+CHAR_TO_TILE = bytes(TILE_IDS.get(chr(code), _FLOOR_ID) for code in range(256))
+TILE_TO_WALL = bytes(int(TILE_BLOCKS_MOVEMENT[code]) if code < len(TILE_CHARS) else 0 for code in range(256))
+TILE_TO_SIGHT = bytes(int(TILE_BLOCKS_SIGHT[code]) if code < len(TILE_CHARS) else 0 for code in range(256))
+TILE_TO_CHAR = bytes(ord(TILE_CHARS[code]) if code < len(TILE_CHARS) else ord('.') for code in range(256))
+_PLAYER_ID = TILE_IDS['P']
+_ENEMY_ID = TILE_IDS['E']
+
 
 class Level:
-    def __init__(self, layout: str):
-        self.tiles: List[List[Dict]] = []
+    """
+    A compiled, read-only level.
+
+    The ASCII layout is parsed once into flat row-major byte grids (tile IDs and
+    a wall mask) plus spawn tables. Compiled levels are cached and shared by every
+    GameState playing them, so nothing on a Level may be mutated after parsing.
+    """
+
+    def __init__(self, layout: str = ''):
         self.width: int = 0
         self.height: int = 0
+        self.tiles: bytes = b''
+        self.wall_mask: bytes = b''
+        self.sight_mask: bytes = b''
+        self.is_rectangular: bool = True
         self.player_start: Tuple[int, int] = (0, 0)
-        self.enemy_spawns: List[Tuple[int, int]] = []
-        self.walls: List[Tuple[int, int]] = []
-        self.parse_layout(layout)
+        self.enemy_spawns: Tuple[Tuple[int, int], ...] = ()
+        self.geometry_version: str = ''
+        self._spawn_tables: Dict[Tuple, Tuple[Tuple, ...]] = {}
+        if layout:
+            self.parse_layout(layout)
+        self.is_valid: bool = LevelGenerator.validate_level(self)
+
+    @classmethod
+    def from_tiles(cls, width: int, height: int, tiles: bytes) -> 'Level':
+        """Build a level from an already compiled tile grid, e.g. one read from a LevelStore."""
+        if len(tiles) != width * height:
+            raise ValueError(f"Expected {width * height} tiles for {width}x{height}, got {len(tiles)}")
+        level = cls()
+        level.width = width
+        level.height = height
+        level.compile_tiles(bytes(tiles))
+        level.is_valid = LevelGenerator.validate_level(level)
+        return level
 
     def parse_layout(self, layout: str) -> None:
         """Convert the ASCII layout into a tile grid."""
@@ -22,72 +68,227 @@ class Level:
         self.height = len(lines)
         self.width = len(lines[0])
 
-        for y, line in enumerate(lines):
-            tile_row = []
-            for x, char in enumerate(line):
-                tile_type = TILE_TYPES.get(char, TILE_TYPES['.'])
-                tile_row.append(tile_type.copy())
+        rows = []
+        for line in lines:
+            # Ragged rows are padded with floor and reported by validate_level
+            if len(line) != self.width:
+                self.is_rectangular = False
+            rows.append(line.encode('ascii', 'replace')[:self.width].ljust(self.width, b'.'))
+
+        # Whole rows are converted at C speed instead of cell by cell
+        self.compile_tiles(b''.join(rows).translate(CHAR_TO_TILE))
+
+    def compile_tiles(self, tiles: bytes) -> None:
+        """Derive masks, spawns and the geometry version from a tile grid."""
+        width = self.width
+        self.tiles = tiles
+
+        # The last player start wins; enemy spawns are kept in row-major order
+        index = tiles.rfind(_PLAYER_ID)
+        if index != -1:
+            self.player_start = (index % width, index // width)
+        enemy_spawns = []
+        index = tiles.find(_ENEMY_ID)
+        while index != -1:
+            enemy_spawns.append((index % width, index // width))
+            index = tiles.find(_ENEMY_ID, index + 1)
+
+        self.wall_mask = self.tiles.translate(TILE_TO_WALL)
+        self.sight_mask = self.tiles.translate(TILE_TO_SIGHT)
+        self.enemy_spawns = tuple(enemy_spawns)
 
-                # Store coordinates for special tiles
-                if char == 'P':
-                    self.player_start = (x, y)
-                elif char == 'E':
-                    self.enemy_spawns.append((x, y))
-                elif char == '#':
-                    self.walls.append((x, y))
+        digest = hashlib.sha1(f"{self.width}x{self.height}".encode())
+        digest.update(self.tiles)
+        self.geometry_version = digest.hexdigest()[:16]
 
-            self.tiles.append(tile_row)
+    @cached_property
+    def walls(self) -> Tuple[Tuple[int, int], ...]:
+        """Positions of every wall tile, built on first use."""
+        width = self.width
+        walls = []
+        index = self.wall_mask.find(1)
+        while index != -1:
+            walls.append((index % width, index // width))
+            index = self.wall_mask.find(1, index + 1)
+        return tuple(walls)
 
-        print(f"Parsed level: {self.width}x{self.height}")
-        print(f"Walls: {self.walls}")
-        print(f"Player start: {self.player_start}")
-        print(f"Enemy spawns: {self.enemy_spawns}")
+    def tile_at(self, x: int, y: int) -> Dict:
+        """Return the tile type definition at a position."""
+        return TILE_TYPES[TILE_CHARS[self.tiles[y * self.width + x]]]
 
-    def get_enemy_spawn_data(self, current_level: int) -> List[Dict]:
+    def get_enemy_spawn_data(self, current_level: int, config: Dict = None) -> List[Dict]:
         """Generate enemy data for each spawn point."""
-        enemy_types = ['chase', 'patrol', 'spell_caster']
-        enemy_data = []
+        config = config or GAME_CONFIG
+        health = (config['ENEMY_BASE_HEALTH'] +
+                  config['ENEMY_HEALTH_SCALING'] * (current_level - 1))
+        damage = config['ENEMY_BASE_DAMAGE'] * (1 + (current_level - 1) * 0.2)
 
-        for i, (x, y) in enumerate(self.enemy_spawns):
-            health = (GAME_CONFIG['ENEMY_BASE_HEALTH'] +
-                      GAME_CONFIG['ENEMY_HEALTH_SCALING'] * (current_level - 1))
-            damage = GAME_CONFIG['ENEMY_BASE_DAMAGE'] * (1 + (current_level - 1) * 0.2)
+        spawn_order = load_behaviors(config.get('BEHAVIOR_FILE')).spawn_order
+        key = (health, damage, spawn_order)
+        # Levels are shared by every session and the prefetch thread, so the
+        # table is built outside the cache lock and published under it
+        with LevelGenerator._cache_lock:
+            table = self._spawn_tables.get(key)
+        if table is None:
+            table = self._build_spawn_table(health, damage, spawn_order)
+            with LevelGenerator._cache_lock:
+                table = self._spawn_tables.setdefault(key, table)
 
-            enemy_data.append({
-                'x': x,
-                'y': y,
-                'health': health,
-                'attack': damage,
-                'behavior': enemy_types[i % len(enemy_types)]
-            })
+        return [
+            {'x': x, 'y': y, 'health': health, 'attack': damage, 'behavior': behavior}
+            for x, y, health, damage, behavior in table
+        ]
 
-        return enemy_data
+    def _build_spawn_table(self, health: float, damage: float, spawn_order: Tuple) -> Tuple[Tuple, ...]:
+        # Spawn points cycle through the behavior file's spawn order
+        return tuple(
+            (x, y, health, damage, BEHAVIOR_NAMES[spawn_order[i % len(spawn_order)]])
+            for i, (x, y) in enumerate(self.enemy_spawns)
+        )
 
 
 class LevelGenerator:
+    # Compiled levels keyed by layout number or (seed, level number), least recently used first
+    _cache: 'OrderedDict[Tuple, Level]' = OrderedDict()
+    _cache_lock = threading.Lock()
+
+    # How many seeds to try before giving up on a procedural level
+    MAX_GENERATION_ATTEMPTS = 10
+
+    # Optional levels.level_store.LevelStore of editor-made levels; they take
+    # precedence over hand-written and generated levels with the same number
+    custom_levels = None
+
+    # One background thread compiles levels ahead of need, see prefetch()
+    _prefetcher: Optional[ThreadPoolExecutor] = None
+    _prefetching: Set[Tuple] = set()
+
+    @staticmethod
+    def create_level(level_number: int, seed: int = None) -> Level:
+        """
+        Return the compiled level for a level number, compiling it on first use.
+
+        Levels saved from the editor come first, then hand-written layouts; every
+        other level number is generated procedurally from the seed
+        (GAME_CONFIG['DUNGEON_SEED'] by default).
+        """
+        custom_levels = LevelGenerator.custom_levels
+        custom = custom_levels.info(level_number) if custom_levels is not None else None
+        if custom is not None:
+            # Saving a level again appends a new record, so the offset identifies the version
+            key = ('custom', level_number, custom.offset)
+        elif level_number in LEVEL_LAYOUTS:
+            key = ('layout', level_number)
+        else:
+            key = ('generated', GAME_CONFIG['DUNGEON_SEED'] if seed is None else seed, level_number)
+
+        with LevelGenerator._cache_lock:
+            level = LevelGenerator._cache.get(key)
+            if level is not None:
+                LevelGenerator._cache.move_to_end(key)
+                return level
+
+        # Compile outside the lock; a concurrent duplicate compile is harmless
+        if key[0] == 'custom':
+            level = custom_levels.load(custom)
+        elif key[0] == 'layout':
+            level = Level(LEVEL_LAYOUTS[level_number])
+        else:
+            level = LevelGenerator.generate_level(
+                level_number, key[1], GAME_CONFIG['DUNGEON_WIDTH'], GAME_CONFIG['DUNGEON_HEIGHT']
+            )
+
+        with LevelGenerator._cache_lock:
+            level = LevelGenerator._cache.setdefault(key, level)
+            while len(LevelGenerator._cache) > GAME_CONFIG['LEVEL_CACHE_SIZE']:
+                LevelGenerator._cache.popitem(last=False)
+        return level
+
+    @staticmethod
+    def prefetch(level_number: int, seed: int = None, config: Dict = None) -> None:
+        """
+        Compile a level and warm its shared caches on a background thread.
+
+        Games call this for the next level while the current one is played, so
+        moving on finds the layout, spawn table, wall list, padded pathfinding
+        mask and the view from the player start already built. Requests for a
+        level that is still queued are dropped; failures surface when the level
+        is actually loaded.
+        """
+        config = config or GAME_CONFIG
+        key = (level_number, seed, config['FOV_RADIUS'])
+        with LevelGenerator._cache_lock:
+            if key in LevelGenerator._prefetching:
+                return
+            LevelGenerator._prefetching.add(key)
+            if LevelGenerator._prefetcher is None:
+                LevelGenerator._prefetcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix='level-prefetch')
+        LevelGenerator._prefetcher.submit(LevelGenerator._warm, key, config)
+
+    @staticmethod
+    def _warm(key: Tuple, config: Dict) -> None:
+        level_number, seed, fov_radius = key
+        try:
+            level = LevelGenerator.create_level(level_number, seed)
+            level.get_enemy_spawn_data(level_number, config)
+            level.walls
+            padded_mask(level.wall_mask, level.width, level.height)
+            compute_fov(level.sight_mask, level.width, level.height, level.player_start, fov_radius)
+        finally:
+            with LevelGenerator._cache_lock:
+                LevelGenerator._prefetching.discard(key)
+
+    @staticmethod
+    def generate_level(level_number: int, seed: int, width: int, height: int) -> Level:
+        """Generate a procedural level that is valid and fully connected."""
+        generator = DungeonGenerator(width, height, seed)
+        for attempt in range(LevelGenerator.MAX_GENERATION_ATTEMPTS):
+            level = Level(generator.generate(level_number, attempt))
+            if level.is_valid and LevelGenerator.is_connected(level):
+                return level
+        raise ValueError(f"Could not generate a valid level {level_number} for seed {seed}")
+
+    @staticmethod
+    def is_connected(level: Level) -> bool:
+        """Check that every open cell can be reached from the player start."""
+        distances = DistanceMap(level.wall_mask, level.width, level.height, level.player_start).distances
+        reached = len(distances) - distances.count(UNREACHABLE)
+        return reached == level.wall_mask.count(0)
+
     @staticmethod
-    def create_level(level_number: int) -> Level:
-        """Create a level instance from the level number."""
-        layout = LEVEL_LAYOUTS.get(level_number, LEVEL_LAYOUTS[1])
-        return Level(layout)
+    def unreachable_spawns(level: Level) -> List[Tuple[int, int]]:
+        """Return the enemy spawns that cannot be walked to from the player start."""
+        distance_map = DistanceMap(level.wall_mask, level.width, level.height, level.player_start,
+                                   stop_at=level.enemy_spawns)
+        return [spawn for spawn in level.enemy_spawns if distance_map.distance(*spawn) == UNREACHABLE]
 
     @staticmethod
     def validate_level(level: Level) -> bool:
         """Validate that a level is properly formed."""
+        return not LevelGenerator.level_problems(level)
+
+    @staticmethod
+    def level_problems(level: Level) -> List[str]:
+        """Describe everything that makes a level malformed; empty when it is valid."""
+        problems = []
+
+        def is_wall(position: Tuple[int, int]) -> bool:
+            x, y = position
+            return level.wall_mask[y * level.width + x] == 1
+
         # Check basic requirements
-        if not level.player_start:
-            return False
+        player_index = level.player_start[1] * level.width + level.player_start[0]
+        if player_index >= len(level.tiles) or level.tiles[player_index] != _PLAYER_ID:
+            problems.append("Level has no player start (P)")
+        elif is_wall(level.player_start):
+            problems.append("Player start is inside a wall")
         if not level.enemy_spawns:
-            return False
+            problems.append("Level has no enemy spawns (E)")
+        problems.extend(f"Enemy spawn at {spawn} is inside a wall"
+                        for spawn in level.enemy_spawns if is_wall(spawn))
 
         # Ensure map is rectangular
-        if not all(len(row) == level.width for row in level.tiles):
-            return False
-
-        # Ensure player start and enemy spawns are not in walls
-        if level.player_start in level.walls:
-            return False
-        if any(spawn in level.walls for spawn in level.enemy_spawns):
-            return False
+        if not level.is_rectangular:
+            problems.append("Level rows are not all the same width")
 
-        return True
\ No newline at end of file
+        return problems
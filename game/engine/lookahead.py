@@ -0,0 +1,100 @@
+"""
+Play candidate player actions a few turns ahead on cloned games.
+
+Each candidate is played from a GameState.clone() with a seeded RNG, then a
+rollout policy picks the player's following moves. Every candidate sees the
+same seeds, so differences between outcomes come from the actions and not
+from luck. Used for move hints, bots and balance testing; the original game
+is never touched.
+"""
+import random
+from typing import Callable, List, NamedTuple, Optional, Sequence, Tuple
+from ..entities.entity import EntityType
+from .behaviors import BehaviorStats
+from .game_state import GameState
+from .pathfinding import DIRECTIONS
+
+# A policy gets the game and the cell one step further along the first action's
+# heading, and picks the cell the player moves towards next, or None to stop
+Policy = Callable[[GameState, Tuple[int, int]], Optional[Tuple[int, int]]]
+
+# Enemy actions in simulated turns are counted here, not in the stats /metrics exports
+SIMULATION_STATS = BehaviorStats()
+
+
+class Outcome(NamedTuple):
+    action: Tuple[int, int]
+    survival: float  # Share of rollouts the player lived through
+    health: float  # Mean player health at the end
+    score: float  # Mean score at the end
+
+
+def candidate_actions(game: GameState) -> List[Tuple[int, int]]:
+    """The neighbouring cells the player can step onto or attack."""
+    _, player = game.get_player()
+    is_wall = game.spatial.is_wall
+    return [(player.x + dx, player.y + dy) for dx, dy in DIRECTIONS if not is_wall(player.x + dx, player.y + dy)]
+
+
+def chase_or_continue(game: GameState, ahead: Tuple[int, int]) -> Optional[Tuple[int, int]]:
+    """Go for the closest visible enemy, otherwise keep walking the way the first action went."""
+    _, player = game.get_player()
+    store = game.entities
+    closest, closest_distance = None, None
+    for entity_id in game.visible_entity_ids():
+        slot = entity_id - 1
+        if store.types[slot] == EntityType.ENEMY:
+            distance = max(abs(store.xs[slot] - player.x), abs(store.ys[slot] - player.y))
+            if closest_distance is None or distance < closest_distance:
+                closest, closest_distance = (store.xs[slot], store.ys[slot]), distance
+    if closest is not None:
+        return closest
+    return ahead
+
+
+def simulate(game: GameState, action: Tuple[int, int], turns: int, rng: random.Random,
+             policy: Policy = chase_or_continue) -> GameState:
+    """Play action and then up to turns - 1 policy moves on a clone, and return the clone."""
+    sim = game.clone(rng)
+    sim.behavior_stats = SIMULATION_STATS
+    _, player = sim.get_player()
+    heading = (action[0] - player.x, action[1] - player.y)
+    sim.try_move_player(*action)
+    for _ in range(turns - 1):
+        if sim.game_over:
+            break
+        _, player = sim.get_player()
+        target = policy(sim, (player.x + heading[0], player.y + heading[1]))
+        if target is None or not sim.try_move_player(*target):
+            break
+    return sim
+
+
+def lookahead(game: GameState, actions: Optional[Sequence[Tuple[int, int]]] = None, turns: int = 4,
+              samples: int = 1, seed: int = 0, policy: Policy = chase_or_continue) -> List[Outcome]:
+    """
+    Score each candidate action, by default every possible step, over samples seeded rollouts.
+
+    Rollout i of every action draws from random.Random(seed + i), so a given
+    game, seed and policy always give the same outcomes.
+    """
+    if actions is None:
+        actions = candidate_actions(game)
+    outcomes = []
+    for action in actions:
+        survived = health = score = 0.0
+        for sample in range(samples):
+            sim = simulate(game, action, turns, random.Random(seed + sample), policy)
+            survived += not sim.game_over
+            health += sim.get_player()[1].health
+            score += sim.score
+        outcomes.append(Outcome(action, survived / samples, health / samples, score / samples))
+    return outcomes
+
+
+def best_action(game: GameState, **options) -> Optional[Outcome]:
+    """The outcome to hint: staying alive first, then score, then health. None if the player cannot move."""
+    outcomes = lookahead(game, **options)
+    if not outcomes:
+        return None
+    return max(outcomes, key=lambda outcome: (outcome.survival, outcome.score, outcome.health))
@@ -0,0 +1,276 @@
+import heapq
+from array import array
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Distance value for cells the search never reached
+UNREACHABLE = 2 ** 31 - 1
+
+# Eight-way movement, orthogonal steps first so ties prefer straight moves
+DIRECTIONS = ((0, -1), (1, 0), (0, 1), (-1, 0), (1, -1), (1, 1), (-1, 1), (-1, -1))
+
+
+@lru_cache(maxsize=32)
+def padded_mask(wall_mask: bytes, width: int, height: int) -> bytes:
+    """
+    Return the wall mask surrounded by a one-cell blocked border.
+
+    Searches run on the padded grid so neighbour lookups are plain index offsets
+    without per-step bounds checks. Results are cached per compiled level.
+    """
+    stride = width + 2
+    padded = bytearray(b'\x01' * (stride * (height + 2)))
+    for y in range(height):
+        row = wall_mask[y * width:(y + 1) * width]
+        start = (y + 1) * stride + 1
+        padded[start:start + width] = row
+    return bytes(padded)
+
+
+def neighbour_offsets(stride: int) -> Tuple[int, ...]:
+    """Flat index offsets for DIRECTIONS on a grid with the given row stride."""
+    return tuple(dy * stride + dx for dx, dy in DIRECTIONS)
+
+
+class DistanceMap:
+    """
+    Breadth-first step distances from a goal to every reachable cell.
+
+    Built once per turn from the player's position and shared by every chasing
+    enemy: each one simply steps to the neighbour closest to the goal. Only walls
+    are considered, since entities move between turns.
+    """
+
+    __slots__ = ('width', 'height', 'stride', 'distances')
+
+    def __init__(self, wall_mask: bytes, width: int, height: int, goal: Tuple[int, int],
+                 stop_at: Iterable[Tuple[int, int]] = (), max_distance: Optional[int] = None):
+        self.width = width
+        self.height = height
+        self.stride = stride = width + 2
+        mask = padded_mask(wall_mask, width, height)
+        self.distances = distances = array('i', [UNREACHABLE]) * len(mask)
+
+        # Cells whose distance we need; once all are reached the search can stop early
+        pending = {(y + 1) * stride + x + 1 for x, y in stop_at}
+
+        seen = bytearray(mask)
+        start = (goal[1] + 1) * stride + goal[0] + 1
+        seen[start] = 1
+        distances[start] = 0
+        pending.discard(start)
+
+        offsets = neighbour_offsets(stride)
+        frontier = [start]
+        distance = 0
+        while frontier:
+            if stop_at and not pending:
+                break
+            distance += 1
+            if max_distance is not None and distance > max_distance:
+                break
+            next_frontier = []
+            for index in frontier:
+                for offset in offsets:
+                    neighbour = index + offset
+                    if not seen[neighbour]:
+                        seen[neighbour] = 1
+                        distances[neighbour] = distance
+                        next_frontier.append(neighbour)
+            if pending:
+                pending.difference_update(next_frontier)
+            frontier = next_frontier
+
+    def distance(self, x: int, y: int) -> int:
+        """Return the step distance from a cell to the goal, or UNREACHABLE."""
+        return self.distances[(y + 1) * self.stride + x + 1]
+
+    def best_step(self, x: int, y: int,
+                  is_blocked: Callable[[int, int], bool]) -> Optional[Tuple[int, int]]:
+        """Return the open neighbour that gets closest to the goal, if any is closer."""
+        stride = self.stride
+        distances = self.distances
+        best = distances[(y + 1) * stride + x + 1]
+        best_step = None
+        for dx, dy in DIRECTIONS:
+            nx, ny = x + dx, y + dy
+            distance = distances[(ny + 1) * stride + nx + 1]
+            if distance < best and not is_blocked(nx, ny):
+                best = distance
+                best_step = (nx, ny)
+        return best_step
+
+
+def find_path(wall_mask: bytes, width: int, height: int,
+              start: Tuple[int, int], goal: Tuple[int, int],
+              max_nodes: int = 4096) -> List[Tuple[int, int]]:
+    """
+    Find a shortest eight-way path with A*, ignoring entities.
+
+    Returns the cells after start up to and including goal. If the goal cannot be
+    reached within max_nodes expansions, returns the path to the explored cell
+    closest to it, so callers still make progress. Returns [] when stuck.
+    """
+    stride = width + 2
+    mask = padded_mask(wall_mask, width, height)
+    offsets = neighbour_offsets(stride)
+    start_index = (start[1] + 1) * stride + start[0] + 1
+    goal_x, goal_y = goal[0] + 1, goal[1] + 1
+    goal_index = goal_y * stride + goal_x
+
+    def heuristic(index: int) -> int:
+        # Chebyshev distance is exact on an open eight-way grid
+        y, x = divmod(index, stride)
+        return max(abs(x - goal_x), abs(y - goal_y))
+
+    came_from: Dict[int, int] = {start_index: start_index}
+    cost = {start_index: 0}
+    closest, closest_h = start_index, heuristic(start_index)
+    open_heap = [(closest_h, 0, start_index)]
+    expanded = 0
+
+    while open_heap and expanded < max_nodes:
+        _, g, index = heapq.heappop(open_heap)
+        if g > cost[index]:
+            continue
+        if index == goal_index:
+            closest = index
+            break
+        expanded += 1
+
+        h = heuristic(index)
+        if h < closest_h:
+            closest, closest_h = index, h
+
+        for offset in offsets:
+            neighbour = index + offset
+            if mask[neighbour] and neighbour != goal_index:
+                continue
+            new_cost = g + 1
+            if new_cost < cost.get(neighbour, UNREACHABLE):
+                cost[neighbour] = new_cost
+                came_from[neighbour] = index
+                heapq.heappush(open_heap, (new_cost + heuristic(neighbour), new_cost, neighbour))
+
+    path = []
+    index = closest
+    while index != start_index:
+        y, x = divmod(index, stride)
+        path.append((x - 1, y - 1))
+        index = came_from[index]
+    path.reverse()
+    return path
+
+
+def path_to_nearest(wall_mask: bytes, width: int, height: int, start: Tuple[int, int],
+                    done: bytes) -> List[Tuple[int, int]]:
+    """
+    Find a shortest eight-way path to the closest open cell whose flag in done is 0.
+
+    done is indexed like the wall mask, by y * width + x. Returns the cells after
+    start up to and including the one found, or [] when every reachable cell is done.
+    """
+    stride = width + 2
+    offsets = neighbour_offsets(stride)
+    start_index = (start[1] + 1) * stride + start[0] + 1
+    seen = bytearray(padded_mask(wall_mask, width, height))
+    seen[start_index] = 1
+    came_from = {start_index: start_index}
+
+    frontier = [start_index]
+    found = None
+    while frontier and found is None:
+        next_frontier = []
+        for index in frontier:
+            for offset in offsets:
+                neighbour = index + offset
+                if seen[neighbour]:
+                    continue
+                seen[neighbour] = 1
+                came_from[neighbour] = index
+                y, x = divmod(neighbour, stride)
+                if not done[(y - 1) * width + x - 1]:
+                    found = neighbour
+                    break
+                next_frontier.append(neighbour)
+            if found is not None:
+                break
+        frontier = next_frontier
+
+    path = []
+    index = found if found is not None else start_index
+    while index != start_index:
+        y, x = divmod(index, stride)
+        path.append((x - 1, y - 1))
+        index = came_from[index]
+    path.reverse()
+    return path
+
+
+class PathCache:
+    """
+    Per-entity A* paths that are reused across turns.
+
+    A path is followed until it runs out, its next step hits a wall, or the
+    target has drifted more than repath_tolerance cells from the goal it was
+    computed for; only then is a new search run.
+    """
+
+    def __init__(self, repath_tolerance: int = 2, max_nodes: int = 4096):
+        self.repath_tolerance = repath_tolerance
+        self.max_nodes = max_nodes
+        # entity_id -> (goal, remaining steps stored in reverse so pop() is O(1))
+        self._paths: Dict[int, Tuple[Tuple[int, int], List[Tuple[int, int]]]] = {}
+        self.searches = 0
+
+    def next_step(self, entity_id: int, start: Tuple[int, int], goal: Tuple[int, int],
+                  wall_mask: bytes, width: int, height: int) -> Optional[Tuple[int, int]]:
+        """Return the next cell on the entity's path towards goal, without consuming it."""
+        cached = self._paths.get(entity_id)
+        if cached is not None:
+            cached_goal, steps = cached
+            drift = max(abs(cached_goal[0] - goal[0]), abs(cached_goal[1] - goal[1]))
+            if steps and drift <= self.repath_tolerance and self._is_adjacent(start, steps[-1]):
+                return steps[-1]
+
+        steps = find_path(wall_mask, width, height, start, goal, self.max_nodes)
+        self.searches += 1
+        steps.reverse()
+        self._paths[entity_id] = (goal, steps)
+        return steps[-1] if steps else None
+
+    def advance(self, entity_id: int) -> None:
+        """Consume the step returned by next_step after the entity moved onto it."""
+        cached = self._paths.get(entity_id)
+        if cached is not None and cached[1]:
+            cached[1].pop()
+
+    def forget(self, entity_id: int) -> None:
+        """Drop the cached path for an entity."""
+        self._paths.pop(entity_id, None)
+
+    def clear(self) -> None:
+        """Drop every cached path."""
+        self._paths.clear()
+
+    def copy(self) -> 'PathCache':
+        """Return a cache holding the same paths, so a copied game's enemies keep following them."""
+        cache = PathCache(self.repath_tolerance, self.max_nodes)
+        cache._paths = {entity_id: (goal, steps[:]) for entity_id, (goal, steps) in self._paths.items()}
+        cache.searches = self.searches
+        return cache
+
+    def snapshot(self) -> Tuple[int, List[Tuple[int, Tuple[int, int], List[Tuple[int, int]]]]]:
+        """Return the search counter and every (entity_id, goal, remaining steps in reverse)."""
+        return self.searches, [(entity_id, goal, list(steps)) for entity_id, (goal, steps) in self._paths.items()]
+
+    @classmethod
+    def restore(cls, repath_tolerance: int, max_nodes: int, data) -> 'PathCache':
+        cache = cls(repath_tolerance, max_nodes)
+        cache.searches = data[0]
+        cache._paths = {entity_id: (tuple(goal), [tuple(step) for step in steps]) for entity_id, goal, steps in data[1]}
+        return cache
+
+    @staticmethod
+    def _is_adjacent(a: Tuple[int, int], b: Tuple[int, int]) -> bool:
+        return max(abs(a[0] - b[0]), abs(a[1] - b[1])) == 1
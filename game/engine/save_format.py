@@ -0,0 +1,290 @@
+import json
+import struct
+import zlib
+from array import array
+from typing import BinaryIO, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from .game_state import GameState, ACTION_MOVE, ACTION_RESET
+
+# Every save starts with this header; the tick sits at a fixed offset so stores
+# can poll it without decoding the rest
+SAVE_MAGIC = b'RLGS'
+SAVE_FORMAT = 6
+SAVE_HEADER = struct.Struct('<4sHq')  # magic, format version, tick
+
+# Fixed-size scalars that follow the header, before the compressed sections:
+# current_level, level_tick, visible_tick, score, command_seq, scheduler time,
+# player_id (0 = none), game_over, combat_this_turn
+SAVE_SCALARS = struct.Struct('<iqqqqqi??')
+
+# Mersenne Twister state: version, 625 words, and an optional cached gauss value
+RNG_HEADER = struct.Struct('<B?d')
+
+ENTITY_COUNT = struct.Struct('<I')
+PATH_HEADER = struct.Struct('<qI')  # A* searches run, cached paths
+EVENT_HEADER = struct.Struct('<qI')  # next event seq, events kept
+BLOB_LENGTH = struct.Struct('<I')
+
+# Action log: file header, then one fixed-size record per player action
+LOG_MAGIC = b'RLAL'
+LOG_FORMAT = 1
+LOG_HEADER = struct.Struct('<4sH')
+LOG_RECORD = struct.Struct('<qBii')  # tick before the action, action code, x, y
+
+
+# -----------------
+# Snapshots
+# -----------------
+
+def encode_game(game: GameState) -> bytes:
+    """
+    Pack a game into a versioned binary save.
+
+    Entity columns, ticks and map memory are written as raw typed arrays and the
+    body is zlib-compressed. The level is referenced by number, dungeon seed and
+    geometry version rather than stored.
+    """
+    snapshot = game.snapshot()
+    xs, ys, health, attack, types, behaviors, alive, free = snapshot['entities']
+    rng_version, rng_words, gauss = snapshot['rng']
+    scheduler_time, awake = snapshot['scheduler']
+    world, world_explored = _encode_world(snapshot['world'])
+    next_seq, event_types, *event_columns, event_texts = snapshot['events']
+
+    sections = [
+        snapshot['geometry_version'].encode('ascii'),
+        json.dumps(snapshot['config'], separators=(',', ':')).encode('utf-8'),
+        RNG_HEADER.pack(rng_version, gauss is not None, gauss or 0.0) + array('I', rng_words).tobytes(),
+        EVENT_HEADER.pack(next_seq, len(event_types)) + event_types + b''.join(event_columns),
+        json.dumps(event_texts, separators=(',', ':')).encode('utf-8'),
+        array('i', snapshot['entity_ticks'].keys()).tobytes(),
+        array('q', snapshot['entity_ticks'].values()).tobytes(),
+        ENTITY_COUNT.pack(len(types)) + xs + ys + health + attack + types + behaviors + alive,
+        array('i', free).tobytes(),
+        snapshot['explored'],
+        snapshot['explored_cells'],
+        snapshot['explored_ticks'],
+        array('i', [entity_id for entity_id, _ in awake]).tobytes(),
+        array('q', [when for _, when in awake]).tobytes(),
+        world,
+        world_explored,
+        _encode_paths(snapshot['paths']),
+    ]
+    body = b''.join(BLOB_LENGTH.pack(len(section)) + section for section in sections)
+
+    scalars = SAVE_SCALARS.pack(
+        snapshot['current_level'], snapshot['level_tick'], snapshot['visible_tick'],
+        snapshot['score'], snapshot['command_seq'], scheduler_time, snapshot['player_id'] or 0,
+        snapshot['game_over'], snapshot['combat_this_turn'])
+    return SAVE_HEADER.pack(SAVE_MAGIC, SAVE_FORMAT, snapshot['tick']) + scalars + zlib.compress(body, 1)
+
+
+def decode_game(data: bytes) -> GameState:
+    """Rebuild a game from encode_game(); raises ValueError for unreadable or stale saves."""
+    if len(data) < SAVE_HEADER.size + SAVE_SCALARS.size:
+        raise ValueError("Save is truncated")
+    magic, version, tick = SAVE_HEADER.unpack_from(data)
+    if magic != SAVE_MAGIC or version != SAVE_FORMAT:
+        raise ValueError(f"Unsupported save format {magic!r} v{version}")
+    (current_level, level_tick, visible_tick, score, command_seq, scheduler_time, player_id,
+     game_over, combat_this_turn) = SAVE_SCALARS.unpack_from(data, SAVE_HEADER.size)
+
+    try:
+        sections = _split_sections(zlib.decompress(data[SAVE_HEADER.size + SAVE_SCALARS.size:]))
+        (geometry_version, config, rng, events, event_texts, entity_ids, entity_ticks,
+         entities, free, explored, explored_cells, explored_ticks, awake_ids, awake_times,
+         world, world_explored, paths) = sections
+    except (zlib.error, struct.error, ValueError) as e:
+        raise ValueError(f"Corrupt save: {e}") from e
+
+    rng_version, has_gauss, gauss = RNG_HEADER.unpack_from(rng)
+    count, = ENTITY_COUNT.unpack_from(entities)
+    columns = []
+    offset = ENTITY_COUNT.size
+    for width in (4, 4, 8, 8, 1, 1, 1):  # xs, ys, health, attack, types, behaviors, alive
+        columns.append(entities[offset:offset + width * count])
+        offset += width * count
+
+    next_seq, event_count = EVENT_HEADER.unpack_from(events)
+    event_columns = []
+    offset = EVENT_HEADER.size
+    for width in (1, 8, 4, 4, 8, 4):  # types, ticks, actors, targets, amounts, details
+        event_columns.append(events[offset:offset + width * event_count])
+        offset += width * event_count
+
+    return GameState.from_snapshot({
+        'config': json.loads(config),
+        'rng': (rng_version, tuple(array('I', rng[RNG_HEADER.size:])), gauss if has_gauss else None),
+        'current_level': current_level,
+        'geometry_version': geometry_version.decode('ascii'),
+        'tick': tick,
+        'level_tick': level_tick,
+        'visible_tick': visible_tick,
+        'score': score,
+        'game_over': game_over,
+        'combat_this_turn': combat_this_turn,
+        'command_seq': command_seq,
+        'player_id': player_id or None,
+        'events': (next_seq, *event_columns,
+                   {int(index): text for index, text in json.loads(event_texts).items()}),
+        'entity_ticks': dict(zip(array('i', entity_ids), array('q', entity_ticks))),
+        'entities': (*columns, array('i', free).tolist()),
+        'explored': explored,
+        'explored_cells': explored_cells,
+        'explored_ticks': explored_ticks,
+        'scheduler': (scheduler_time, list(zip(array('i', awake_ids), array('q', awake_times)))),
+        'world': _decode_world(world, world_explored),
+        'paths': _decode_paths(paths),
+    })
+
+
+def read_tick(header: bytes) -> Optional[int]:
+    """Return the tick stored in a save's header, None if it is not a save."""
+    if len(header) < SAVE_HEADER.size:
+        return None
+    magic, version, tick = SAVE_HEADER.unpack_from(header)
+    return tick if magic == SAVE_MAGIC and version == SAVE_FORMAT else None
+
+
+def _encode_world(world: Optional[Dict]) -> Tuple[bytes, bytes]:
+    # Overworld bookkeeping as JSON, with chunk map memory concatenated in key order
+    if world is None:
+        return b'', b''
+    explored = world['explored']
+    header = {
+        'origin': world['origin'],
+        'explored': list(explored),
+        'parked': [[cx, cy, parked] for (cx, cy), parked in world['parked'].items()],
+    }
+    return json.dumps(header, separators=(',', ':')).encode('utf-8'), b''.join(explored.values())
+
+
+def _decode_world(header: bytes, explored: bytes) -> Optional[Dict]:
+    if not header:
+        return None
+    world = json.loads(header)
+    keys = [tuple(key) for key in world['explored']]
+    size = len(explored) // len(keys) if keys else 0
+    return {
+        'origin': tuple(world['origin']),
+        'explored': {key: explored[i * size:(i + 1) * size] for i, key in enumerate(keys)},
+        'parked': {(cx, cy): [tuple(entity) for entity in parked] for cx, cy, parked in world['parked']},
+    }
+
+
+def _encode_paths(paths: Tuple) -> bytes:
+    # Entity IDs, goals and step counts as columns, then every path's steps back to back
+    searches, entries = paths
+    goals = array('i')
+    lengths = array('I')
+    steps = array('i')
+    for _, goal, path in entries:
+        goals.extend(goal)
+        lengths.append(len(path))
+        for step in path:
+            steps.extend(step)
+    entity_ids = array('i', [entity_id for entity_id, _, _ in entries])
+    return (PATH_HEADER.pack(searches, len(entries)) + entity_ids.tobytes() + goals.tobytes() +
+            lengths.tobytes() + steps.tobytes())
+
+
+def _decode_paths(data: bytes) -> Tuple:
+    searches, count = PATH_HEADER.unpack_from(data)
+    offset = PATH_HEADER.size
+    entity_ids = array('i', data[offset:offset + 4 * count])
+    offset += 4 * count
+    goals = array('i', data[offset:offset + 8 * count])
+    offset += 8 * count
+    lengths = array('I', data[offset:offset + 4 * count])
+    offset += 4 * count
+    steps = array('i', data[offset:])
+    entries = []
+    start = 0
+    for i, entity_id in enumerate(entity_ids):
+        end = start + 2 * lengths[i]
+        entries.append((entity_id, (goals[2 * i], goals[2 * i + 1]),
+                        list(zip(steps[start:end:2], steps[start + 1:end:2]))))
+        start = end
+    return searches, entries
+
+
+def _split_sections(body: bytes) -> List[bytes]:
+    sections = []
+    offset = 0
+    while offset < len(body):
+        length, = BLOB_LENGTH.unpack_from(body, offset)
+        offset += BLOB_LENGTH.size
+        sections.append(body[offset:offset + length])
+        offset += length
+    return sections
+
+
+# -----------------
+# Action log
+# -----------------
+
+class Action(NamedTuple):
+    tick: int  # Game tick before the action was applied
+    action: int
+    x: int
+    y: int
+
+
+class ActionLog:
+    """
+    Append-only log of player actions, in memory or backed by a file.
+
+    Together with a snapshot taken at some tick, the actions recorded after it
+    replay the run exactly, since the snapshot carries the RNG state. Each record
+    is a fixed LOG_RECORD.size bytes, so a turn costs a few bytes rather than a
+    full snapshot.
+    """
+
+    def __init__(self, stream: Optional[BinaryIO] = None):
+        self.stream = stream
+        self.buffer = bytearray(LOG_HEADER.pack(LOG_MAGIC, LOG_FORMAT))
+        if stream is not None and stream.tell() == 0:
+            stream.write(self.buffer)
+
+    def record(self, tick: int, action: int, x: int = 0, y: int = 0) -> None:
+        data = LOG_RECORD.pack(tick, action, x, y)
+        if self.stream is not None:
+            self.stream.write(data)
+        else:
+            self.buffer += data
+
+    def __bytes__(self) -> bytes:
+        return bytes(self.buffer)
+
+    @staticmethod
+    def read(data: bytes) -> Iterator[Action]:
+        """Yield the actions stored in a log's bytes; a torn final record is ignored."""
+        magic, version = LOG_HEADER.unpack_from(data)
+        if magic != LOG_MAGIC or version != LOG_FORMAT:
+            raise ValueError(f"Unsupported action log {magic!r} v{version}")
+        end = len(data) - (len(data) - LOG_HEADER.size) % LOG_RECORD.size
+        for fields in LOG_RECORD.iter_unpack(data[LOG_HEADER.size:end]):
+            yield Action(*fields)
+
+
+def replay(snapshot: bytes, actions: Iterable[Action], until_tick: Optional[int] = None) -> GameState:
+    """
+    Restore a snapshot and re-apply the logged actions recorded after it.
+
+    Stops before the first action at or past until_tick. Raises ValueError if the
+    log does not line up with the game, which means the run diverged.
+    """
+    game = decode_game(snapshot)
+    for action in actions:
+        if action.tick < game.tick:
+            continue  # Already part of the snapshot
+        if until_tick is not None and action.tick >= until_tick:
+            break
+        if action.tick != game.tick:
+            raise ValueError(f"Action log expects tick {action.tick} but the game is at {game.tick}")
+        if action.action == ACTION_MOVE:
+            game.try_move_player(action.x, action.y)
+        elif action.action == ACTION_RESET:
+            game.initialize_level()
+        else:
+            raise ValueError(f"Unknown action code {action.action}")
+    return game
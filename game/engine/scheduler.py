@@ -0,0 +1,134 @@
+import heapq
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Game time is counted in ticks of energy: one player turn lasts TURN_LENGTH, and
+# an actor with speed S acts every TURN_LENGTH * NORMAL_SPEED / S, so speed 100
+# acts once per turn, 200 twice and 50 every other turn.
+TURN_LENGTH = 100
+NORMAL_SPEED = 100
+
+
+def action_delay(speed: int) -> int:
+    """Time between two actions of an actor with the given speed."""
+    return max(1, TURN_LENGTH * NORMAL_SPEED // max(1, speed))
+
+
+class TurnScheduler:
+    """
+    Priority queue of awake actors keyed by the time of their next action.
+
+    Actors that are not in the queue are dormant and cost nothing per turn; they
+    join it through wake(). run() yields the actors due within one turn in time
+    order (ties in ID order), and an actor only stays awake if the caller
+    reschedules it, so letting an actor fall asleep is simply not doing so.
+    """
+
+    __slots__ = ('time', 'now', '_queue', '_entries')
+
+    def __init__(self):
+        self.time = 0  # Start of the next turn
+        self.now = 0  # Time of the action being taken inside run()
+        # Entries are [time, entity_id, live]; sleeping or rescheduling clears the
+        # live flag of the old entry instead of searching the heap for it
+        self._queue: List[list] = []
+        self._entries: Dict[int, list] = {}
+
+    def wake(self, entity_id: int) -> None:
+        """Let a dormant actor act from the start of the next turn; awake actors are left alone."""
+        if entity_id not in self._entries:
+            self._push(entity_id, self.time)
+
+    def sleep(self, entity_id: int) -> None:
+        """Drop an actor from the queue, e.g. when it dies."""
+        entry = self._entries.pop(entity_id, None)
+        if entry is not None:
+            entry[2] = False
+
+    def schedule(self, entity_id: int, delay: int, when: Optional[int] = None) -> None:
+        """Queue an actor to act again delay after its last action, by default the one run() just yielded."""
+        self._push(entity_id, (self.now if when is None else when) + delay)
+
+    def run(self, duration: int = TURN_LENGTH) -> Iterator[int]:
+        """Yield every actor due before the end of this turn, then start the next one."""
+        end = self.time + duration
+        queue = self._queue
+        entries = self._entries
+        while queue and queue[0][0] < end:
+            when, entity_id, live = heapq.heappop(queue)
+            if live:
+                del entries[entity_id]
+                self.now = when
+                yield entity_id
+        self.time = self.now = end
+
+    def run_batches(self, duration: int, min_delay: int) -> Iterator[List[Tuple[int, int]]]:
+        """
+        Like run(), but yield the due actors as lists of (time, entity_id).
+
+        A batch ends min_delay after its first action, so no actor rescheduled
+        from it can come due inside it: acting on a whole batch and then calling
+        schedule(entity_id, delay, time) for each actor keeps run()'s order.
+        """
+        end = self.time + duration
+        queue = self._queue
+        entries = self._entries
+        while queue and queue[0][0] < end:
+            limit = min(end, queue[0][0] + min_delay)
+            batch = []
+            while queue and queue[0][0] < limit:
+                when, entity_id, live = heapq.heappop(queue)
+                if live:
+                    del entries[entity_id]
+                    batch.append((when, entity_id))
+            if batch:
+                yield batch
+        self.time = self.now = end
+
+    def is_awake(self, entity_id: int) -> bool:
+        return entity_id in self._entries
+
+    def awake_ids(self) -> List[int]:
+        return list(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def copy(self) -> 'TurnScheduler':
+        """Return an independent scheduler in the same state, without re-sorting the queue."""
+        scheduler = TurnScheduler()
+        scheduler.time = self.time
+        scheduler.now = self.now
+        scheduler._queue = [entry[:] for entry in self._queue]
+        # Only one entry per actor is live, so the live entries rebuild the lookup
+        scheduler._entries = {entry[1]: entry for entry in scheduler._queue if entry[2]}
+        return scheduler
+
+    def clear(self) -> None:
+        self._queue.clear()
+        self._entries.clear()
+
+    def _push(self, entity_id: int, when: int) -> None:
+        self.sleep(entity_id)
+        entry = [when, entity_id, True]
+        self._entries[entity_id] = entry
+        heapq.heappush(self._queue, entry)
+        if len(self._queue) > 2 * len(self._entries) + 64:
+            # Too many dead entries: rebuild from the live ones
+            self._queue[:] = [entry for entry in self._queue if entry[2]]
+            heapq.heapify(self._queue)
+
+    # -----------------
+    # Serialization
+    # -----------------
+
+    def snapshot(self) -> Tuple[int, List[Tuple[int, int]]]:
+        """Return the clock and the (entity_id, next action time) of every awake actor."""
+        return self.time, [(entity_id, entry[0]) for entity_id, entry in self._entries.items()]
+
+    @classmethod
+    def restore(cls, data: Tuple[int, List[Tuple[int, int]]]) -> 'TurnScheduler':
+        scheduler = cls()
+        scheduler.time = scheduler.now = data[0]
+        for entity_id, when in data[1]:
+            scheduler._push(entity_id, when)
+        return scheduler
@@ -0,0 +1,175 @@
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+from .game_state import GameState
+
+# Rough per-object costs used to estimate how much memory a session holds.
+# Level geometry is shared between sessions, so only entities are counted:
+# their packed columns plus the per-entity delta bookkeeping. Overworld games
+# also hold the entities and map memory of the chunks they left behind.
+BASE_SESSION_BYTES = 4096
+BYTES_PER_ENTITY = 160
+BYTES_PER_PARKED_ENTITY = 120
+BYTES_PER_EVENT = 29  # One slot of the fixed-size event log's columns
+
+
+def estimate_state_size(state: GameState) -> int:
+    """Estimate the memory footprint of a game state in bytes."""
+    parked = sum(len(entities) for entities in state.world_parked.values())
+    explored = sum(len(memory) for memory in state.world_explored.values())
+    return (BASE_SESSION_BYTES + BYTES_PER_ENTITY * len(state.entities) +
+            BYTES_PER_PARKED_ENTITY * parked + explored + BYTES_PER_EVENT * state.events.capacity)
+
+
+class _Session:
+    __slots__ = ('state', 'last_seen', 'size')
+
+    def __init__(self, state: GameState, last_seen: float, size: int):
+        self.state = state
+        self.last_seen = last_seen
+        self.size = size
+
+
+class SessionManager:
+    """
+    Keeps one GameState per player session in a bounded LRU registry.
+
+    Sessions are evicted when the registry holds more than max_sessions entries,
+    when they have been idle for longer than idle_timeout seconds, or when the
+    estimated memory of all sessions exceeds memory_cap bytes. The least recently
+    used session is always evicted first.
+    """
+
+    def __init__(self,
+                 factory: Callable[[], GameState] = GameState,
+                 max_sessions: int = 5000,
+                 idle_timeout: float = 1800.0,
+                 memory_cap: int = 256 * 1024 * 1024,
+                 clock: Callable[[], float] = time.monotonic):
+        self.factory = factory
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.memory_cap = memory_cap
+        self.clock = clock
+        self._sessions: 'OrderedDict[str, _Session]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.created = 0
+        self.evictions: Dict[str, int] = {'lru': 0, 'idle': 0, 'memory': 0}
+
+    def get_or_create(self, token: Optional[str]) -> Tuple[str, GameState]:
+        """Return the session for a token, creating a new one if it is unknown or expired."""
+        state = self.get(token)
+        if state is not None:
+            return token, state
+
+        # Build the new state outside the lock, level setup is the slow part
+        state = self.factory()
+        size = estimate_state_size(state)
+        new_token = secrets.token_urlsafe(16)
+
+        with self._lock:
+            now = self.clock()
+            self._sessions[new_token] = _Session(state, now, size)
+            self.total_bytes += size
+            self.created += 1
+            self._evict(now)
+
+        return new_token, state
+
+    def get(self, token: Optional[str]) -> Optional[GameState]:
+        """Return the state for a live session and mark it as recently used."""
+        if not token:
+            return None
+
+        with self._lock:
+            now = self.clock()
+            self._evict_idle(now)
+            session = self._sessions.get(token)
+            if session is None:
+                return None
+            session.last_seen = now
+            self._sessions.move_to_end(token)
+            return session.state
+
+    def peek(self, token: Optional[str]) -> Optional[GameState]:
+        """
+        Return the state for a live session without marking it as used.
+
+        For observers such as open event streams, which must not keep an
+        abandoned session from idling out or being evicted.
+        """
+        if not token:
+            return None
+
+        with self._lock:
+            self._evict_idle(self.clock())
+            session = self._sessions.get(token)
+            return session.state if session is not None else None
+
+    def resize(self, token: str, state: GameState) -> None:
+        """
+        Re-estimate a session's size after a request changed its state.
+
+        Overworld sessions grow as the player leaves chunks behind, so the size
+        taken at creation soon understates them. The caller must hold the session's
+        lock, so the state is not changing while it is measured.
+        """
+        size = estimate_state_size(state)
+        with self._lock:
+            session = self._sessions.get(token)
+            if session is None or session.state is not state:
+                return  # Evicted or replaced meanwhile
+            self.total_bytes += size - session.size
+            session.size = size
+            self._evict(self.clock())
+
+    def discard(self, token: str) -> None:
+        """Forget a session immediately."""
+        with self._lock:
+            session = self._sessions.pop(token, None)
+            if session is not None:
+                self.total_bytes -= session.size
+
+    def stats(self) -> Dict:
+        """Return registry counters for sizing the session cap."""
+        with self._lock:
+            return {
+                'active_sessions': len(self._sessions),
+                'created': self.created,
+                'estimated_bytes': self.total_bytes,
+                'max_sessions': self.max_sessions,
+                'memory_cap': self.memory_cap,
+                'idle_timeout': self.idle_timeout,
+                'evictions': dict(self.evictions),
+            }
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    # -----------------
+    # Eviction (caller must hold the lock)
+    # -----------------
+
+    def _evict(self, now: float) -> None:
+        self._evict_idle(now)
+        while len(self._sessions) > self.max_sessions:
+            self._pop_oldest('lru')
+        # Always keep the newest session, even if it alone exceeds the cap
+        while self.total_bytes > self.memory_cap and len(self._sessions) > 1:
+            self._pop_oldest('memory')
+
+    def _evict_idle(self, now: float) -> None:
+        # The dict is ordered by last access, so idle sessions are all at the front
+        while self._sessions:
+            token, session = next(iter(self._sessions.items()))
+            if now - session.last_seen < self.idle_timeout:
+                break
+            self._pop_oldest('idle')
+
+    def _pop_oldest(self, reason: str) -> None:
+        _, session = self._sessions.popitem(last=False)
+        self.total_bytes -= session.size
+        self.evictions[reason] += 1
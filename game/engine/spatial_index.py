@@ -0,0 +1,79 @@
+from typing import Dict, Optional
+
+
+class SpatialIndex:
+    """
+    Grid-backed occupancy index for walls and living entities.
+
+    Walls are stored as a flat wall mask (one byte per cell, row-major) and
+    living entities as a map from cell index to entity ID, so collision and
+    target lookups are O(1) regardless of map size or entity count. The wall
+    mask is usually a compiled level's immutable bytes, shared between sessions.
+    """
+
+    def __init__(self, width: int, height: int, wall_mask: Optional[bytes] = None):
+        self.width = width
+        self.height = height
+        self.wall_mask = wall_mask if wall_mask is not None else bytes(width * height)
+        self.occupants: Dict[int, int] = {}
+
+    # -----------------
+    # Queries
+    # -----------------
+
+    def in_bounds(self, x: int, y: int) -> bool:
+        """Check if a position lies inside the map."""
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def is_wall(self, x: int, y: int) -> bool:
+        """Check if a position holds a wall. Out-of-bounds cells count as walls."""
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return True
+        return self.wall_mask[y * self.width + x] == 1
+
+    def entity_at(self, x: int, y: int) -> Optional[int]:
+        """Return the ID of the living entity at a position, if any. None out of bounds."""
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return None
+        return self.occupants.get(y * self.width + x)
+
+    def is_blocked(self, x: int, y: int) -> bool:
+        """Check if a position is out of bounds, a wall, or occupied."""
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return True
+        index = y * self.width + x
+        return self.wall_mask[index] == 1 or index in self.occupants
+
+    # -----------------
+    # Updates
+    # -----------------
+
+    def place(self, entity_id: int, x: int, y: int) -> None:
+        """Register an entity at a position."""
+        self.occupants[y * self.width + x] = entity_id
+
+    def move(self, entity_id: int, old_x: int, old_y: int, new_x: int, new_y: int) -> None:
+        """Move an entity's registration from one position to another."""
+        old_index = old_y * self.width + old_x
+        if self.occupants.get(old_index) == entity_id:
+            del self.occupants[old_index]
+        self.occupants[new_y * self.width + new_x] = entity_id
+
+    def remove(self, entity_id: int, x: int, y: int) -> None:
+        """Drop an entity's registration, e.g. when it dies."""
+        index = y * self.width + x
+        if self.occupants.get(index) == entity_id:
+            del self.occupants[index]
+
+    def copy(self) -> 'SpatialIndex':
+        """Return an index with its own occupants that shares this one's wall mask."""
+        index = SpatialIndex.__new__(SpatialIndex)
+        index.width = self.width
+        index.height = self.height
+        index.wall_mask = self.wall_mask
+        index.occupants = self.occupants.copy()
+        return index
+
+    def clear_entities(self) -> None:
+        """Forget all entity registrations but keep the walls."""
+        self.occupants.clear()
@@ -0,0 +1,338 @@
+import os
+import re
+import secrets
+import threading
+import time
+import weakref
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Callable, ContextManager, Dict, Iterator, Optional, Tuple
+from .game_state import GameState
+from .save_format import SAVE_HEADER, decode_game, encode_game, read_tick
+from .session_manager import SessionManager
+
+try:
+    import fcntl
+except ImportError:  # Windows: FileStateStore is unavailable
+    fcntl = None
+
+# Session tokens double as file names and keys, so only accept what we hand out
+TOKEN_PATTERN = re.compile(r'[A-Za-z0-9_-]{16,64}')
+
+
+class StateStore(ABC):
+    """
+    Where game states live between requests.
+
+    checkout() yields the caller's session with an exclusive per-session lock
+    held, so concurrent requests for the same run are applied one at a time.
+    Unknown or expired tokens get a new session unless create is False, in
+    which case KeyError is raised. Stores with shared set to True can be used by
+    several worker processes at once.
+    """
+
+    shared = False
+
+    @abstractmethod
+    def checkout(self, token: Optional[str], create: bool = True) -> ContextManager[Tuple[str, GameState]]:
+        """Yield (session_id, game) with the session's lock held."""
+
+    @abstractmethod
+    def tick(self, session_id: str) -> Optional[int]:
+        """Return a session's current tick without loading it or counting as activity, None if it is gone."""
+
+    @abstractmethod
+    def stats(self) -> Dict:
+        """Return counters for the /sessions/stats endpoint."""
+
+
+class MemoryStateStore(StateStore):
+    """Keeps live GameState objects in this process through a SessionManager."""
+
+    def __init__(self, sessions: SessionManager):
+        self.sessions = sessions
+        self._locks: 'weakref.WeakKeyDictionary[GameState, threading.RLock]' = weakref.WeakKeyDictionary()
+        self._locks_guard = threading.Lock()
+
+    @contextmanager
+    def checkout(self, token: Optional[str], create: bool = True) -> Iterator[Tuple[str, GameState]]:
+        if create:
+            session_id, game = self.sessions.get_or_create(token)
+        else:
+            session_id, game = token, self.sessions.get(token)
+            if game is None:
+                raise KeyError(token)
+
+        with self._locks_guard:
+            lock = self._locks.get(game)
+            if lock is None:
+                lock = self._locks[game] = threading.RLock()
+        with lock:
+            try:
+                yield session_id, game
+            finally:
+                self.sessions.resize(session_id, game)
+
+    def tick(self, session_id: str) -> Optional[int]:
+        # Streams poll this, and polling must not count as activity
+        game = self.sessions.peek(session_id)
+        return game.tick if game is not None else None
+
+    def stats(self) -> Dict:
+        return {'backend': 'memory', **self.sessions.stats()}
+
+
+class SerializedStateStore(StateStore):
+    """
+    Base for stores that keep encoded states outside the process.
+
+    Each request decodes the session, and writes it back only if its tick moved,
+    so read-only requests such as /level_geometry never write. Subclasses provide
+    the storage and a lock that also excludes other processes.
+    """
+
+    shared = True
+
+    def __init__(self, factory: Callable[[], GameState] = GameState):
+        self.factory = factory
+        self.created = 0
+        self.discarded = 0
+
+    @contextmanager
+    def checkout(self, token: Optional[str], create: bool = True) -> Iterator[Tuple[str, GameState]]:
+        if token and TOKEN_PATTERN.fullmatch(token) and self._exists(token):
+            with self._lock(token):
+                game = self._load(token)
+                if game is not None:
+                    tick = game.tick
+                    yield token, game
+                    if game.tick != tick:
+                        self._write(token, encode_game(game))
+                    return
+        if not create:
+            raise KeyError(token)
+
+        # Build the new state outside any lock, level setup is the slow part
+        game = self.factory()
+        session_id = secrets.token_urlsafe(16)
+        self.created += 1
+        with self._lock(session_id):
+            yield session_id, game
+            self._write(session_id, encode_game(game))
+
+    def _load(self, session_id: str) -> Optional[GameState]:
+        data = self._read(session_id)
+        if data is None:
+            return None
+        try:
+            return decode_game(data)
+        except ValueError:
+            # Written by an incompatible version or for a level that changed
+            self.discarded += 1
+            return None
+
+    def _exists(self, session_id: str) -> bool:
+        """Cheap check, before locking, that a session may be stored. May say yes for a session that is gone."""
+        return True
+
+    @abstractmethod
+    def _lock(self, session_id: str) -> ContextManager:
+        """Hold a session's lock, excluding other processes too."""
+
+    @abstractmethod
+    def _read(self, session_id: str) -> Optional[bytes]:
+        """Return a session's encoded state, None if it is not stored."""
+
+    @abstractmethod
+    def _write(self, session_id: str, data: bytes) -> None:
+        """Store a session's encoded state."""
+
+
+class FileStateStore(SerializedStateStore):
+    """
+    One file per session in a directory, locked with flock.
+
+    Works across worker processes on one machine. Files untouched for longer
+    than idle_timeout seconds are pruned while sessions are written, along with
+    lock files left without a state. A lock file is only ever removed by whoever
+    holds its flock, and lockers check that the file they locked is still the
+    one in the directory, so two writers never hold different lock files.
+    """
+
+    PRUNE_INTERVAL = 60.0
+
+    def __init__(self, directory: str, factory: Callable[[], GameState] = GameState,
+                 idle_timeout: float = 1800.0):
+        if fcntl is None:
+            raise RuntimeError("FileStateStore needs fcntl file locking, which this platform lacks")
+        super().__init__(factory)
+        self.directory = directory
+        self.idle_timeout = idle_timeout
+        self._last_prune = 0.0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, session_id: str, suffix: str) -> str:
+        return os.path.join(self.directory, f"{session_id}.{suffix}")
+
+    def _exists(self, session_id: str) -> bool:
+        # Unknown tokens must not leave lock files behind
+        return os.path.exists(self._path(session_id, 'state'))
+
+    @contextmanager
+    def _lock(self, session_id: str) -> Iterator[None]:
+        path = self._path(session_id, 'lock')
+        while True:
+            lock_file = open(path, 'a+b')
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            if self._is_current(lock_file, path):
+                break
+            lock_file.close()  # Pruned while we waited, lock the new file instead
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+            lock_file.close()
+
+    @staticmethod
+    def _is_current(lock_file, path: str) -> bool:
+        """Check that an open lock file is still the one at path, not one pruned meanwhile."""
+        try:
+            return os.path.samestat(os.fstat(lock_file.fileno()), os.stat(path))
+        except FileNotFoundError:
+            return False
+
+    def _read(self, session_id: str) -> Optional[bytes]:
+        path = self._path(session_id, 'state')
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)  # Reads count as activity for idle pruning
+            return data
+        except FileNotFoundError:
+            return None
+
+    def _write(self, session_id: str, data: bytes) -> None:
+        # Write then rename, so readers never see a half-written state
+        path = self._path(session_id, 'state')
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+        self._prune()
+
+    def tick(self, session_id: str) -> Optional[int]:
+        if not TOKEN_PATTERN.fullmatch(session_id):
+            return None
+        try:
+            with open(self._path(session_id, 'state'), 'rb') as f:
+                return read_tick(f.read(SAVE_HEADER.size))
+        except FileNotFoundError:
+            return None
+
+    def _prune(self) -> None:
+        now = time.time()
+        if now - self._last_prune < self.PRUNE_INTERVAL:
+            return
+        self._last_prune = now
+        session_ids = {entry.name.rsplit('.', 1)[0] for entry in os.scandir(self.directory)
+                       if entry.name.endswith(('.state', '.lock'))}
+        for session_id in session_ids:
+            if self._is_prunable(session_id, now):
+                self._prune_session(session_id, now)
+
+    def _is_prunable(self, session_id: str, now: float) -> bool:
+        """An idle session, or a lock file whose session was never written or is gone."""
+        try:
+            return now - os.stat(self._path(session_id, 'state')).st_mtime > self.idle_timeout
+        except FileNotFoundError:
+            return os.path.exists(self._path(session_id, 'lock'))
+
+    def _prune_session(self, session_id: str, now: float) -> None:
+        path = self._path(session_id, 'lock')
+        with open(path, 'a+b') as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return  # In use, so not idle
+            try:
+                # Look again now that nobody else can be writing it
+                if not self._is_current(lock_file, path) or not self._is_prunable(session_id, now):
+                    return
+                try:
+                    os.remove(self._path(session_id, 'state'))
+                except FileNotFoundError:
+                    pass
+                os.remove(path)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def stats(self) -> Dict:
+        sessions = sum(1 for entry in os.scandir(self.directory) if entry.name.endswith('.state'))
+        return {'backend': 'file', 'active_sessions': sessions, 'created': self.created,
+                'discarded': self.discarded, 'idle_timeout': self.idle_timeout}
+
+
+class RedisStateStore(SerializedStateStore):
+    """
+    Sessions in any server speaking the Redis protocol (Redis, Valkey, KeyDB...).
+
+    Needs the optional redis package. Keys expire after idle_timeout seconds
+    without a request, and per-session locks are Redis locks, so any number of
+    worker processes or machines can share the store.
+    """
+
+    LOCK_TIMEOUT = 10  # Seconds before a lock held by a crashed worker is released
+    LOCK_WAIT = 5  # Seconds a request waits for its session before failing
+
+    def __init__(self, url: str, factory: Callable[[], GameState] = GameState,
+                 idle_timeout: float = 1800.0, prefix: str = 'roguelike:'):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("RedisStateStore needs the redis package: pip install redis") from e
+        super().__init__(factory)
+        self.client = redis.Redis.from_url(url)
+        self.idle_timeout = int(idle_timeout)
+        self.prefix = prefix
+
+    def _key(self, session_id: str) -> str:
+        return f"{self.prefix}state:{session_id}"
+
+    def _lock(self, session_id: str) -> ContextManager:
+        return self.client.lock(f"{self.prefix}lock:{session_id}",
+                                timeout=self.LOCK_TIMEOUT, blocking_timeout=self.LOCK_WAIT)
+
+    def _read(self, session_id: str) -> Optional[bytes]:
+        key = self._key(session_id)
+        pipeline = self.client.pipeline()
+        pipeline.get(key)
+        pipeline.expire(key, self.idle_timeout)
+        data, _ = pipeline.execute()
+        return data
+
+    def _write(self, session_id: str, data: bytes) -> None:
+        self.client.set(self._key(session_id), data, ex=self.idle_timeout)
+
+    def tick(self, session_id: str) -> Optional[int]:
+        return read_tick(self.client.getrange(self._key(session_id), 0, SAVE_HEADER.size - 1))
+
+    def stats(self) -> Dict:
+        return {'backend': 'redis', 'created': self.created, 'discarded': self.discarded,
+                'idle_timeout': self.idle_timeout}
+
+
+def create_state_store(config: Dict, factory: Callable[[], GameState] = GameState) -> StateStore:
+    """Build the store selected by SERVER_CONFIG['STATE_STORE']: memory, file or redis."""
+    backend = config['STATE_STORE']
+    if backend == 'memory':
+        return MemoryStateStore(SessionManager(
+            factory=factory,
+            max_sessions=config['MAX_SESSIONS'],
+            idle_timeout=config['SESSION_IDLE_TIMEOUT'],
+            memory_cap=config['SESSION_MEMORY_CAP_MB'] * 1024 * 1024
+        ))
+    if backend == 'file':
+        return FileStateStore(config['STATE_DIR'], factory, config['SESSION_IDLE_TIMEOUT'])
+    if backend == 'redis':
+        return RedisStateStore(config['REDIS_URL'], factory, config['SESSION_IDLE_TIMEOUT'])
+    raise ValueError(f"Unknown state store: {backend}")
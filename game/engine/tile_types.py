@@ -27,4 +27,10 @@ TILE_TYPES = {
         'sprite': 'floor',
         'variant': 'stone'
     }
-}
\ No newline at end of file
+}
+
+# Compact numeric tile IDs, used by compiled levels to store the map as bytes
+TILE_CHARS = tuple(TILE_TYPES)
+TILE_IDS = {char: tile_id for tile_id, char in enumerate(TILE_CHARS)}
+TILE_BLOCKS_MOVEMENT = tuple(TILE_TYPES[char]['blocks_movement'] for char in TILE_CHARS)
+TILE_BLOCKS_SIGHT = tuple(TILE_TYPES[char]['blocks_sight'] for char in TILE_CHARS)
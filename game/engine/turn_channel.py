@@ -0,0 +1,72 @@
+import threading
+from typing import Callable, Dict, Iterable
+from .game_state import GameState
+
+
+def apply_commands(game: GameState, commands: Iterable[Dict]) -> int:
+    """
+    Apply a batch of client commands in order and return the last applied sequence number.
+
+    Clients send batches of small sequenced commands instead of one request per
+    click. Sequence numbers make resent batches idempotent: commands at or below
+    game.command_seq have already been applied and are skipped. The caller must
+    hold the session lock.
+    """
+    for command in commands:
+        seq = command.get('seq')
+        if isinstance(seq, int):
+            if seq <= game.command_seq:
+                continue  # Already applied by an earlier, retried batch
+            game.command_seq = seq
+
+        action = command.get('type', 'move')
+        if action == 'move':
+            x, y = command.get('x'), command.get('y')
+            if isinstance(x, int) and isinstance(y, int) and not game.game_over:
+                game.try_move_player(x, y)
+        elif action == 'travel':
+            x, y = command.get('x'), command.get('y')
+            if isinstance(x, int) and isinstance(y, int) and not game.game_over:
+                game.travel_to(x, y)
+        elif action == 'explore':
+            if not game.game_over:
+                game.auto_explore()
+        elif action == 'reset':
+            game.initialize_level()
+    return game.command_seq
+
+
+class TurnNotifier:
+    """
+    Wakes event streams waiting on a session when a request changes it.
+
+    Notifications only reach streams in the same process; with a shared state
+    store, streams also poll for changes made by other workers.
+    """
+
+    def __init__(self):
+        self._conditions: Dict[str, threading.Condition] = {}
+        self._waiters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def notify(self, session_id: str) -> None:
+        with self._lock:
+            condition = self._conditions.get(session_id)
+        if condition is not None:
+            with condition:
+                condition.notify_all()
+
+    def wait(self, session_id: str, changed: Callable[[], bool], timeout: float) -> bool:
+        """Block until changed() is true or the timeout passes, returning its last value."""
+        with self._lock:
+            condition = self._conditions.setdefault(session_id, threading.Condition())
+            self._waiters[session_id] = self._waiters.get(session_id, 0) + 1
+        try:
+            with condition:
+                return condition.wait_for(changed, timeout)
+        finally:
+            with self._lock:
+                self._waiters[session_id] -= 1
+                if not self._waiters[session_id]:
+                    del self._waiters[session_id]
+                    del self._conditions[session_id]
@@ -0,0 +1,182 @@
+"""
+Optional NumPy engine for enemy turns.
+
+Distance maps, wake checks, attack ranges and chasers' proposed steps are
+computed for a whole batch of enemies with array operations, reading each
+enemy's range and move rule from the compiled behavior table. Attack rolls and
+moves are then applied in scheduler order, with the scalar code handling any
+enemy whose proposed cell is taken, so a turn ends in exactly the state the
+scalar engine in GameState.scheduled_enemy_turns would reach, RNG included.
+"""
+from array import array
+from typing import List, Optional, Tuple
+from .pathfinding import DIRECTIONS, UNREACHABLE, DistanceMap, neighbour_offsets, padded_mask
+from .scheduler import TURN_LENGTH
+
+try:
+    import numpy as np
+except ImportError:  # Enemy turns stay on the scalar engine
+    np = None
+
+
+def available() -> bool:
+    return np is not None
+
+
+def distance_map(wall_mask: bytes, width: int, height: int, goal: Tuple[int, int],
+                 stop_at: List[Tuple[int, int]], max_distance: int) -> Tuple[DistanceMap, 'np.ndarray']:
+    """
+    Build the same DistanceMap as the scalar breadth-first search, a layer at a time.
+
+    Returns the map and its distances as an array. Distances do not depend on the
+    order cells are visited in, and the search stops on the same layer, so the
+    result matches DistanceMap(...) exactly.
+    """
+    stride = width + 2
+    seen = np.frombuffer(padded_mask(wall_mask, width, height), dtype=np.uint8).astype(bool)
+    distances = np.full(seen.size, UNREACHABLE, dtype=np.int32)
+    wanted = np.zeros(seen.size, dtype=bool)
+    wanted[[(y + 1) * stride + x + 1 for x, y in stop_at]] = True
+
+    start = (goal[1] + 1) * stride + goal[0] + 1
+    seen[start] = True
+    distances[start] = 0
+    wanted[start] = False
+    pending = int(np.count_nonzero(wanted))
+
+    offsets = np.array(neighbour_offsets(stride), dtype=np.int64)
+    frontier = np.array([start], dtype=np.int64)
+    # Scratch space for dropping duplicate cells from a layer without sorting
+    claims = np.empty(seen.size, dtype=np.int64)
+    distance = 0
+    while frontier.size:
+        if stop_at and not pending:
+            break
+        distance += 1
+        if distance > max_distance:
+            break
+        candidates = (frontier[:, None] + offsets).ravel()
+        candidates = candidates[~seen[candidates]]
+        positions = np.arange(candidates.size)
+        claims[candidates] = positions
+        frontier = candidates[claims[candidates] == positions]
+        seen[frontier] = True
+        distances[frontier] = distance
+        if pending:
+            pending -= int(np.count_nonzero(wanted[frontier]))
+
+    result = DistanceMap.__new__(DistanceMap)
+    result.width = width
+    result.height = height
+    result.stride = stride
+    result.distances = array('i')
+    result.distances.frombytes(distances.tobytes())
+    return result, distances
+
+
+def enemy_turns(game, player_id: int, player, chasers: List[Tuple[int, int]]) -> None:
+    """Run one player turn's worth of enemy actions for game, batch by batch."""
+    store = game.entities
+    config = game.config
+    width = game.width
+    player_x, player_y = player.x, player.y
+    hearing = config['NOISE_RADIUS']
+    delays = game.enemy_delays()
+    min_delay = min([TURN_LENGTH, *delays.values()])
+    visible = game.visible
+
+    the_map = distances = None
+    if chasers:
+        the_map, distances = distance_map(game.spatial.wall_mask, width, game.height, (player_x, player_y),
+                                          chasers, config['PATHFINDING_MAX_DISTANCE'])
+    # The behavior table as arrays indexed by behavior code
+    table = game.behavior_table
+    reach = np.array(table.ranges, dtype=np.int64)
+    needs_sight = np.array(table.needs_sight, dtype=bool)
+    follows_map = np.array(table.follows_distance_map, dtype=bool)
+    stats = game.behavior_stats
+
+    stride = width + 2
+    step_x = np.array([dx for dx, _ in DIRECTIONS], dtype=np.int64)
+    step_y = np.array([dy for _, dy in DIRECTIONS], dtype=np.int64)
+    offsets = np.array(neighbour_offsets(stride), dtype=np.int64)
+
+    scheduler = game.scheduler
+    spatial = game.spatial
+    entity_ticks = game.entity_ticks
+    tick = game.tick
+    xs, ys = store.xs, store.ys
+    for batch in scheduler.run_batches(TURN_LENGTH, min_delay):
+        times = np.array([when for when, _ in batch], dtype=np.int64)
+        ids = np.array([entity_id for _, entity_id in batch], dtype=np.int64)
+        slots = ids - 1
+        x = np.frombuffer(xs, dtype=np.int32)[slots].astype(np.int64)
+        y = np.frombuffer(ys, dtype=np.int32)[slots].astype(np.int64)
+        behaviors = np.frombuffer(store.behaviors, dtype=np.uint8)[slots]
+
+        # Enemies out of sight and earshot are not rescheduled and fall dormant
+        dx = player_x - x
+        dy = player_y - y
+        in_view = np.fromiter((cell in visible for cell in (y * width + x).tolist()), dtype=bool, count=len(batch))
+        awake = in_view | (np.maximum(np.abs(dx), np.abs(dy)) <= hearing)
+        attacking = awake & (np.maximum(np.abs(dx), np.abs(dy)) <= reach[behaviors]) & (in_view | ~needs_sight[behaviors])
+
+        # Distance map followers step to the first neighbour closer to the player, entities
+        # ignored; the neighbours' distances are kept for when that cell turns out to be taken
+        proposed = np.full(len(batch), -1, dtype=np.int64)
+        chasing = awake & ~attacking & follows_map[behaviors]
+        neighbours = {}
+        if distances is not None and chasing.any():
+            chaser_indices = np.flatnonzero(chasing)
+            cells = (y[chasing] + 1) * stride + x[chasing] + 1
+            around = distances[cells[:, None] + offsets]
+            best = around.argmin(axis=1)
+            closer = around[np.arange(len(cells)), best] < distances[cells]
+            proposed[chaser_indices[closer]] = best[closer]
+            neighbours = dict(zip(chaser_indices.tolist(), zip(around.tolist(), distances[cells].tolist())))
+
+        # Rolls are drawn in action order, exactly as the scalar engine draws them
+        attack = store.attack
+        for i in np.flatnonzero(attacking).tolist():
+            code = int(behaviors[i])
+            game.enemy_attack(int(ids[i]), code, attack[slots[i]], player_id, player)
+            stats.attacks[code] += 1
+
+        # Moves are applied in order so earlier enemies can take cells later ones wanted
+        for i in np.flatnonzero(awake & ~attacking).tolist():
+            entity_id = int(ids[i])
+            slot = entity_id - 1
+            old_x, old_y = xs[slot], ys[slot]
+            direction = int(proposed[i])
+            if direction >= 0:
+                new_x, new_y = old_x + int(step_x[direction]), old_y + int(step_y[direction])
+            if direction < 0 or spatial.is_blocked(new_x, new_y):
+                if i in neighbours:
+                    step = chase_step(old_x, old_y, *neighbours[i], spatial.is_blocked)
+                    if step is None:
+                        step = game.greedy_step(old_x, old_y, player_x, player_y)
+                else:
+                    step = game.choose_enemy_step(entity_id, store[entity_id], player, the_map)
+                if step is None:
+                    stats.waits[behaviors[i]] += 1
+                    continue
+                new_x, new_y = step
+            spatial.move(entity_id, old_x, old_y, new_x, new_y)
+            xs[slot] = new_x
+            ys[slot] = new_y
+            entity_ticks[entity_id] = tick
+            stats.moves[behaviors[i]] += 1
+
+        for i in np.flatnonzero(awake).tolist():
+            scheduler.schedule(int(ids[i]), delays.get(int(behaviors[i]), TURN_LENGTH), int(times[i]))
+
+
+def chase_step(x: int, y: int, around: List[int], own: int, is_blocked) -> Optional[Tuple[int, int]]:
+    """DistanceMap.best_step from a cell's precomputed neighbour distances."""
+    best = own
+    best_step = None
+    for (dx, dy), distance in zip(DIRECTIONS, around):
+        if distance < best and not is_blocked(x + dx, y + dy):
+            best = distance
+            best_step = (x + dx, y + dy)
+    return best_step
@@ -0,0 +1,121 @@
+import random
+import threading
+from collections import OrderedDict
+from typing import NamedTuple, Tuple
+from .level_generator import Level, CHAR_TO_TILE
+from config import GAME_CONFIG
+
+_FLOOR = CHAR_TO_TILE[ord('.')]
+_WALL = CHAR_TO_TILE[ord('#')]
+
+
+class Chunk(NamedTuple):
+    tiles: bytes  # size * size tile IDs, row-major
+    enemy_spawns: Tuple[Tuple[int, int], ...]  # Chunk-local positions
+
+
+class WorldGenerator:
+    """
+    Overworld maps far larger than a compiled level, generated chunk by chunk.
+
+    The world is a square of fixed-size chunks, each generated from the seed and
+    its chunk coordinates alone, so a chunk can be dropped from memory and
+    regenerated identically later. A game only ever plays on a window of chunks
+    around the player, compiled into an ordinary Level. Recently used chunks and
+    windows are kept in LRU caches shared by every session.
+    """
+
+    _chunks: 'OrderedDict[Tuple, Chunk]' = OrderedDict()
+    _windows: 'OrderedDict[Tuple, Level]' = OrderedDict()
+    _cache_lock = threading.Lock()
+
+    WINDOW_CACHE_SIZE = 64
+
+    @staticmethod
+    def chunk(seed: int, cx: int, cy: int, size: int, world_chunks: int) -> Chunk:
+        """Return a chunk from the cache, generating it if needed."""
+        key = (seed, cx, cy, size, world_chunks)
+        with WorldGenerator._cache_lock:
+            chunk = WorldGenerator._chunks.get(key)
+            if chunk is not None:
+                WorldGenerator._chunks.move_to_end(key)
+                return chunk
+
+        chunk = WorldGenerator.generate_chunk(seed, cx, cy, size, world_chunks)
+        with WorldGenerator._cache_lock:
+            chunk = WorldGenerator._chunks.setdefault(key, chunk)
+            while len(WorldGenerator._chunks) > GAME_CONFIG['WORLD_CHUNK_CACHE_SIZE']:
+                WorldGenerator._chunks.popitem(last=False)
+        return chunk
+
+    @staticmethod
+    def generate_chunk(seed: int, cx: int, cy: int, size: int, world_chunks: int) -> Chunk:
+        """
+        Generate one chunk of open ground with scattered rock outcrops.
+
+        A road crosses every chunk along its middle row and column, so the roads
+        of neighbouring chunks meet and the world stays connected. Chunks outside
+        the world are solid rock.
+        """
+        if not (0 <= cx < world_chunks and 0 <= cy < world_chunks):
+            return Chunk(bytes([_WALL]) * (size * size), ())
+
+        rng = random.Random(f"{seed}:{cx}:{cy}")
+        tiles = bytearray([_FLOOR]) * (size * size)
+        for _ in range(rng.randint(size // 4, size // 2)):
+            x, y = rng.randrange(size), rng.randrange(size)
+            width, height = rng.randint(1, 4), rng.randint(1, 4)
+            for row in range(y, min(size, y + height)):
+                tiles[row * size + x:row * size + min(size, x + width)] = bytes([_WALL]) * (min(size, x + width) - x)
+
+        middle = size // 2
+        tiles[middle * size:(middle + 1) * size] = bytes([_FLOOR]) * size
+        tiles[middle::size] = bytes([_FLOOR]) * size
+
+        # The world's outer edge is walled off
+        if cy == 0:
+            tiles[:size] = bytes([_WALL]) * size
+        if cy == world_chunks - 1:
+            tiles[-size:] = bytes([_WALL]) * size
+        if cx == 0:
+            tiles[::size] = bytes([_WALL]) * size
+        if cx == world_chunks - 1:
+            tiles[size - 1::size] = bytes([_WALL]) * size
+
+        spawns = []
+        for _ in range(rng.randint(0, GAME_CONFIG['WORLD_ENEMIES_PER_CHUNK'])):
+            x, y = rng.randrange(size), rng.randrange(size)
+            if tiles[y * size + x] == _FLOOR and x != middle and y != middle and (x, y) not in spawns:
+                spawns.append((x, y))
+        return Chunk(bytes(tiles), tuple(sorted(spawns, key=lambda spawn: (spawn[1], spawn[0]))))
+
+    @staticmethod
+    def window(seed: int, origin: Tuple[int, int], span: int, size: int, world_chunks: int) -> Level:
+        """Compile the span x span chunks whose top-left chunk is origin into a Level."""
+        key = (seed, origin, span, size, world_chunks)
+        with WorldGenerator._cache_lock:
+            level = WorldGenerator._windows.get(key)
+            if level is not None:
+                WorldGenerator._windows.move_to_end(key)
+                return level
+
+        ox, oy = origin
+        rows = []
+        for cy in range(oy, oy + span):
+            chunks = [WorldGenerator.chunk(seed, cx, cy, size, world_chunks).tiles for cx in range(ox, ox + span)]
+            for y in range(size):
+                rows.extend(tiles[y * size:(y + 1) * size] for tiles in chunks)
+
+        # Windows are not validated like levels: the roads keep them connected,
+        # and spawns come from the chunks rather than the tiles
+        level = Level()
+        level.width = level.height = span * size
+        level.compile_tiles(b''.join(rows))
+        level.player_start = ((span // 2) * size + size // 2,) * 2  # Road crossing of the middle chunk
+        level.is_valid = True
+
+        with WorldGenerator._cache_lock:
+            level = WorldGenerator._windows.setdefault(key, level)
+            while len(WorldGenerator._windows) > WorldGenerator.WINDOW_CACHE_SIZE:
+                WorldGenerator._windows.popitem(last=False)
+        return level
@@ -1,11 +1,34 @@
 from dataclasses import dataclass
+from enum import IntEnum
 from typing import Optional
 
-@dataclass
+
+class EntityType(IntEnum):
+    PLAYER = 0
+    ENEMY = 1
+
+
+class Behavior(IntEnum):
+    NONE = 0
+    CHASE = 1
+    PATROL = 2
+    SPELL_CASTER = 3
+    DEAD = 4
+
+
+# Names used in serialized state and by the client, indexed by enum value
+ENTITY_TYPE_NAMES = ('player', 'enemy')
+BEHAVIOR_NAMES = (None, 'chase', 'patrol', 'spell_caster', 'dead')
+ENTITY_TYPES_BY_NAME = {name: EntityType(value) for value, name in enumerate(ENTITY_TYPE_NAMES)}
+BEHAVIORS_BY_NAME = {name: Behavior(value) for value, name in enumerate(BEHAVIOR_NAMES)}
+
+
+@dataclass(slots=True)
 class Entity:
+    """A detached entity value, used to spawn entities into an EntityStore."""
     x: int
     y: int
     entity_type: str  # 'player', 'enemy'
     health: int
     attack: int
-    behavior: Optional[str] = None  # 'chase', 'patrol', etc.
\ No newline at end of file
+    behavior: Optional[str] = None  # 'chase', 'patrol', etc.
@@ -0,0 +1,231 @@
+from array import array
+from collections.abc import Mapping
+from typing import Iterator, List, Optional, Tuple
+from .entity import (Entity, EntityType, Behavior, ENTITY_TYPE_NAMES, BEHAVIOR_NAMES,
+                     ENTITY_TYPES_BY_NAME, BEHAVIORS_BY_NAME)
+
+# Type code marking a slot on the free list
+FREE_SLOT = 255
+
+
+class EntityView:
+    """
+    A thin read/write view of one entity in an EntityStore.
+
+    Exposes the same attributes as Entity, so code that reads or updates
+    entity.x, entity.health or entity.behavior keeps working unchanged.
+    """
+
+    __slots__ = ('_store', '_slot')
+
+    def __init__(self, store: 'EntityStore', slot: int):
+        self._store = store
+        self._slot = slot
+
+    @property
+    def x(self) -> int:
+        return self._store.xs[self._slot]
+
+    @x.setter
+    def x(self, value: int) -> None:
+        self._store.xs[self._slot] = value
+
+    @property
+    def y(self) -> int:
+        return self._store.ys[self._slot]
+
+    @y.setter
+    def y(self, value: int) -> None:
+        self._store.ys[self._slot] = value
+
+    @property
+    def health(self) -> float:
+        return self._store.health[self._slot]
+
+    @health.setter
+    def health(self, value: float) -> None:
+        self._store.health[self._slot] = value
+
+    @property
+    def attack(self) -> float:
+        return self._store.attack[self._slot]
+
+    @attack.setter
+    def attack(self, value: float) -> None:
+        self._store.attack[self._slot] = value
+
+    @property
+    def entity_type(self) -> str:
+        return ENTITY_TYPE_NAMES[self._store.types[self._slot]]
+
+    @property
+    def behavior(self) -> Optional[str]:
+        return BEHAVIOR_NAMES[self._store.behaviors[self._slot]]
+
+    @behavior.setter
+    def behavior(self, value: Optional[str]) -> None:
+        self._store.set_behavior(self._slot + 1, BEHAVIORS_BY_NAME[value])
+
+    def __repr__(self) -> str:
+        return (f"EntityView(x={self.x}, y={self.y}, entity_type={self.entity_type!r}, "
+                f"health={self.health}, attack={self.attack}, behavior={self.behavior!r})")
+
+
+class EntityStore(Mapping):
+    """
+    Struct-of-arrays storage for entities, keyed by entity ID.
+
+    Each field lives in its own typed array indexed by slot (entity ID - 1), types
+    and behaviors are stored as enum codes, and an alive mask lets hot loops skip
+    dead entities without touching them. Removed slots go on a free list and are
+    reused by the next spawn. Indexing returns an EntityView for compatibility.
+    """
+
+    def __init__(self):
+        self.xs = array('i')
+        self.ys = array('i')
+        self.health = array('d')
+        self.attack = array('d')
+        self.types = bytearray()
+        self.behaviors = bytearray()
+        self.alive = bytearray()
+        self._free: List[int] = []
+        self._count = 0
+
+    # -----------------
+    # Spawning and removal
+    # -----------------
+
+    def spawn(self, x: int, y: int, entity_type: EntityType, health: float, attack: float,
+              behavior: Behavior = Behavior.NONE) -> int:
+        """Store a new entity and return its ID, reusing a free slot when there is one."""
+        alive = 0 if behavior == Behavior.DEAD else 1
+        if self._free:
+            slot = self._free.pop()
+            self.xs[slot] = x
+            self.ys[slot] = y
+            self.health[slot] = health
+            self.attack[slot] = attack
+            self.types[slot] = entity_type
+            self.behaviors[slot] = behavior
+            self.alive[slot] = alive
+        else:
+            slot = len(self.types)
+            self.xs.append(x)
+            self.ys.append(y)
+            self.health.append(health)
+            self.attack.append(attack)
+            self.types.append(entity_type)
+            self.behaviors.append(behavior)
+            self.alive.append(alive)
+        self._count += 1
+        return slot + 1
+
+    def add(self, entity: Entity) -> int:
+        """Store a detached Entity and return its ID."""
+        return self.spawn(entity.x, entity.y, ENTITY_TYPES_BY_NAME[entity.entity_type],
+                          entity.health, entity.attack, BEHAVIORS_BY_NAME[entity.behavior])
+
+    def remove(self, entity_id: int) -> None:
+        """Delete an entity and put its slot on the free list."""
+        slot = self._slot(entity_id)
+        self.types[slot] = FREE_SLOT
+        self.alive[slot] = 0
+        self._free.append(slot)
+        self._count -= 1
+
+    def clear(self) -> None:
+        """Delete every entity; IDs start again from 1."""
+        for column in (self.xs, self.ys, self.health, self.attack):
+            del column[:]
+        self.types.clear()
+        self.behaviors.clear()
+        self.alive.clear()
+        self._free.clear()
+        self._count = 0
+
+    def snapshot(self) -> Tuple:
+        """Return the columns and free list as bytes and ints, for restore()."""
+        return (self.xs.tobytes(), self.ys.tobytes(), self.health.tobytes(), self.attack.tobytes(),
+                bytes(self.types), bytes(self.behaviors), bytes(self.alive), tuple(self._free))
+
+    def copy(self) -> 'EntityStore':
+        """Return an independent store with the same entities and IDs; the columns are copied flat."""
+        store = EntityStore.__new__(EntityStore)
+        store.xs = self.xs[:]
+        store.ys = self.ys[:]
+        store.health = self.health[:]
+        store.attack = self.attack[:]
+        store.types = self.types[:]
+        store.behaviors = self.behaviors[:]
+        store.alive = self.alive[:]
+        store._free = self._free[:]
+        store._count = self._count
+        return store
+
+    @classmethod
+    def restore(cls, data: Tuple) -> 'EntityStore':
+        """Rebuild a store from snapshot(), keeping every entity ID."""
+        xs, ys, health, attack, types, behaviors, alive, free = data
+        store = cls()
+        store.xs.frombytes(xs)
+        store.ys.frombytes(ys)
+        store.health.frombytes(health)
+        store.attack.frombytes(attack)
+        store.types = bytearray(types)
+        store.behaviors = bytearray(behaviors)
+        store.alive = bytearray(alive)
+        store._free = list(free)
+        store._count = len(store.types) - len(store._free)
+        return store
+
+    # -----------------
+    # Field access
+    # -----------------
+
+    def set_behavior(self, entity_id: int, behavior: Behavior) -> None:
+        """Change an entity's behavior, keeping the alive mask in sync."""
+        slot = self._slot(entity_id)
+        self.behaviors[slot] = behavior
+        self.alive[slot] = 0 if behavior == Behavior.DEAD else 1
+
+    def is_alive(self, entity_id: int) -> bool:
+        return self.alive[entity_id - 1] == 1
+
+    def living_ids(self) -> Iterator[int]:
+        """Yield the IDs of living entities in ID order, skipping dead ones at C speed."""
+        alive = self.alive
+        slot = alive.find(1)
+        while slot != -1:
+            yield slot + 1
+            slot = alive.find(1, slot + 1)
+
+    def _slot(self, entity_id: int) -> int:
+        slot = entity_id - 1
+        if not 0 <= slot < len(self.types) or self.types[slot] == FREE_SLOT:
+            raise KeyError(entity_id)
+        return slot
+
+    # -----------------
+    # Mapping protocol
+    # -----------------
+
+    def __getitem__(self, entity_id: int) -> EntityView:
+        if not isinstance(entity_id, int):
+            raise KeyError(entity_id)
+        return EntityView(self, self._slot(entity_id))
+
+    def get(self, entity_id: int, default=None) -> Optional[EntityView]:
+        # Overridden because the Mapping version goes through an exception per miss
+        slot = entity_id - 1 if isinstance(entity_id, int) else -1
+        if 0 <= slot < len(self.types) and self.types[slot] != FREE_SLOT:
+            return EntityView(self, slot)
+        return default
+
+    def __iter__(self) -> Iterator[int]:
+        for slot, entity_type in enumerate(self.types):
+            if entity_type != FREE_SLOT:
+                yield slot + 1
+
+    def __len__(self) -> int:
+        return self._count
@@ -0,0 +1,137 @@
+import mmap
+import os
+import struct
+import threading
+from typing import Dict, List, NamedTuple, Optional
+from ..engine.level_generator import Level
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers in one process are still serialized
+    fcntl = None
+
+# levels.dat holds compiled records back to back: a header, then width * height
+# tile IDs. Records are never rewritten, so a mapped file stays valid as it grows.
+RECORD_HEADER = struct.Struct('<4sIHH')  # magic, level number, width, height
+RECORD_MAGIC = b'RLLV'
+MAX_LEVEL_NUMBER = 0xFFFFFFFF
+MAX_LEVEL_SIDE = 0xFFFF
+
+# levels.idx holds one fixed-size entry per saved record. Later entries for the
+# same level number replace earlier ones, so saving again is a plain append.
+INDEX_ENTRY = struct.Struct('<IQII16s48s')  # number, tile offset, width, height, version, name
+
+MAX_NAME_BYTES = 48
+
+
+class LevelInfo(NamedTuple):
+    number: int
+    name: str
+    width: int
+    height: int
+    geometry_version: str
+    offset: int  # Where the tiles start in levels.dat
+
+
+class LevelStore:
+    """
+    Compiled custom levels on disk, loaded lazily.
+
+    Only the small index is read up front; a level's tiles are sliced out of the
+    memory-mapped data file when the level is first played, so thousands of
+    levels cost almost nothing until used. Both files are append-only and other
+    processes' saves are picked up on the next lookup.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.data_path = os.path.join(directory, 'levels.dat')
+        self.index_path = os.path.join(directory, 'levels.idx')
+        for path in (self.data_path, self.index_path):
+            open(path, 'ab').close()
+
+        self._levels: Dict[int, LevelInfo] = {}
+        self._index_size = 0
+        self._map: Optional[mmap.mmap] = None
+        self._lock = threading.Lock()
+
+    # -----------------
+    # Lookup
+    # -----------------
+
+    def info(self, number: int) -> Optional[LevelInfo]:
+        """Return the index entry for a level number, None if it was never saved."""
+        self._refresh()
+        return self._levels.get(number)
+
+    def levels(self) -> List[LevelInfo]:
+        """Return every saved level's current index entry, by level number."""
+        self._refresh()
+        return sorted(self._levels.values())
+
+    def load(self, info: LevelInfo) -> Level:
+        """Compile the level an index entry points at from the mapped data file."""
+        size = info.width * info.height
+        with self._lock:
+            if self._map is None or len(self._map) < info.offset + size:
+                self._remap()
+            tiles = self._map[info.offset:info.offset + size]
+        return Level.from_tiles(info.width, info.height, tiles)
+
+    def __contains__(self, number: int) -> bool:
+        return self.info(number) is not None
+
+    def __len__(self) -> int:
+        self._refresh()
+        return len(self._levels)
+
+    def _refresh(self) -> None:
+        # Read only index entries appended since the last lookup
+        size = os.path.getsize(self.index_path)
+        if size == self._index_size:
+            return
+        with self._lock, open(self.index_path, 'rb') as f:
+            f.seek(self._index_size)
+            data = f.read()
+            usable = len(data) - len(data) % INDEX_ENTRY.size  # Ignore a half-written entry
+            for number, offset, width, height, version, name in INDEX_ENTRY.iter_unpack(data[:usable]):
+                self._levels[number] = LevelInfo(number, name.rstrip(b'\0').decode('utf-8', 'replace'),
+                                                 width, height, version.decode('ascii'), offset)
+            self._index_size += usable
+
+    def _remap(self) -> None:
+        if self._map is not None:
+            self._map.close()
+        with open(self.data_path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    # -----------------
+    # Saving
+    # -----------------
+
+    def save(self, number: int, level: Level, name: str = '') -> LevelInfo:
+        """Append a compiled level and make it the current version of its level number."""
+        if not 1 <= number <= MAX_LEVEL_NUMBER:
+            raise ValueError(f"Level numbers run from 1 to {MAX_LEVEL_NUMBER}, got {number}")
+        if max(level.width, level.height) > MAX_LEVEL_SIDE:
+            raise ValueError(f"Levels are at most {MAX_LEVEL_SIDE} cells per side, got {level.width}x{level.height}")
+        encoded_name = name.encode('utf-8')[:MAX_NAME_BYTES].decode('utf-8', 'ignore').encode('utf-8')
+        with self._lock, open(self.index_path, 'ab') as index:
+            if fcntl is not None:
+                fcntl.flock(index, fcntl.LOCK_EX)  # Held until the file is closed
+            with open(self.data_path, 'ab') as data:
+                data.write(RECORD_HEADER.pack(RECORD_MAGIC, number, level.width, level.height))
+                offset = data.tell()
+                data.write(level.tiles)
+            # The index entry goes last so readers never see a record that is not fully written
+            index.write(INDEX_ENTRY.pack(number, offset, level.width, level.height,
+                                         level.geometry_version.encode('ascii'), encoded_name))
+        self._refresh()
+        return self._levels[number]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._map is not None:
+                self._map.close()
+                self._map = None
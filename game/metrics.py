@@ -0,0 +1,213 @@
+"""
+Request and engine metrics in the Prometheus text format.
+
+Nothing here runs unless SERVER_CONFIG['METRICS_ENABLED'] is set: install()
+registers the request hooks and the /metrics route and wraps the hot GameState
+methods with timers, so a disabled server carries no instrumentation at all.
+Metrics are kept per process; scrape every worker.
+"""
+import functools
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Sequence, Tuple
+from flask import Blueprint, Flask, Response, current_app, g, request
+from .engine import behaviors
+from .engine.game_state import GameState
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+COUNT_BUCKETS = (1, 5, 10, 50, 100, 500, 1000, 5000, 10000, 50000)
+
+# GameState methods whose time is reported separately; nested calls are
+# included in their caller's time too
+TIMED_METHODS = ('try_move_player', 'process_enemy_turns', 'initialize_level', 'to_dict', 'to_delta')
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels, safe to observe from any thread."""
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # label values -> [count per bucket (+Inf last), sum]
+        self._series: Dict[Tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = [(key, list(counts), total) for key, (counts, total) in sorted(self._series.items())]
+        for label_values, counts, total in series:
+            labels = _format_labels(self.labels, label_values)
+            cumulative = 0
+            for bound, count in zip((*self.buckets, '+Inf'), counts):
+                cumulative += count
+                le = _format_labels(self.labels + ('le',), label_values + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Gauge:
+    """
+    A value read from a callback when metrics are scraped.
+
+    With labels, the callback returns a dict from label value tuples to values.
+    """
+
+    def __init__(self, name: str, help_text: str, callback: Callable, kind: str = 'gauge',
+                 labels: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.callback = callback
+        self.kind = kind
+        self.labels = tuple(labels)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        if not self.labels:
+            return lines + [f"{self.name} {_format_value(self.callback())}"]
+        for label_values, value in sorted(self.callback().items()):
+            lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {_format_value(value)}")
+        return lines
+
+
+class Registry:
+    """The metrics of one application, rendered together for /metrics."""
+
+    def __init__(self):
+        self.metrics: Dict[str, object] = {}
+
+    def histogram(self, name: str, help_text: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self.metrics.setdefault(name, Histogram(name, help_text, labels, buckets))
+
+    def gauge(self, name: str, help_text: str, callback: Callable, kind: str = 'gauge',
+              labels: Sequence[str] = ()) -> Gauge:
+        return self.metrics.setdefault(name, Gauge(name, help_text, callback, kind, labels))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+def _format_labels(names: Sequence[str], values: Sequence) -> str:
+    if not names:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for value in values)
+    return '{' + ','.join(f'{name}="{value}"' for name, value in zip(names, escaped)) + '}'
+
+
+def _format_value(value) -> str:
+    return value if isinstance(value, str) else repr(float(value))
+
+
+# -----------------
+# Installation
+# -----------------
+
+metrics_bp = Blueprint('metrics', __name__)
+
+
+@metrics_bp.route('/metrics')
+def metrics():
+    registry: Registry = current_app.extensions['metrics']
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
+
+
+def install(app: Flask) -> Registry:
+    """Start collecting metrics for an app and serve them at /metrics."""
+    registry = Registry()
+    app.extensions['metrics'] = registry
+
+    request_seconds = registry.histogram(
+        'roguelike_request_seconds', 'Request latency by route.', ('route', 'method', 'status'))
+    response_bytes = registry.histogram(
+        'roguelike_response_bytes', 'Response body size by route.', ('route',), BYTES_BUCKETS)
+
+    @app.before_request
+    def start_timer():
+        g.metrics_start = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        start = g.pop('metrics_start', None)
+        if start is None:
+            return response
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        request_seconds.observe(time.perf_counter() - start, route, request.method, str(response.status_code))
+        # Streamed responses have no length up front
+        if response.content_length is not None:
+            response_bytes.observe(response.content_length, route)
+        return response
+
+    store = app.extensions['state_store']
+    registry.gauge('roguelike_active_sessions', 'Sessions held by the state store (memory and file stores).',
+                   lambda: store.stats().get('active_sessions', float('nan')))
+    registry.gauge('roguelike_sessions_created_total', 'Sessions created by this process.',
+                   lambda: store.stats().get('created', 0), kind='counter')
+
+    instrument_game_state(registry)
+    instrument_behaviors(registry)
+    app.register_blueprint(metrics_bp)
+    return registry
+
+
+def instrument_game_state(registry: Registry) -> None:
+    """Time the hot GameState methods and record entities per level on every state payload."""
+    engine_seconds = registry.histogram(
+        'roguelike_engine_seconds', 'Time spent in GameState methods.', ('method',))
+    level_entities = registry.histogram(
+        'roguelike_level_entities', 'Entities in a game when its state is sent, by level.', ('level',),
+        COUNT_BUCKETS)
+
+    # Wrapping is global, and later apps report into the newest registry
+    for name in TIMED_METHODS:
+        method = getattr(GameState, name)
+        original = getattr(method, '__wrapped__', method)
+        setattr(GameState, name, _timed(original, name, engine_seconds,
+                                        level_entities if name in ('to_dict', 'to_delta') else None))
+
+
+def instrument_behaviors(registry: Registry) -> None:
+    """Export the per-behavior enemy action counters and start timing them."""
+    stats = behaviors.STATS
+    stats.timing = True
+
+    def actions():
+        return {(name, action): counts[action] for name, counts in stats.snapshot().items()
+                for action in ('attacks', 'moves', 'waits')}
+    registry.gauge('roguelike_enemy_actions_total', 'Enemy turns by behavior and outcome.', actions,
+                   kind='counter', labels=('behavior', 'action'))
+    registry.gauge('roguelike_enemy_seconds_total', 'Time spent on enemy turns by behavior (scalar engine).',
+                   lambda: {(name,): counts['seconds'] for name, counts in stats.snapshot().items()},
+                   kind='counter', labels=('behavior',))
+
+
+def _timed(method: Callable, name: str, histogram: Histogram, level_entities) -> Callable:
+    @functools.wraps(method)
+    def timed(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            histogram.observe(time.perf_counter() - start, name)
+            if level_entities is not None:
+                level_entities.observe(len(self.entities), str(self.current_level))
+    return timed
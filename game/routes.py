@@ -0,0 +1,268 @@
+import json
+import os
+from contextlib import contextmanager
+from typing import Iterator
+from flask import Blueprint, Response, current_app, g, jsonify, render_template, request, send_from_directory
+from werkzeug.security import safe_join
+from .assets import ASSET_CACHE_SECONDS, AssetManifest, digest_of, file_digest
+from .engine.game_state import GameState
+from .engine.state_store import StateStore
+from .engine.turn_channel import TurnNotifier, apply_commands
+from config import SERVER_CONFIG
+
+game_bp = Blueprint('game', __name__)
+
+
+def state_store() -> StateStore:
+    return current_app.extensions['state_store']
+
+
+def turn_notifier() -> TurnNotifier:
+    return current_app.extensions['turn_notifier']
+
+
+def session_token():
+    return (request.cookies.get(SERVER_CONFIG['SESSION_COOKIE_NAME']) or
+            request.headers.get(SERVER_CONFIG['SESSION_HEADER_NAME']))
+
+
+@contextmanager
+def current_game() -> Iterator[GameState]:
+    """
+    Check out the caller's own game state from their session cookie or token header.
+
+    The session stays locked until the block ends, so concurrent requests for the
+    same run never interleave; streams waiting on it are woken afterwards.
+    """
+    with state_store().checkout(session_token()) as (session_id, game):
+        g.session_id = session_id
+        tick = game.tick
+        yield game
+        changed = game.tick != tick
+    if changed:
+        turn_notifier().notify(session_id)
+
+
+@game_bp.after_app_request
+def attach_session_cookie(response):
+    session_id = g.get('session_id')
+    if session_id and request.cookies.get(SERVER_CONFIG['SESSION_COOKIE_NAME']) != session_id:
+        response.set_cookie(
+            SERVER_CONFIG['SESSION_COOKIE_NAME'],
+            session_id,
+            max_age=SERVER_CONFIG['SESSION_IDLE_TIMEOUT'],
+            httponly=True,
+            samesite='Lax'
+        )
+        response.headers[SERVER_CONFIG['SESSION_HEADER_NAME']] = session_id
+    return response
+
+
+def parse_since(value):
+    """Read a client's last seen tick; anything unusable means 'send everything'."""
+    try:
+        return int(value) if value not in (None, '') else None
+    except (TypeError, ValueError):
+        return None
+
+
+def state_response(game: GameState, payload: dict, **extra):
+    """Answer with a delta when the client sent a 'since' tick, otherwise a full snapshot."""
+    if 'since' in payload:
+        return jsonify({**game.to_delta(parse_since(payload.get('since'))), **extra})
+    return jsonify({**game.to_dict(), **extra})
+
+
+@game_bp.route('/')
+def index():
+    return render_template('game.html')
+
+
+@game_bp.route('/game_state')
+def get_game_state():
+    with current_game() as game:
+        return state_response(game, request.args)
+
+
+@game_bp.route('/events')
+def get_events():
+    """
+    Structured turn events after a cursor, with their message text.
+
+    Pass the returned cursor back to read on from there. Only the last
+    EVENT_LOG_SIZE events are kept; 'first' is the oldest still available, so a
+    reader whose cursor is older than that has missed some.
+    """
+    cursor = request.args.get('cursor', 0, type=int)
+    with current_game() as game:
+        events = list(game.events.since(cursor))
+        messages = game.events.messages(game.behavior_table, events)
+        return jsonify({
+            'events': [{**event.to_dict(), 'message': message} for event, message in zip(events, messages)],
+            'first': game.events.first_seq,
+            'cursor': game.events.next_seq,
+        })
+
+
+@game_bp.route('/level_geometry')
+def get_level_geometry():
+    with current_game() as game:
+        response = jsonify(game.geometry_to_dict())
+        response.set_etag(game.geometry_version)
+    # Clients revalidate with If-None-Match and get a bodyless 304 while the level is unchanged
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+
+@game_bp.route('/move', methods=['POST'])
+def move_player():
+    data = request.json
+    target_x = data.get('x')
+    target_y = data.get('y')
+
+    if target_x is None or target_y is None:
+        return jsonify({'error': 'Invalid coordinates'}), 400
+
+    with current_game() as game:
+        game.try_move_player(target_x, target_y)
+        return state_response(game, data)
+
+
+@game_bp.route('/travel', methods=['POST'])
+def travel():
+    """
+    Walk to a seen cell over as many turns as it takes, in one request.
+
+    Body: {"x": 3, "y": 4, "since": <tick>}. Stops early when an enemy comes
+    close or the player is hurt; the reply is the state after the last turn,
+    with the step count and the reason for stopping under "travel".
+    """
+    data = request.get_json(silent=True) or {}
+    target_x, target_y = data.get('x'), data.get('y')
+    if not isinstance(target_x, int) or not isinstance(target_y, int):
+        return jsonify({'error': 'Invalid coordinates'}), 400
+
+    with current_game() as game:
+        result = game.travel_to(target_x, target_y)
+        return state_response(game, data, travel=result.to_dict())
+
+
+@game_bp.route('/explore', methods=['POST'])
+def explore():
+    """Walk towards the nearest unexplored cell until something needs attention, as /travel."""
+    data = request.get_json(silent=True) or {}
+    with current_game() as game:
+        result = game.auto_explore()
+        return state_response(game, data, travel=result.to_dict())
+
+
+@game_bp.route('/reset', methods=['POST'])
+def reset_level():
+    with current_game() as game:
+        game.initialize_level()  # Reset the current level
+        return state_response(game, request.get_json(silent=True) or {})
+
+
+@game_bp.route('/commands', methods=['POST'])
+def run_commands():
+    """
+    Apply a batch of queued commands and acknowledge the last sequence number.
+
+    Body: {"commands": [{"seq": 1, "type": "move", "x": 3, "y": 4}, ...],
+           "since": <tick>, "reply": true}
+    Command types are 'move' and 'travel' (both with x and y), 'explore' and 'reset'.
+    With "reply": false the client is listening on /stream, which pushes the
+    result, so only the acknowledgement is returned.
+    """
+    data = request.get_json(silent=True) or {}
+    commands = data.get('commands')
+    if not isinstance(commands, list) or not all(isinstance(command, dict) for command in commands):
+        return jsonify({'error': 'Expected a list of commands'}), 400
+    if len(commands) > SERVER_CONFIG['MAX_COMMANDS_PER_BATCH']:
+        return jsonify({'error': 'Too many commands in one batch'}), 413
+
+    with current_game() as game:
+        ack = apply_commands(game, commands)
+        if not data.get('reply', True):
+            return jsonify({'ack': ack, 'tick': game.tick})
+        return jsonify({'ack': ack, **game.to_delta(parse_since(data.get('since')))})
+
+
+@game_bp.route('/stream')
+def stream_updates():
+    """Server-sent events: push a delta to the client after every change to its game."""
+    with current_game():
+        token = g.session_id
+    store = state_store()
+    notifier = turn_notifier()
+    # EventSource reconnects send the last frame id back, which is the last tick seen
+    since = parse_since(request.headers.get('Last-Event-ID', request.args.get('since')))
+    keepalive = SERVER_CONFIG['STREAM_KEEPALIVE_SECONDS']
+    # Changes made by other workers only show up by polling a shared store
+    poll = min(keepalive, SERVER_CONFIG['STREAM_POLL_SECONDS']) if store.shared else keepalive
+
+    def events():
+        nonlocal since
+        # The first frame brings the client up to date; later ones carry only changes
+        while True:
+            try:
+                with store.checkout(token, create=False) as (_, game):
+                    delta = game.to_delta(since)
+            except KeyError:
+                return  # The session was evicted
+            since = delta['tick']
+            yield f"id: {since}\ndata: {json.dumps(delta, separators=(',', ':'))}\n\n"
+
+            # Wakes on a local notification, a polled change or eviction (tick None)
+            waited = 0.0
+            while not notifier.wait(token, lambda: store.tick(token) != since, poll):
+                waited += poll
+                if waited >= keepalive:
+                    waited = 0.0
+                    yield ": keepalive\n\n"
+
+    response = Response(events(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # Don't let a reverse proxy hold frames back
+    return response
+
+
+@game_bp.route('/sessions/stats')
+def session_stats():
+    return jsonify(state_store().stats())
+
+
+@game_bp.route('/music/<filename>')
+def serve_music(filename):
+    """
+    Serve a music track with a content ETag, so repeat visits revalidate to a 304.
+
+    Range and If-Range requests get partial responses, so seeking only fetches
+    the bytes it needs. Built pages use the hashed copy under /assets instead.
+    """
+    directory = os.path.join(current_app.root_path, 'static', 'assets', 'music')
+    path = safe_join(directory, filename)
+    if path is None or not os.path.isfile(path):
+        current_app.logger.warning("Music file not found: %s", filename)
+        return 'Not found', 404
+    return send_from_directory(directory, filename, etag=file_digest(path), conditional=True)
+
+
+@game_bp.route('/assets/<path:filename>')
+def serve_asset(filename):
+    """Serve a content-hashed file from build_assets.py; its name changes whenever it does."""
+    digest = digest_of(filename)
+    if digest is None:
+        return 'Not found', 404
+    response = send_from_directory(os.path.join(current_app.root_path, SERVER_CONFIG['ASSET_DIR']), filename,
+                                   etag=digest, conditional=True, max_age=ASSET_CACHE_SECONDS)
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+
+@game_bp.app_context_processor
+def asset_urls():
+    manifest: AssetManifest = current_app.extensions['assets']
+    return {'asset_url': manifest.url, 'asset_manifest': manifest.urls()}
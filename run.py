@@ -1,54 +1,46 @@
-from flask import Flask, render_template, jsonify, request, send_from_directory
-from game.engine.game_state import GameState
+from typing import Optional
+from flask import Flask
+from game.engine.level_generator import LevelGenerator
+from game.engine.state_store import StateStore, create_state_store
+from game.engine.turn_channel import TurnNotifier
+from game.routes import game_bp
 from game.editor.routes import editor_bp
+from game.levels.level_store import LevelStore
+from game import metrics
+from game.assets import AssetManifest
+from config import SERVER_CONFIG
 import os
 
-app = Flask(__name__)
-app.register_blueprint(editor_bp)  # Register the editor blueprint
 
-game = GameState()
+def create_app(store: Optional[StateStore] = None, levels: Optional[LevelStore] = None) -> Flask:
+    """
+    Build the Flask application.
 
+    The game state store comes from SERVER_CONFIG['STATE_STORE'] unless one is
+    passed in; use the file or redis store when running several workers. Levels
+    saved from the editor live in SERVER_CONFIG['LEVEL_DIR'] by default.
+    Hashed assets from build_assets.py are picked up from SERVER_CONFIG['ASSET_DIR'].
+    Timings are served at /metrics when SERVER_CONFIG['METRICS_ENABLED'] is set.
+    """
+    app = Flask(__name__)
+    app.extensions['state_store'] = store or create_state_store(SERVER_CONFIG)
+    app.extensions['level_store'] = levels if levels is not None else LevelStore(SERVER_CONFIG['LEVEL_DIR'])
+    # Games load custom levels through the shared level cache
+    LevelGenerator.custom_levels = app.extensions['level_store']
+    app.extensions['turn_notifier'] = TurnNotifier()
+    app.extensions['assets'] = AssetManifest(os.path.join(app.root_path, SERVER_CONFIG['ASSET_DIR']))
+    app.register_blueprint(game_bp)
+    app.register_blueprint(editor_bp)  # Register the editor blueprint
+    if SERVER_CONFIG['METRICS_ENABLED']:
+        metrics.install(app)
+    return app
 
-@app.route('/')
-def index():
-    return render_template('game.html')
 
-
-@app.route('/game_state')
-def get_game_state():
-    return jsonify(game.to_dict())
-
-
-@app.route('/move', methods=['POST'])
-def move_player():
-    data = request.json
-    target_x = data.get('x')
-    target_y = data.get('y')
-
-    if target_x is None or target_y is None:
-        return jsonify({'error': 'Invalid coordinates'}), 400
-
-    game.try_move_player(target_x, target_y)
-    return jsonify(game.to_dict())
-
-
-@app.route('/reset', methods=['POST'])
-def reset_level():
-    game.initialize_level()  # Reset the current level
-    return jsonify(game.to_dict())
-
-
-@app.route('/music/<filename>')
-def serve_music(filename):
-    try:
-        return send_from_directory('static/assets/music', filename)
-    except Exception as e:
-        print(f"Error serving music file: {e}")
-        return str(e), 404
+app = create_app()
 
 
 if __name__ == '__main__':
     # Ensure the template directory is correctly set
     template_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
     app.template_folder = template_dir
-    app.run(debug=True)
\ No newline at end of file
+    app.run(debug=True, threaded=True)
@@ -1,121 +1,272 @@
-import os
+"""
+Write the name and content of every project file to project_contents/project_contents.txt.
+
+Binary files (like images) only have their filenames listed. Files are read on
+a thread pool and written out in walk order as they arrive, so the whole dump
+is never held in memory.
+
+With --incremental, a manifest of each file's mtime, size and content hash and
+of where its entry sits in the output is kept next to it. Unchanged files are
+copied from the previous output instead of being read again, and when nothing
+changed at all the output is left alone.
+"""
+import argparse
+import hashlib
+import json
 import mimetypes
+import os
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
+OUTPUT_DIR = Path('project_contents')
+OUTPUT_FILE = OUTPUT_DIR / 'project_contents.txt'
+MANIFEST_FILE = OUTPUT_DIR / 'manifest.json'
+MANIFEST_VERSION = 1
+
+SEPARATOR = '=' * 80
+
+# Text file extensions to always read
+TEXT_EXTENSIONS = {
+    '.txt', '.py', '.js', '.html', '.css', '.json', '.md',
+    '.yaml', '.yml', '.toml', '.ini', '.cfg'
+}
+
+# Virtual environment directory names
+VENV_PATTERNS = {
+    'venv', 'env', '.venv', '.env',
+    'virtualenv', 'virtual_env',
+    'Lib/site-packages',  # Common in Windows venvs
+    'lib/site-packages',  # Common in Unix venvs
+    'lib/python',  # Catches lib/python3.x/site-packages
+}
+
+# Directories and files to ignore
+IGNORE_PATTERNS = {
+    # Output directory
+    'project_contents',
+    # Git directories
+    '.git',
+    # Python cache directories
+    '__pycache__',
+    # Node modules
+    'node_modules',
+    # IDE directories
+    '.idea', '.vscode',
+    # Build directories
+    'build', 'dist',
+    # Compiled Python files
+    '.pyc',
+    # Package directories
+    'egg-info',
+}
+
+# A path is ignored if any pattern occurs anywhere in it; one regex checks them all
+IGNORE_RE = re.compile('|'.join(re.escape(pattern) for pattern in sorted(VENV_PATTERNS | IGNORE_PATTERNS)))
+
+SCRIPT_NAME = os.path.basename(__file__)
+
+
+def should_ignore(path_str, name):
+    """Check if a path, or the file or directory name at its end, should be ignored"""
+    return name == SCRIPT_NAME or IGNORE_RE.search(path_str) is not None
+
+
+@lru_cache(maxsize=None)
+def _is_text_suffix(suffixes):
+    # mimetypes only looks at the extensions, so the answer is the same for every file sharing them
+    extension = suffixes[suffixes.rfind('.'):].lower() if suffixes else ''
+    if extension in TEXT_EXTENSIONS:
+        return True
+    mime_type, _ = mimetypes.guess_type('file' + suffixes)
+    return bool(mime_type and mime_type.startswith('text/'))
+
+
+def is_text_file(name):
+    """Determine if a file is a text file based on mimetype or extension"""
+    return _is_text_suffix(''.join(Path(name).suffixes))
+
+
+def walk_files(root_dir):
+    """Yield (path, name) for every file that is not ignored, in os.walk order."""
+    root = str(Path(root_dir))
+    prefix = '' if root == '.' else root + os.sep
+    for dir_path, dirs, files in os.walk(root_dir):
+        # Modify dirs in place to skip ignored directories
+        dirs[:] = [d for d in dirs if not should_ignore(d, d)]
+
+        relative = os.path.relpath(dir_path, root_dir)
+        base = prefix if relative == '.' else prefix + relative + os.sep
+        for name in files:
+            file_path = base + name
+            if not should_ignore(file_path, name):
+                yield file_path, name
+
+
+# -----------------
+# File entries
+# -----------------
 
-def scan_project_files(root_dir='.'):
+def binary_entry(file_path):
+    return f"\n{SEPARATOR}\nBinary File: {file_path}\n"
+
+
+def read_entry(file_path):
+    """Read a text file and return (its output entry, its content hash or None if it could not be read)."""
+    try:
+        with open(file_path, 'rb') as f:
+            data = f.read()
+        # Decoded as text mode would, universal newlines included
+        content = data.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+        return f"\n{SEPARATOR}\nFile: {file_path}\nContent:\n{content}\n", hashlib.sha256(data).hexdigest()
+    except Exception as e:
+        return f"\n{SEPARATOR}\nError reading {file_path}: {str(e)}\n", None
+
+
+def ordered_results(executor, function, items, window):
+    """Like executor.map, but keep at most window calls ahead of the consumer."""
+    pending = deque()
+    for item in items:
+        pending.append(executor.submit(function, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+# -----------------
+# Scanning
+# -----------------
+
+def scan_project_files(root_dir='.', incremental=False, workers=None):
     """
     Recursively scan directory and output filenames and their content.
     Binary files (like images) will only have their filenames listed.
 
     Args:
         root_dir (str): Root directory to start scanning from
+        incremental (bool): Only read files that changed since the last incremental run
+        workers (int): Threads reading files; defaults to ThreadPoolExecutor's choice
     """
-    # Initialize mimetypes
-    mimetypes.init()
-
-    # Text file extensions to always read
-    text_extensions = {
-        '.txt', '.py', '.js', '.html', '.css', '.json', '.md',
-        '.yaml', '.yml', '.toml', '.ini', '.cfg'
-    }
-
-    # Virtual environment directory names
-    venv_patterns = {
-        'venv', 'env', '.venv', '.env',
-        'virtualenv', 'virtual_env',
-        'Lib/site-packages',  # Common in Windows venvs
-        'lib/site-packages',  # Common in Unix venvs
-        'lib/python',  # Catches lib/python3.x/site-packages
-    }
-
-    # Directories and files to ignore
-    ignore_patterns = {
-        # Output directory
-        'project_contents',
-        # Git directories
-        '.git',
-        # Python cache directories
-        '__pycache__',
-        # Node modules
-        'node_modules',
-        # IDE directories
-        '.idea', '.vscode',
-        # Build directories
-        'build', 'dist',
-        # Compiled Python files
-        '.pyc',
-        # Package directories
-        'egg-info',
-    }
-
-    def should_ignore(path):
-        """Check if the path should be ignored"""
-        path_str = str(Path(path))
-
-        # Check for virtual environment patterns
-        for venv_pattern in venv_patterns:
-            if venv_pattern in path_str:
-                return True
-
-        # Check other ignore patterns
-        for ignore in ignore_patterns:
-            if ignore in path_str:
-                return True
-
-        # Ignore this script itself
-        if Path(path).name == os.path.basename(__file__):
-            return True
+    # Create output directory if it doesn't exist
+    OUTPUT_DIR.mkdir(exist_ok=True)
+    workers = workers or min(32, (os.cpu_count() or 1) + 4)  # ThreadPoolExecutor's default
 
-        return False
+    if incremental:
+        written = _scan_incremental(root_dir, workers)
+    else:
+        written = _scan_all(root_dir, workers)
 
-    def is_text_file(file_path):
-        """Determine if a file is a text file based on mimetype or extension"""
-        mime_type, _ = mimetypes.guess_type(file_path)
-        extension = Path(file_path).suffix.lower()
+    if written:
+        print(f"Project contents have been written to {OUTPUT_FILE}")
+    else:
+        print(f"Project contents in {OUTPUT_FILE} are up to date")
 
-        if extension in text_extensions:
-            return True
-        if mime_type and mime_type.startswith('text/'):
-            return True
-        return False
 
-    def process_file(file_path):
-        """Process a single file and return its information"""
+def _scan_all(root_dir, workers):
+    def entry(item):
+        file_path, name = item
+        return read_entry(file_path)[0] if is_text_file(name) else binary_entry(file_path)
+
+    # The output no longer matches what a previous incremental run recorded
+    if MANIFEST_FILE.exists():
+        MANIFEST_FILE.unlink()
+
+    with ThreadPoolExecutor(workers) as executor, open(OUTPUT_FILE, 'w', encoding='utf-8') as out:
+        for index, text in enumerate(ordered_results(executor, entry, walk_files(root_dir), 4 * workers)):
+            out.write(text if index == 0 else '\n' + text)
+    return True
+
+
+def _scan_incremental(root_dir, workers):
+    previous = _load_manifest()
+    # Entries are copied from the old output by offset, so it must be the one the manifest describes
+    old_files = previous['files'] if _output_size() == previous['output_size'] else {}
+
+    # Stat everything first: an unchanged tree is detected without opening a single file
+    files = []
+    for file_path, name in walk_files(root_dir):
         try:
-            if is_text_file(file_path):
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                return f"\n{'=' * 80}\nFile: {file_path}\nContent:\n{content}\n"
-            else:
-                return f"\n{'=' * 80}\nBinary File: {file_path}\n"
-        except Exception as e:
-            return f"\n{'=' * 80}\nError reading {file_path}: {str(e)}\n"
+            stat = os.stat(file_path)
+            files.append((file_path, name, stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            files.append((file_path, name, None, None))
+    if (old_files and list(old_files) == [file_path for file_path, _, _, _ in files] and
+            all(mtime is not None and old_files[file_path][:2] == [mtime, size]
+                for file_path, _, mtime, size in files)):
+        return False
 
-    # Create output directory if it doesn't exist
-    output_dir = Path('project_contents')
-    output_dir.mkdir(exist_ok=True)
+    def entry(item):
+        file_path, name, mtime, size = item
+        if not is_text_file(name):
+            return binary_entry(file_path), None, None
+        old = old_files.get(file_path)
+        if old is not None and old[2] is not None and old[:2] == [mtime, size]:
+            return None, old, old[2]  # Copied from the previous output
+        text, digest = read_entry(file_path)
+        if old is not None and digest is not None and digest == old[2]:
+            return None, old, digest  # Touched but not changed
+        return text, None, digest
+
+    new_files = {}
+    offset = 0
+    temporary = OUTPUT_FILE.with_name(OUTPUT_FILE.name + '.tmp')
+    old_output = open(OUTPUT_FILE, 'rb') if old_files else None
+    try:
+        with ThreadPoolExecutor(workers) as executor, open(temporary, 'wb') as out:
+            results = ordered_results(executor, entry, files, 4 * workers)
+            for index, ((file_path, _, mtime, size), (text, old, digest)) in enumerate(zip(files, results)):
+                if index:
+                    out.write(b'\n')
+                    offset += 1
+                if text is None:
+                    old_output.seek(old[3])
+                    data = old_output.read(old[4])
+                else:
+                    data = text.encode('utf-8')
+                out.write(data)
+                new_files[file_path] = [mtime, size, digest, offset, len(data)]
+                offset += len(data)
+    finally:
+        if old_output is not None:
+            old_output.close()
+    os.replace(temporary, OUTPUT_FILE)
+
+    with open(MANIFEST_FILE, 'w', encoding='utf-8') as f:
+        json.dump({'version': MANIFEST_VERSION, 'output_size': offset, 'files': new_files}, f)
+    return True
+
+
+def _load_manifest():
+    """The last incremental run's manifest: path -> [mtime_ns, size, sha256, offset, length]."""
+    try:
+        with open(MANIFEST_FILE, encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('version') == MANIFEST_VERSION:
+            return manifest
+    except (OSError, ValueError):
+        pass
+    return {'output_size': None, 'files': {}}
 
-    # Walk through directory and process files
-    all_content = []
-    for root, dirs, files in os.walk(root_dir):
-        # Modify dirs in place to skip ignored directories
-        dirs[:] = [d for d in dirs if not should_ignore(d)]
 
-        for file in files:
-            file_path = Path(root) / file
-            # Skip ignored files
-            if should_ignore(file_path):
-                continue
-            all_content.append(process_file(file_path))
+def _output_size():
+    try:
+        return OUTPUT_FILE.stat().st_size
+    except OSError:
+        return None
 
-    # Write to output file
-    output_file = output_dir / 'project_contents.txt'
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write('\n'.join(all_content))
 
-    print(f"Project contents have been written to {output_file}")
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n\n')[0])
+    parser.add_argument('root_dir', nargs='?', default='.', help='directory to scan (default: .)')
+    parser.add_argument('--incremental', action='store_true',
+                        help=f'only re-read files changed since the last incremental run, tracked in {MANIFEST_FILE}')
+    parser.add_argument('--workers', type=int, default=None, help='threads reading files')
+    args = parser.parse_args()
+    scan_project_files(args.root_dir, args.incremental, args.workers)
 
 
 if __name__ == '__main__':
-    scan_project_files()
\ No newline at end of file
+    main()
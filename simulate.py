@@ -0,0 +1,205 @@
+"""
+Headless batch simulation for balancing GAME_CONFIG.
+
+Plays many seeded games with a scripted player, spread over a process pool, and
+reports win rate, turns-to-death and damage distributions per config variant.
+Every variant plays the same game seeds, so differences come from the config.
+
+Usage:
+    python simulate.py --games 100000 \
+        --variant PLAYER_EVASION_CHANCE=0.2 \
+        --variant PLAYER_EVASION_CHANCE=0.4,PLAYER_BASE_DAMAGE=25
+"""
+import argparse
+import json
+import os
+import random
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from game.engine.game_state import GameState
+from game.engine.pathfinding import find_path
+from config import GAME_CONFIG
+
+
+def nearest_enemy_policy(game: GameState) -> Optional[Tuple[int, int]]:
+    """Scripted player: walk to the closest living enemy and attack it. None when none are left."""
+    _, player = game.get_player()
+    target = None
+    target_distance = 0
+    for entity in game.entities.values():
+        if entity.entity_type == 'enemy' and entity.behavior != 'dead':
+            distance = max(abs(entity.x - player.x), abs(entity.y - player.y))
+            if target is None or distance < target_distance:
+                target, target_distance = entity, distance
+
+    if target is None:
+        return None
+    if target_distance == 1:
+        return target.x, target.y
+
+    path = find_path(game.spatial.wall_mask, game.width, game.height,
+                     (player.x, player.y), (target.x, target.y))
+    return path[0] if path else (target.x, target.y)
+
+
+def play_game(game: GameState, seed: str, max_turns: int) -> Tuple[bool, int, float, float]:
+    """Play one game to the end and return (won, turns, damage taken, damage dealt)."""
+    level = game.current_level
+    game.rng.seed(seed)
+    game.initialize_level()
+
+    _, player = game.get_player()
+    start_health = player.health
+    enemies = [entity for entity in game.entities.values() if entity.entity_type == 'enemy']
+    enemy_health = sum(entity.health for entity in enemies)
+
+    turns = 0
+    won = False
+    while not game.game_over and turns < max_turns:
+        target = nearest_enemy_policy(game)
+        if target is None:
+            won = True
+            break
+        game.try_move_player(*target)
+        turns += 1
+        if game.current_level != level:
+            # Clearing the level moved the run on; the next game starts on this level again
+            game.current_level = level
+            won = True
+            break
+
+    _, player = game.get_player()
+    damage_taken = start_health - max(player.health, 0)
+    # After a clear the enemy views point at the next level's enemies
+    damage_dealt = enemy_health if won else enemy_health - sum(max(entity.health, 0) for entity in enemies)
+    return won, turns, damage_taken, damage_dealt
+
+
+def run_batch(overrides: Dict, level: int, base_seed: int,
+              first_game: int, games: int, max_turns: int) -> Dict:
+    """Play a batch of games in one worker and return aggregated histograms."""
+    game = GameState(rng=random.Random(), config=overrides)
+    game.current_level = level
+
+    wins = 0
+    turns_to_death: Counter = Counter()
+    damage_taken: Counter = Counter()
+    damage_dealt: Counter = Counter()
+
+    for game_index in range(first_game, first_game + games):
+        won, turns, taken, dealt = play_game(game, f"{base_seed}:{game_index}", max_turns)
+        if won:
+            wins += 1
+        elif game.game_over:
+            turns_to_death[turns] += 1
+        damage_taken[round(taken)] += 1
+        damage_dealt[round(dealt)] += 1
+
+    return {
+        'games': games,
+        'wins': wins,
+        'turns_to_death': turns_to_death,
+        'damage_taken': damage_taken,
+        'damage_dealt': damage_dealt,
+    }
+
+
+def summarize(histogram: Counter) -> Dict:
+    """Mean and percentiles of a value -> count histogram."""
+    total = sum(histogram.values())
+    if not total:
+        return {'count': 0}
+
+    values = sorted(histogram.items())
+    summary = {'count': total, 'mean': sum(value * count for value, count in values) / total}
+    for name, fraction in (('p10', 0.1), ('p50', 0.5), ('p90', 0.9)):
+        rank = fraction * (total - 1)
+        seen = 0
+        for value, count in values:
+            seen += count
+            if seen > rank:
+                summary[name] = value
+                break
+    return summary
+
+
+def simulate(variants: List[Dict], games: int, level: int, seed: int,
+             max_turns: int, workers: int, batch_size: int) -> List[Dict]:
+    """Run every variant over the same game seeds and return one report per variant."""
+    reports = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for overrides in variants:
+            futures = [
+                pool.submit(run_batch, overrides, level, seed, first, min(batch_size, games - first), max_turns)
+                for first in range(0, games, batch_size)
+            ]
+
+            wins = 0
+            totals = {'turns_to_death': Counter(), 'damage_taken': Counter(), 'damage_dealt': Counter()}
+            for future in futures:
+                result = future.result()
+                wins += result['wins']
+                for key, histogram in totals.items():
+                    histogram.update(result[key])
+
+            reports.append({
+                'variant': overrides,
+                'games': games,
+                'win_rate': wins / games,
+                **{key: summarize(histogram) for key, histogram in totals.items()},
+            })
+    return reports
+
+
+def parse_variant(text: str) -> Dict:
+    """Parse 'KEY=VALUE,KEY=VALUE' into GAME_CONFIG overrides."""
+    overrides = {}
+    for pair in filter(None, text.split(',')):
+        key, _, value = pair.partition('=')
+        key = key.strip()
+        if key not in GAME_CONFIG:
+            raise argparse.ArgumentTypeError(f"Unknown GAME_CONFIG key: {key}")
+        try:
+            overrides[key] = json.loads(value)
+        except json.JSONDecodeError:
+            raise argparse.ArgumentTypeError(f"Invalid value for {key}: {value!r}")
+    return overrides
+
+
+def print_report(reports: List[Dict]) -> None:
+    print(f"{'variant':<48} {'win rate':>8} {'death p50':>10} {'taken p50':>10} {'taken p90':>10}")
+    for report in reports:
+        name = ','.join(f"{key}={value}" for key, value in report['variant'].items()) or 'baseline'
+        deaths = report['turns_to_death']
+        taken = report['damage_taken']
+        print(f"{name:<48} {report['win_rate']:>8.1%} {deaths.get('p50', '-'):>10} "
+              f"{taken.get('p50', '-'):>10} {taken.get('p90', '-'):>10}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--games', type=int, default=10000, help='games per variant')
+    parser.add_argument('--variant', type=parse_variant, action='append', default=[],
+                        help='GAME_CONFIG overrides as KEY=VALUE[,KEY=VALUE]; repeatable')
+    parser.add_argument('--level', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-turns', type=int, default=500)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--json', help='also write the reports to this file')
+    args = parser.parse_args()
+
+    # The unmodified config is always simulated as the reference point
+    variants = [{}] + args.variant
+    reports = simulate(variants, args.games, args.level, args.seed,
+                       args.max_turns, args.workers, args.batch_size)
+    print_report(reports)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(reports, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,12 @@
+// URLs of content-hashed assets, embedded in the page by the server after build_assets.py has run
+const manifestElement = document.getElementById('assetManifest');
+const ASSET_URLS = manifestElement ? JSON.parse(manifestElement.textContent) : {};
+
+// URL of a file under /static, preferring its hashed copy
+export function assetUrl(path) {
+    return ASSET_URLS[path] || `/static/${path}`;
+}
+
+export function hasAsset(path) {
+    return path in ASSET_URLS;
+}
@@ -12,6 +12,19 @@ export class Game {
         this.uiManager = new UIManager();
 
         this.gameState = null;
+        this.geometry = null;
+        this.tick = null;
+
+        // Clicks are queued and sent in batches; results arrive on the event
+        // stream when it is open, or in the /commands response otherwise.
+        // Sequence numbers carry on from the session's, which outlives the page
+        this.commandQueue = [];
+        this.commandSeq = 0;
+        this.sending = false;
+        this.stream = null;
+        this.streaming = false;
+        this.pendingUpdate = Promise.resolve();
+
         this.gameOverlay = document.getElementById('gameOverlay');
 
         // Bind methods
@@ -21,35 +34,150 @@ export class Game {
         this.resetBtn = document.getElementById('resetLevel');
         this.resetBtn.addEventListener('click', () => this.resetLevel());
 
+        // Auto-explore walks many turns in one command, stopping when an enemy shows up
+        this.exploreBtn = document.getElementById('autoExplore');
+        this.exploreBtn.addEventListener('click', () => this.queueCommand({ type: 'explore' }));
+
         // Initialize game
         this.setupEventListeners();
-        this.loadGameState();
+        this.loadGameState().then(() => {
+            this.flushCommands();
+            this.openStream();
+        });
     }
 
     setupEventListeners() {
         this.renderManager.canvas.addEventListener('click', this.handleClick);
     }
 
-    async handleClick(e) {
-        console.log("Player clicked")
+    handleClick(e) {
+        // Clicks land in the scrolled viewport; the server wants map coordinates
         const rect = this.renderManager.canvas.getBoundingClientRect();
-        const clickX = Math.floor((e.clientX - rect.left) / (this.renderManager.TILE_SIZE * this.renderManager.SCALE));
-        const clickY = Math.floor((e.clientY - rect.top) / (this.renderManager.TILE_SIZE * this.renderManager.SCALE));
+        const clickX = this.renderManager.viewX + Math.floor((e.clientX - rect.left) / (this.renderManager.TILE_SIZE * this.renderManager.SCALE));
+        const clickY = this.renderManager.viewY + Math.floor((e.clientY - rect.top) / (this.renderManager.TILE_SIZE * this.renderManager.SCALE));
+
+        // Clicks further than one step away travel there over several turns in one command
+        const player = this.gameState && Object.values(this.gameState.entities).find(entity => entity.type === 'player');
+        const far = player && Math.max(Math.abs(clickX - player.x), Math.abs(clickY - player.y)) > 1;
+        const seen = this.gameState && this.gameState.explored.has(clickY * this.gameState.width + clickX);
+        this.queueCommand({ type: far && seen ? 'travel' : 'move', x: clickX, y: clickY });
+    }
+
+    queueCommand(command) {
+        this.commandQueue.push(command);
+        this.flushCommands();
+    }
+
+    async flushCommands() {
+        // One request in flight at a time; clicks made meanwhile go out together.
+        // Nothing is sent before the first state, which carries the last sequence number
+        if (this.sending || !this.gameState || this.commandQueue.length === 0) {
+            return;
+        }
+        this.sending = true;
+        // Numbered when first sent, once the session's last sequence number is known;
+        // a retried batch keeps its numbers
+        const batch = this.commandQueue.splice(0).map(command =>
+            command.seq === undefined ? { seq: ++this.commandSeq, ...command } : command);
 
         try {
-            const response = await fetch('/move', {
+            const response = await fetch('/commands', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json'
                 },
-                body: JSON.stringify({ x: clickX, y: clickY })
+                body: JSON.stringify({ commands: batch, since: this.tick, reply: !this.streaming })
             });
-
-            this.gameState = await response.json();
-            this.updateGameState();
+            const result = await response.json();
+            if (!response.ok) {
+                throw new Error(result.error);
+            }
+            this.commandSeq = Math.max(this.commandSeq, result.ack ?? 0);
+            if (result.tick !== undefined && result.full !== undefined) {
+                this.queueUpdate(result);
+            }
         } catch (error) {
-            console.error('Error:', error);
+            // Resending is safe, the server skips sequence numbers it has applied
+            console.error('Error sending commands:', error);
+            this.commandQueue.unshift(...batch);
+            this.sending = false;
+            return;
+        }
+
+        this.sending = false;
+        this.flushCommands();
+    }
+
+    openStream() {
+        if (!window.EventSource) {
+            return;  // Stay on the request/response fallback
+        }
+        this.stream = new EventSource(`/stream?since=${this.tick ?? ''}`);
+        this.stream.onopen = () => { this.streaming = true; };
+        this.stream.onerror = () => { this.streaming = false; };  // EventSource reconnects by itself
+        this.stream.onmessage = (event) => this.queueUpdate(JSON.parse(event.data));
+    }
+
+    queueUpdate(update) {
+        // Apply updates strictly in arrival order, geometry fetches included
+        this.pendingUpdate = this.pendingUpdate
+            .then(() => this.applyUpdate(update))
+            .catch(error => console.error('Error applying update:', error));
+    }
+
+    async applyUpdate(update) {
+        // Skip pushes that carry nothing newer than what is already shown
+        if (!update.full && this.gameState && update.tick <= this.tick) {
+            return;
+        }
+
+        // Static geometry is only refetched when the level changes; the browser
+        // revalidates it with the ETag so repeat fetches are cheap
+        if (!this.geometry || update.geometry_version !== this.geometry.geometry_version) {
+            await this.loadGeometry();
+        }
+
+        const previous = this.gameState;
+        const fresh = update.full || !previous;
+        const entities = fresh ? {} : { ...previous.entities };
+        // Entities that changed out of sight arrive as null and are forgotten
+        for (const [id, entity] of Object.entries(update.entities)) {
+            if (entity === null) {
+                delete entities[id];
+            } else {
+                entities[id] = entity;
+            }
         }
+
+        const messages = fresh
+            ? update.messages
+            : previous.messages.concat(update.messages).slice(-5);
+
+        // Map memory only grows; the server sends newly explored cells and walls
+        const explored = fresh ? new Set() : previous.explored;
+        update.explored.forEach(index => explored.add(index));
+        const walls = fresh ? update.walls : previous.walls.concat(update.walls);
+        const visible = update.visible ? new Set(update.visible) : previous.visible;
+
+        this.gameState = {
+            ...update,
+            width: this.geometry.width,
+            height: this.geometry.height,
+            entities,
+            messages,
+            explored,
+            walls,
+            visible
+        };
+        this.tick = update.tick;
+        this.commandSeq = Math.max(this.commandSeq, update.command_seq ?? 0);
+        this.updateGameState();
+    }
+
+    async loadGeometry() {
+        const response = await fetch('/level_geometry');
+        this.geometry = await response.json();
+        this.renderManager.initializeCanvas(this.geometry.width, this.geometry.height);
     }
 
     updateGameState() {
@@ -73,28 +201,14 @@ export class Game {
 
     async loadGameState() {
         try {
-            const response = await fetch('/game_state');
-            this.gameState = await response.json();
-            this.renderManager.initializeCanvas(this.gameState.width, this.gameState.height);
-            this.updateGameState();
+            const response = await fetch('/game_state?since=');
+            await this.applyUpdate(await response.json());
         } catch (error) {
             console.error('Error loading game state:', error);
         }
     }
 
-    async resetLevel() {
-        try {
-            const response = await fetch('/reset', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json'
-                }
-            });
-
-            this.gameState = await response.json();
-            this.updateGameState();
-        } catch (error) {
-            console.error('Error resetting level:', error);
-        }
+    resetLevel() {
+        this.queueCommand({ type: 'reset' });
     }
 }
\ No newline at end of file
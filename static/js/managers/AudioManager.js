@@ -1,3 +1,5 @@
+import { assetUrl } from '../assets.js';
+
 export class AudioManager {
     constructor() {
         this.backgroundMusic = document.getElementById('backgroundMusic');
@@ -7,9 +9,9 @@ export class AudioManager {
 
         // Initialize swing sounds array
         this.swingSounds = [
-            new Audio('/static/assets/sfx/swing1.wav'),
-            new Audio('/static/assets/sfx/swing2.wav'),
-            new Audio('/static/assets/sfx/swing3.wav')
+            new Audio(assetUrl('assets/sfx/swing1.wav')),
+            new Audio(assetUrl('assets/sfx/swing2.wav')),
+            new Audio(assetUrl('assets/sfx/swing3.wav'))
         ];
 
         // Set initial volume for all swing sounds
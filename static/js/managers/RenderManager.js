@@ -1,4 +1,9 @@
 import { TILE_SIZE, SCALE, SPRITE_MAPPING } from '../spriteMapping.js';
+import { assetUrl, hasAsset } from '../assets.js';
+
+// Largest map area drawn at once, in tiles; bigger maps scroll with the player
+const VIEWPORT_WIDTH = 48;
+const VIEWPORT_HEIGHT = 32;
 
 export class RenderManager {
     constructor() {
@@ -6,15 +11,22 @@ export class RenderManager {
         this.ctx = this.canvas.getContext('2d');
         this.tilesheet = new Image();
         this.tilesLoaded = false;
+        this.spriteMapping = SPRITE_MAPPING;
         this.gameState = null;
 
+        // Camera: the top-left map cell of the viewport and its size in tiles
+        this.viewX = 0;
+        this.viewY = 0;
+        this.viewWidth = 0;
+        this.viewHeight = 0;
+
         this.TILE_SIZE = TILE_SIZE;
         this.SCALE = SCALE;
 
         this.loadTilesheet();
     }
 
-    loadTilesheet() {
+    async loadTilesheet() {
         this.tilesheet.onload = () => {
             this.tilesLoaded = true;
             // Only render if we have both the tilesheet and game state
@@ -22,13 +34,31 @@ export class RenderManager {
                 this.render(this.gameState);
             }
         };
-        this.tilesheet.src = '/static/assets/tilesets/colored.png';
+
+        // A built atlas holds only the sprites in use; without one, draw from the full sheet
+        if (hasAsset('atlas.json')) {
+            try {
+                const response = await fetch(assetUrl('atlas.json'));
+                this.spriteMapping = (await response.json()).sprites;
+                this.tilesheet.src = assetUrl('atlas.png');
+                return;
+            } catch (error) {
+                console.error('Failed to load sprite atlas:', error);
+                this.spriteMapping = SPRITE_MAPPING;
+            }
+        }
+        this.tilesheet.src = assetUrl('assets/tilesets/colored.png');
+    }
+
+    inView(x, y) {
+        return x >= this.viewX && x < this.viewX + this.viewWidth &&
+               y >= this.viewY && y < this.viewY + this.viewHeight;
     }
 
     drawSprite(type, x, y, variant = 'default') {
-        if (!this.tilesLoaded) return;
+        if (!this.tilesLoaded || !this.inView(x, y)) return;
 
-        const spriteInfo = SPRITE_MAPPING[type];
+        const spriteInfo = this.spriteMapping[type];
         if (!spriteInfo) return;
 
         const [srcX, srcY] = variant && spriteInfo.variants?.[variant] || spriteInfo.default;
@@ -37,16 +67,27 @@ export class RenderManager {
             this.tilesheet,
             srcX, srcY,              // Source x, y
             TILE_SIZE, TILE_SIZE,    // Source width, height
-            x * TILE_SIZE * SCALE,   // Dest x
-            y * TILE_SIZE * SCALE,   // Dest y
+            (x - this.viewX) * TILE_SIZE * SCALE,   // Dest x
+            (y - this.viewY) * TILE_SIZE * SCALE,   // Dest y
             TILE_SIZE * SCALE,       // Dest width
             TILE_SIZE * SCALE        // Dest height
         );
     }
 
     initializeCanvas(width, height) {
-        this.canvas.width = width * TILE_SIZE * SCALE;
-        this.canvas.height = height * TILE_SIZE * SCALE;
+        this.viewWidth = Math.min(width, VIEWPORT_WIDTH);
+        this.viewHeight = Math.min(height, VIEWPORT_HEIGHT);
+        this.canvas.width = this.viewWidth * TILE_SIZE * SCALE;
+        this.canvas.height = this.viewHeight * TILE_SIZE * SCALE;
+    }
+
+    centerOn(gameState) {
+        // Keep the player in the middle of the viewport without scrolling past the map edge
+        const player = Object.values(gameState.entities).find(entity => entity.type === 'player');
+        if (!player) return;
+        const clamp = (value, max) => Math.max(0, Math.min(value, max));
+        this.viewX = clamp(player.x - Math.floor(this.viewWidth / 2), gameState.width - this.viewWidth);
+        this.viewY = clamp(player.y - Math.floor(this.viewHeight / 2), gameState.height - this.viewHeight);
     }
 
     render(gameState) {
@@ -58,14 +99,13 @@ export class RenderManager {
         // If tiles aren't loaded yet, return and wait for onload callback
         if (!this.tilesLoaded) return;
 
-        // Clear canvas
+        // Clear canvas; only cells inside the viewport are drawn
+        this.centerOn(gameState);
         this.ctx.clearRect(0, 0, this.canvas.width, this.canvas.height);
 
-        // Draw floor tiles first
-        for (let x = 0; x < gameState.width; x++) {
-            for (let y = 0; y < gameState.height; y++) {
-                this.drawSprite('floor', x, y, 'stone');
-            }
+        // Draw floor tiles first, only where the player has been able to see
+        for (const index of gameState.explored) {
+            this.drawSprite('floor', index % gameState.width, Math.floor(index / gameState.width), 'stone');
         }
 
         // Draw walls
@@ -76,8 +116,16 @@ export class RenderManager {
         }
 
 
+        // Remembered but currently unseen cells are dimmed
+        this.drawFog(gameState);
+
+        // Entities out of sight keep their last known state but are not drawn
+        const visibleEntities = Object.values(gameState.entities).filter(entity =>
+            entity.type === 'player' || gameState.visible.has(entity.y * gameState.width + entity.x)
+        );
+
         // Sort entities by type and state to control render order
-        const sortedEntities = Object.values(gameState.entities).sort((a, b) => {
+        const sortedEntities = visibleEntities.sort((a, b) => {
             // Dead enemies should be rendered first
             if (a.behavior === 'dead' && b.behavior !== 'dead') return -1;
             if (a.behavior !== 'dead' && b.behavior === 'dead') return 1;
@@ -105,16 +153,28 @@ export class RenderManager {
         this.drawGrid(gameState);
     }
 
+    drawFog(gameState) {
+        const size = TILE_SIZE * SCALE;
+        this.ctx.fillStyle = 'rgba(0, 0, 0, 0.55)';
+        for (const index of gameState.explored) {
+            const x = index % gameState.width;
+            const y = Math.floor(index / gameState.width);
+            if (!gameState.visible.has(index) && this.inView(x, y)) {
+                this.ctx.fillRect((x - this.viewX) * size, (y - this.viewY) * size, size, size);
+            }
+        }
+    }
+
     drawHealthBar(entity) {
         // Don't draw health bar for dead entities
-        if (entity.behavior === 'dead') {
+        if (entity.behavior === 'dead' || !this.inView(entity.x, entity.y)) {
             return;
         }
 
         const healthPercent = entity.health / 100;
         const barWidth = TILE_SIZE * SCALE;
-        const barX = entity.x * TILE_SIZE * SCALE;
-        const barY = entity.y * TILE_SIZE * SCALE - 4;
+        const barX = (entity.x - this.viewX) * TILE_SIZE * SCALE;
+        const barY = (entity.y - this.viewY) * TILE_SIZE * SCALE - 4;
 
         this.ctx.fillStyle = '#FF0000';
         this.ctx.fillRect(barX, barY, barWidth, 3);
@@ -128,7 +188,7 @@ export class RenderManager {
         this.ctx.lineWidth = 1;
 
         // Vertical lines
-        for (let x = 0; x <= gameState.width; x++) {
+        for (let x = 0; x <= this.viewWidth; x++) {
             this.ctx.beginPath();
             this.ctx.moveTo(x * TILE_SIZE * SCALE, 0);
             this.ctx.lineTo(x * TILE_SIZE * SCALE, this.canvas.height);
@@ -136,7 +196,7 @@ export class RenderManager {
         }
 
         // Horizontal lines
-        for (let y = 0; y <= gameState.height; y++) {
+        for (let y = 0; y <= this.viewHeight; y++) {
             this.ctx.beginPath();
             this.ctx.moveTo(0, y * TILE_SIZE * SCALE);
             this.ctx.lineTo(this.canvas.width, y * TILE_SIZE * SCALE);
@@ -0,0 +1,14 @@
+import random
+from game.engine.game_state import GameState
+from game.engine.level_generator import Level
+
+
+def test_final_kill_message_survives_the_level_change():
+    game = GameState(random.Random(1))
+    game.load_level(Level("#####\n#PE.#\n#####"))
+    while game.current_level == 1 and not game.game_over:
+        _, player = game.get_player()
+        game.try_move_player(player.x + 1, player.y)
+
+    assert game.current_level == 2
+    assert game.to_dict()['messages'][-2:] == ['Enemy defeated!', 'Level cleared! Descending to level 2.']
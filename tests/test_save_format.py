@@ -0,0 +1,36 @@
+import random
+from game.engine.game_state import GameState
+from game.engine.save_format import decode_game, encode_game
+
+
+def fingerprint(game: GameState):
+    """Everything a turn can change that the player would notice."""
+    store = game.entities
+    return (game.tick, game.score, game.game_over, game.rng.getstate(),
+            bytes(store.xs), bytes(store.ys), bytes(store.health), bytes(store.alive))
+
+
+def random_step(game: GameState, rng: random.Random):
+    _, player = game.get_player()
+    return player.x + rng.choice((-1, 0, 1)), player.y + rng.choice((-1, 0, 1))
+
+
+def test_restored_game_keeps_playing_like_the_original():
+    # Levels 1 and 2 have path-following enemies, whose cached A* paths must survive the round trip
+    for level in (1, 2):
+        for seed in range(20):
+            game = GameState(random.Random(seed))
+            game.current_level = level
+            game.initialize_level()
+            moves = random.Random(seed)
+            for _ in range(15):
+                game.try_move_player(*random_step(game, moves))
+
+            restored = decode_game(encode_game(game))
+            assert fingerprint(restored) == fingerprint(game)
+            for _ in range(60):
+                move = random_step(game, moves)
+                game.try_move_player(*move)
+                restored.try_move_player(*move)
+                assert fingerprint(restored) == fingerprint(game), (level, seed)
+            assert restored.path_cache.searches == game.path_cache.searches
@@ -0,0 +1,43 @@
+import random
+from game.engine.game_state import GameState
+from game.engine.session_manager import SessionManager
+from game.engine.state_store import FileStateStore, MemoryStateStore
+from game.engine.save_format import encode_game
+
+
+def play(store, seed: int, level: int, turns: int) -> bytes:
+    """Play the same random moves through a store, one checkout per move like the routes do."""
+    moves = random.Random(seed)
+    with store.checkout(None) as (token, game):
+        game.current_level = level
+        game.initialize_level()
+    for _ in range(turns):
+        with store.checkout(token) as (_, game):
+            _, player = game.get_player()
+            game.try_move_player(player.x + moves.choice((-1, 0, 1)), player.y + moves.choice((-1, 0, 1)))
+    with store.checkout(token) as (_, game):
+        return encode_game(game)
+
+
+def test_file_store_plays_like_memory_store(tmp_path):
+    for level in (1, 2):
+        for seed in range(5):
+            def factory():
+                return GameState(random.Random(seed))
+            memory = MemoryStateStore(SessionManager(factory))
+            files = FileStateStore(str(tmp_path / f"{level}-{seed}"), factory)
+            assert play(files, seed, level, 60) == play(memory, seed, level, 60), (level, seed)
+
+
+def test_polling_tick_does_not_keep_a_session_alive():
+    now = [0.0]
+    sessions = SessionManager(lambda: GameState(random.Random(0)), idle_timeout=10.0, clock=lambda: now[0])
+    store = MemoryStateStore(sessions)
+    with store.checkout(None) as (token, game):
+        tick = game.tick
+
+    now[0] = 9.0
+    assert store.tick(token) == tick  # An open stream polls
+    now[0] = 11.0
+    assert store.tick(token) is None
+    assert len(sessions) == 0
@@ -0,0 +1,13 @@
+"""
+Production entry point.
+
+Serve with any WSGI server, one worker per core, for example:
+    ROGUELIKE_STATE_STORE=file gunicorn --workers 4 --threads 8 wsgi:app
+    ROGUELIKE_STATE_STORE=redis ROGUELIKE_REDIS_URL=redis://localhost:6379/0 \
+        gunicorn --workers 4 --threads 8 wsgi:app
+
+Each worker is a separate process, so several workers need a shared store
+(file or redis); the memory store only works with a single worker. Threads
+matter because every open /stream connection holds one.
+"""
+from run import app  # noqa: F401, built by run.create_app()